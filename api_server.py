@@ -1,4 +1,17 @@
 import os
+
+SERVER_MODE = os.environ.get("API_SERVER_MODE", "threading").lower()
+if SERVER_MODE == "eventlet":
+    import eventlet
+    import eventlet.tpool
+    eventlet.monkey_patch()
+elif SERVER_MODE == "gevent":
+    import gevent
+    from gevent import monkey
+    monkey.patch_all()
+elif SERVER_MODE != "threading":
+    raise SystemExit(f"Unknown API_SERVER_MODE {SERVER_MODE}, expected threading, eventlet or gevent")
+
 import sys
 import time
 import subprocess
@@ -8,15 +21,43 @@ import signal
 import atexit
 import shutil
 import json
+import hashlib
+import socket
 import urllib.request
+import urllib.error
+import concurrent.futures
 import threading
+import gzip
+import zlib
+import base64
+import datetime
+import itertools
+import collections
+import re
+import csv
+import sqlite3
+import copy
+import heapq
+import shlex
+import bisect
+import fnmatch
+from array import array
+import select
+import struct
+import ctypes
+import ctypes.util
 import yaml
 import toml
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, send_file
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from enum import Enum
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 class ServiceType(Enum):
     API = "ServiceAPI.jar"
     AUCTION_HOUSE = "ServiceAuctionHouse.jar"
@@ -27,121 +68,4222 @@ class ServiceType(Enum):
     ITEM_TRACKER = "ServiceItemTracker.jar"
     ORCHESTRATOR = "ServiceOrchestrator.jar"
 
-ALL_SERVER_TYPES = [
-    (0, "SKYBLOCK_HUB"),
-    (0, "SKYBLOCK_ISLAND"),
-    (0, "SKYBLOCK_SPIDERS_DEN"),
-    (0, "SKYBLOCK_THE_END"),
-    (0, "SKYBLOCK_CRIMSON_ISLE"),
-    (0, "SKYBLOCK_DUNGEON_HUB"),
-    (0, "SKYBLOCK_DUNGEON"),
-    (0, "SKYBLOCK_FARMING_ISLANDS"),
-    (0, "SKYBLOCK_GOLD_MINE"),
-    (0, "SKYBLOCK_DEEP_CAVERNS"),
-    (0, "SKYBLOCK_DWARVEN_MINES"),
-    (0, "SKYBLOCK_CRYSTAL_HOLLOWS"),
-    (0, "SKYBLOCK_THE_PARK"),
-    (0, "SKYBLOCK_JERRYS_WORKSHOP"),
-    (0, "SKYBLOCK_BACKWATER_BAYOU"),
-    (0, "SKYBLOCK_GALATEA"),
-    (1, "PROTOTYPE_LOBBY"),
-    (1, "BEDWARS_LOBBY"),
-    (0, "BEDWARS_GAME"),
-    (0, "BEDWARS_CONFIGURATOR"),
-    (0, "MURDER_MYSTERY_LOBBY"),
-    (0, "MURDER_MYSTERY_GAME"),
-    (0, "MURDER_MYSTERY_CONFIGURATOR"),
-    (0, "SKYWARS_LOBBY"),
-    (0, "SKYWARS_GAME"),
-    (0, "SKYWARS_CONFIGURATOR"),
-]
+ALL_SERVER_TYPES = [
+    (0, "SKYBLOCK_HUB"),
+    (0, "SKYBLOCK_ISLAND"),
+    (0, "SKYBLOCK_SPIDERS_DEN"),
+    (0, "SKYBLOCK_THE_END"),
+    (0, "SKYBLOCK_CRIMSON_ISLE"),
+    (0, "SKYBLOCK_DUNGEON_HUB"),
+    (0, "SKYBLOCK_DUNGEON"),
+    (0, "SKYBLOCK_FARMING_ISLANDS"),
+    (0, "SKYBLOCK_GOLD_MINE"),
+    (0, "SKYBLOCK_DEEP_CAVERNS"),
+    (0, "SKYBLOCK_DWARVEN_MINES"),
+    (0, "SKYBLOCK_CRYSTAL_HOLLOWS"),
+    (0, "SKYBLOCK_THE_PARK"),
+    (0, "SKYBLOCK_JERRYS_WORKSHOP"),
+    (0, "SKYBLOCK_BACKWATER_BAYOU"),
+    (0, "SKYBLOCK_GALATEA"),
+    (1, "PROTOTYPE_LOBBY"),
+    (1, "BEDWARS_LOBBY"),
+    (0, "BEDWARS_GAME"),
+    (0, "BEDWARS_CONFIGURATOR"),
+    (0, "MURDER_MYSTERY_LOBBY"),
+    (0, "MURDER_MYSTERY_GAME"),
+    (0, "MURDER_MYSTERY_CONFIGURATOR"),
+    (0, "SKYWARS_LOBBY"),
+    (0, "SKYWARS_GAME"),
+    (0, "SKYWARS_CONFIGURATOR"),
+]
+
+LOG_RETENTION = {
+    "default": {"max_bytes": 50 * 1024 * 1024, "backups": 5, "ring_lines": 5000},
+    "Proxy": {"max_bytes": 100 * 1024 * 1024, "backups": 10, "ring_lines": 10000},
+    "NanoLimbo": {"max_bytes": 10 * 1024 * 1024, "backups": 3},
+    "SKYBLOCK_HUB": {"max_bytes": 200 * 1024 * 1024, "backups": 10, "ring_lines": 20000},
+    "SKYBLOCK_ISLAND": {"max_bytes": 100 * 1024 * 1024, "backups": 8, "ring_lines": 10000},
+    "BEDWARS_CONFIGURATOR": {"max_bytes": 10 * 1024 * 1024, "backups": 2},
+    "MURDER_MYSTERY_CONFIGURATOR": {"max_bytes": 10 * 1024 * 1024, "backups": 2},
+    "SKYWARS_CONFIGURATOR": {"max_bytes": 10 * 1024 * 1024, "backups": 2},
+}
+LOG_SPOOL_POLL_INTERVAL = 0.1
+LOG_SPOOL_EXIT_CHECK = 1.0
+LOG_SPOOL_PUNCH_BYTES = 4 * 1024 * 1024
+
+WARM_PREFIX = "WARM."
+
+def server_type_of(name):
+    if name.startswith(WARM_PREFIX):
+        name = name[len(WARM_PREFIX):]
+    parts = name.rsplit('_', 1)
+    if len(parts) == 2 and parts[1].isdigit():
+        return parts[0]
+    return name
+
+def get_log_retention(name):
+    settings = dict(LOG_RETENTION["default"])
+    settings.update(LOG_RETENTION.get(server_type_of(name), {}))
+    return settings
+
+RESTART_POLICIES = {
+    "default": {
+        "policy": "on-failure",
+        "backoff_initial": 1.0,
+        "backoff_max": 60.0,
+        "backoff_multiplier": 2.0,
+        "max_restarts": 5,
+        "window": 300.0,
+    },
+    "Proxy": {"policy": "always"},
+    "BEDWARS_CONFIGURATOR": {"policy": "never"},
+    "MURDER_MYSTERY_CONFIGURATOR": {"policy": "never"},
+    "SKYWARS_CONFIGURATOR": {"policy": "never"},
+}
+RESTART_POLICY_MODES = ("never", "on-failure", "always")
+UPTIME_BUCKETS = [10, 30, 60, 300, 900, 3600, 21600, 86400]
+
+READINESS_PROBES = {
+    "default": {"log": r"(?i)server started|started server|done \(", "port": "listen", "any": True, "timeout": 180},
+    "Proxy": {"log": r"Done \(\d+(?:\.\d+)?s\)!", "port": "config", "timeout": 120},
+    "NanoLimbo": {"log": r"Server started on", "port": "config", "timeout": 60},
+}
+STARTUP_BUCKETS = [1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180]
+
+def get_readiness_probe(name):
+    settings = dict(READINESS_PROBES["default"])
+    settings.update(READINESS_PROBES.get(server_type_of(name), {}))
+    return settings
+
+def get_restart_policy(name):
+    settings = dict(RESTART_POLICIES["default"])
+    settings.update(RESTART_POLICIES.get(server_type_of(name), {}))
+    return settings
+
+JVM_PROFILES = {
+    "default": {
+        "heap_min": "1G",
+        "heap_max": "2G",
+        "gc": "G1",
+        "parallel_gc_threads": None,
+        "conc_gc_threads": None,
+        "active_processor_count": None,
+        "overhead": "384M",
+        "extra_flags": [],
+        "warm_pool": 0,
+    },
+    "services": {"heap_min": "256M", "heap_max": "512M", "overhead": "192M"},
+    "Proxy": {"heap_min": None, "heap_max": None, "gc": None, "overhead": "1G"},
+    "NanoLimbo": {"heap_min": None, "heap_max": None, "gc": None, "overhead": "256M"},
+    "SKYBLOCK_HUB": {"heap_max": "3G"},
+    "SKYBLOCK_GOLD_MINE": {"heap_min": "512M", "heap_max": "1G"},
+    "SKYBLOCK_DEEP_CAVERNS": {"heap_min": "512M", "heap_max": "1G"},
+    "SKYBLOCK_JERRYS_WORKSHOP": {"heap_min": "512M", "heap_max": "1G"},
+    "BEDWARS_CONFIGURATOR": {"heap_min": "512M", "heap_max": "1G"},
+    "MURDER_MYSTERY_CONFIGURATOR": {"heap_min": "512M", "heap_max": "1G"},
+    "SKYWARS_CONFIGURATOR": {"heap_min": "512M", "heap_max": "1G"},
+}
+JVM_GC_FLAGS = {
+    "G1": "-XX:+UseG1GC",
+    "ZGC": "-XX:+UseZGC",
+    "Shenandoah": "-XX:+UseShenandoahGC",
+    "Parallel": "-XX:+UseParallelGC",
+    "Serial": "-XX:+UseSerialGC",
+}
+ADMISSION_SETTINGS = {
+    "enabled": True,
+    "mode": "queue",
+    "queue_timeout": 120,
+    "reserve": "512M",
+}
+ADMISSION_MODES = ("queue", "refuse")
+JVM_PROFILES_FILE = "jvm_profiles.yml"
+WARM_POOL_CHECK_INTERVAL = 5
+WARM_POOL_BACKOFF_MAX = 300
+GAMESERVER_WORKSPACES = os.environ.get("GAMESERVER_WORKSPACES", "1").lower() in ("1", "true", "yes")
+WORKSPACE_DIRNAME = ".instances"
+ARTIFACT_MIRROR_DIRNAME = ".artifacts"
+WORKSPACE_SKIP = {WORKSPACE_DIRNAME, "cds", ARTIFACT_MIRROR_DIRNAME}
+WORKSPACE_SHARED_PATTERNS = ["*.jar", "*.png", "*/SkyBlockPack/*", "*/pack_textures/*"]
+WORKSPACE_PRIVATE_PATTERNS = ["*.log", "*.lock", "logs/*", "*/logs/*", "*.mca", "*.dat", "*.dat_old", "*.polar", "*/region/*", "*/entities/*", "*/poi/*", "*/data/*", "*/DIM-1/*", "*/DIM1/*", "*/playerdata/*", "*/stats/*", "*/advancements/*"]
+WORKSPACE_WORLD_MARKERS = {"level.dat", "region"}
+INSTANCE_KEEP_ON_EXIT = os.environ.get("API_KEEP_INSTANCES", "0").lower() in ("1", "true", "yes")
+INSTANCE_REGISTRY_VERSION = 1
+WARM_POOL_ADMISSION_RETRY = 30
+WARM_EVICTION_WAIT = 30
+WARM_CLAIM_BUCKETS_MS = [0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+CDS_SETTINGS = {
+    "enabled": True,
+    "train_on_launch": True,
+    "training_timeout": 300,
+    "training_warmup": 15,
+    "clean_exit_codes": (0, 130, 143),
+}
+
+METRICS_INTERVAL = float(os.environ.get("METRICS_INTERVAL", "5"))
+METRICS_HISTORY = int(os.environ.get("METRICS_HISTORY", "720"))
+METRICS_PREFIX = "hypixel_process"
+
+CONFIG_WATCH_EXTENSIONS = (".yml", ".yaml", ".json", ".toml", ".secret")
+CONFIG_WATCH_POLL_INTERVAL = 2.0
+CONFIG_WATCH_DEBOUNCE = 0.25
+CONFIG_WATCH_MAX_DELAY = 2.0
+CONFIG_WATCH_EXCLUDE = ("configuration/skyblock/SkyBlockPack", "configuration/skyblock/pack_textures")
+CONFIG_HOT_RELOAD = os.environ.get("CONFIG_HOT_RELOAD", "0").lower() in ("1", "true", "yes")
+CONFIG_RELOAD_RULES = [
+    {"pattern": "configuration/settings.yml", "restart": ["NanoLimbo"]},
+    {"pattern": "configuration/velocity.toml", "restart": ["Proxy"]},
+    {"pattern": "configuration/forwarding.secret", "restart": ["Proxy"]},
+    {"pattern": "proxy/velocity.toml", "restart": ["Proxy"]},
+    {"pattern": "proxy/forwarding.secret", "restart": ["Proxy"]},
+    {"pattern": "configuration/skyblock/*.yml", "restart": ["SKYBLOCK_*"]},
+]
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SKYBLOCK_SNAPSHOT_VERSION = 2
+SPATIAL_GRID_CELL = 32
+SPATIAL_BATCH_LIMIT = 10000
+SPATIAL_POINT_SETS = {
+    "fairysouls": ("Minestom.fairysouls.csv", "zone"),
+    "crystals": ("Minestom.crystals.csv", "serverType"),
+}
+PACK_NAME = "SkyBlockPack"
+PACK_MANIFEST_VERSION = 2
+PACK_SOURCES = [("SkyBlockPack", ""), ("pack_textures", "assets/minecraft/textures/pack_textures/")]
+PACK_MINIFY_EXTENSIONS = (".json", ".mcmeta")
+PACK_COMPRESS_LEVEL = 9
+PACK_CHECK_INTERVAL = 2.0
+PACK_PARALLELISM = int(os.environ.get("PACK_PARALLELISM", str(os.cpu_count() or 4)))
+
+JAVA_COMMAND = shlex.split(os.environ.get("API_JAVA_COMMAND", "java"))
+
+def java_command(cmd):
+    if cmd and cmd[0] == "java":
+        return JAVA_COMMAND + cmd[1:]
+    return cmd
+
+def offload(fn, *args):
+    if SERVER_MODE == "eventlet":
+        return eventlet.tpool.execute(fn, *args)
+    if SERVER_MODE == "gevent":
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+def parse_size(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*(\d+)\s*([kKmMgGtT]?)[bB]?\s*", str(value))
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(match.group(1)) * 1024 ** " KMGT".index(match.group(2).upper() or " ")
+
+def proc_start_ticks(pid, live=True):
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    if live and fields[0] in ("Z", "X"):
+        return None
+    return int(fields[19])
+
+def listening_ports(pid):
+    inodes = set()
+    try:
+        fds = os.listdir(f"/proc/{pid}/fd")
+    except OSError:
+        return set()
+    for fd in fds:
+        try:
+            target = os.readlink(f"/proc/{pid}/fd/{fd}")
+        except OSError:
+            continue
+        if target.startswith("socket:["):
+            inodes.add(target[8:-1])
+    ports = set()
+    for table in ("tcp", "tcp6"):
+        try:
+            with open(f"/proc/{pid}/net/{table}", "r") as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 9 and fields[3] == "0A" and fields[9] in inodes:
+                        ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+        except OSError:
+            continue
+    return ports
+
+def proc_cmdline(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    return [arg.decode("utf-8", "surrogateescape") for arg in raw.split(b"\0")[:-1]]
+
+class AdoptedProcess:
+    def __init__(self, pid, start_ticks, args):
+        self.pid = pid
+        self.start_ticks = start_ticks
+        self.args = args
+        self.stdout = None
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None and proc_start_ticks(self.pid) != self.start_ticks:
+            self.returncode = -1
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+    def send_signal(self, sig):
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+class ProcessManager:
+    def __init__(self):
+        self.processes = []
+        self.by_name = {}
+        self.supervisor = None
+
+    def add(self, p, name, adopted=False):
+        self.processes.append((p, name))
+        self.by_name[name] = p
+        logging.info(f"{'Adopted' if adopted else 'Started'} {name} PID={p.pid}")
+        if self.supervisor:
+            self.supervisor.watch(p, name)
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def discard(self, name, exited_only=False):
+        p = self.by_name.get(name)
+        if p is None or (exited_only and p.poll() is None):
+            return None
+        self.processes[:] = [(q, n) for q, n in self.processes if n != name]
+        del self.by_name[name]
+        return p
+
+    def rename(self, old, new):
+        self.processes[:] = [(p, new if name == old else name) for p, name in self.processes]
+        if old in self.by_name:
+            self.by_name[new] = self.by_name.pop(old)
+
+    def cleanup(self, timeout=10, tier_of=None):
+        logging.info("Shutting down all processes")
+        tiers = collections.defaultdict(list)
+        for p, name in self.processes:
+            if p.poll() is None:
+                tiers[tier_of(name) if tier_of else 0].append((p, name))
+        for tier in sorted(tiers, reverse=True):
+            for p, name in tiers[tier]:
+                logging.info(f"Stopping {name}")
+                if self.supervisor:
+                    self.supervisor.mark_stopping(name)
+                p.terminate()
+            deadline = time.time() + timeout
+            for p, name in tiers[tier]:
+                try:
+                    p.wait(timeout=max(deadline - time.time(), 0))
+                except subprocess.TimeoutExpired:
+                    logging.warning(f"Force killing {name}")
+                    p.kill()
+        self.kill_java()
+
+    @staticmethod
+    def kill_java():
+        logging.info("Killing leftover java processes")
+        try:
+            if platform.system().lower() == "windows":
+                subprocess.run(["taskkill", "/F", "/IM", "java.exe"], capture_output=True)
+            else:
+                subprocess.run(["pkill", "-f", "java -jar"], capture_output=True)
+        except Exception as e:
+            logging.error(str(e))
+
+class ProcessSupervisor:
+    def __init__(self, on_change=None, poll_interval=0.5):
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.table = {}
+        self.current = {}
+        self.pending = []
+        self.fallback = []
+        self.renamed = {}
+        self.use_pidfd = hasattr(os, "pidfd_open") and hasattr(select, "poll")
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def watch(self, p, name):
+        entry = {
+            "running": True,
+            "pid": p.pid,
+            "state": "running",
+            "exit_code": None,
+            "started_at": time.time(),
+            "exited_at": None,
+            "readiness": None,
+            "time_to_ready": None,
+        }
+        with self.lock:
+            self.table[name] = entry
+            self.current[name] = p
+            self.pending.append((p, name))
+        os.write(self.wake_w, b"\0")
+        self.notify(name, entry)
+
+    def mark_stopping(self, name):
+        with self.lock:
+            entry = self.table.get(name)
+            if not entry or not entry["running"]:
+                return
+            entry["state"] = "stopping"
+            entry = dict(entry)
+        self.notify(name, entry)
+
+    def update(self, name, pid, **fields):
+        with self.lock:
+            entry = self.table.get(name)
+            if not entry or entry["pid"] != pid:
+                return
+            entry.update(fields)
+            entry = dict(entry)
+        self.notify(name, entry)
+
+    def forget(self, name):
+        with self.lock:
+            self.current.pop(name, None)
+            return self.table.pop(name, None) is not None
+
+    def rename(self, old, new):
+        with self.lock:
+            entry = self.table.get(old)
+            current = self.table.get(new)
+            if not entry or not entry["running"] or (current and current["running"]):
+                return False
+            p = self.current.pop(old)
+            self.table[new] = self.table.pop(old)
+            self.current[new] = p
+            self.renamed[p] = new
+            entry = dict(entry)
+        self.notify(new, entry)
+        return True
+
+    def get(self, name):
+        with self.lock:
+            entry = self.table.get(name)
+            return dict(entry) if entry else None
+
+    def is_running(self, name):
+        with self.lock:
+            entry = self.table.get(name)
+            return bool(entry and entry["running"])
+
+    def snapshot(self):
+        with self.lock:
+            return {name: dict(entry) for name, entry in self.table.items()}
+
+    def notify(self, name, entry):
+        if self.on_change:
+            try:
+                self.on_change(name, entry)
+            except Exception as e:
+                logging.error(f"Error handling state change for {name}: {str(e)}")
+
+    def run(self):
+        if self.use_pidfd:
+            self.run_pidfd()
+        else:
+            self.run_polling()
+
+    def run_pidfd(self):
+        poller = select.poll()
+        poller.register(self.wake_r, select.POLLIN)
+        watched = {}
+        while True:
+            events = poller.poll()
+            with self.lock:
+                pending, self.pending = self.pending, []
+            for p, name in pending:
+                try:
+                    fd = os.pidfd_open(p.pid)
+                except (ProcessLookupError, OSError):
+                    self.reap(p, name)
+                    continue
+                watched[fd] = (p, name)
+                poller.register(fd, select.POLLIN)
+            for fd, _ in events:
+                if fd == self.wake_r:
+                    try:
+                        while os.read(self.wake_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                item = watched.pop(fd, None)
+                if item is None:
+                    continue
+                poller.unregister(fd)
+                os.close(fd)
+                self.reap(*item)
+
+    def run_polling(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self.lock:
+                self.fallback.extend(self.pending)
+                self.pending = []
+            alive = []
+            for p, name in self.fallback:
+                if p.poll() is None:
+                    alive.append((p, name))
+                else:
+                    self.reap(p, name)
+            self.fallback = alive
+
+    def reap(self, p, name):
+        try:
+            code = p.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            with self.lock:
+                self.pending.append((p, name))
+            os.write(self.wake_w, b"\0")
+            return
+        with self.lock:
+            name = self.renamed.pop(p, name)
+            entry = self.table.get(name)
+            if entry is None or self.current.get(name) is not p:
+                return
+            stopping = entry["state"] == "stopping"
+            entry["running"] = False
+            entry["pid"] = None
+            entry["exit_code"] = code
+            entry["exited_at"] = time.time()
+            entry["state"] = "stopped" if stopping else ("exited" if code == 0 else "crashed")
+            entry = dict(entry)
+        if entry["state"] == "crashed":
+            logging.warning(f"{name} crashed with exit code {code}")
+        else:
+            logging.info(f"{name} exited with code {code}")
+        self.notify(name, entry)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self):
+        bounds = self.buckets + ["+Inf"]
+        return {
+            "buckets": [{"le": le, "count": c} for le, c in zip(bounds, itertools.accumulate(self.counts))],
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.sum / self.count, 3) if self.count else None,
+        }
+
+class RestartManager:
+    def __init__(self, relaunch):
+        self.relaunch = relaunch
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.overrides = {}
+        self.timers = {}
+        self.enabled = True
+
+    def get_stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = {
+                "state": "ok",
+                "restarts": 0,
+                "restart_times": collections.deque(maxlen=256),
+                "crash_times": collections.deque(maxlen=256),
+                "exit_codes": collections.Counter(),
+                "uptime": Histogram(UPTIME_BUCKETS),
+                "uptime_by_reason": {},
+                "backoff": None,
+                "next_restart_at": None,
+                "last_exit_code": None,
+            }
+            self.stats[name] = stats
+        return stats
+
+    def policy_for(self, name):
+        policy = get_restart_policy(name)
+        policy.update(self.overrides.get(name, {}))
+        return policy
+
+    def set_policy(self, name, mode):
+        if mode not in RESTART_POLICY_MODES:
+            raise ValueError(f"Invalid restart policy: {mode}")
+        with self.lock:
+            self.overrides.setdefault(name, {})["policy"] = mode
+            if mode == "never":
+                self.cancel(name)
+
+    def cancel(self, name):
+        timer = self.timers.pop(name, None)
+        if timer:
+            timer.cancel()
+        stats = self.stats.get(name)
+        if stats:
+            stats["next_restart_at"] = None
+
+    def cancel_pending(self, name):
+        with self.lock:
+            pending = name in self.timers
+            self.cancel(name)
+            if pending:
+                self.get_stats(name)["state"] = "ok"
+            return pending
+
+    def reset(self, name):
+        with self.lock:
+            self.cancel(name)
+            stats = self.get_stats(name)
+            stats["state"] = "ok"
+            stats["backoff"] = None
+            stats["crash_times"].clear()
+
+    def forget(self, name):
+        with self.lock:
+            self.cancel(name)
+            self.stats.pop(name, None)
+            self.overrides.pop(name, None)
+
+    def shutdown(self):
+        with self.lock:
+            self.enabled = False
+            for name in list(self.timers):
+                self.cancel(name)
+
+    def on_change(self, name, entry):
+        if entry["running"]:
+            return
+        with self.lock:
+            stats = self.get_stats(name)
+            now = entry["exited_at"] or time.time()
+            uptime = max(now - entry["started_at"], 0.0)
+            stats["exit_codes"][str(entry["exit_code"])] += 1
+            stats["last_exit_code"] = entry["exit_code"]
+            stats["uptime"].observe(uptime)
+            stats["uptime_by_reason"].setdefault(entry["state"], Histogram(UPTIME_BUCKETS)).observe(uptime)
+            if entry["state"] not in ("crashed", "exited"):
+                self.cancel(name)
+                return
+            policy = self.policy_for(name)
+            mode = policy["policy"]
+            if not self.enabled or mode == "never" or (mode == "on-failure" and entry["state"] != "crashed"):
+                return
+            if uptime >= policy["window"]:
+                stats["backoff"] = None
+                stats["crash_times"].clear()
+            stats["crash_times"].append(now)
+            while stats["crash_times"] and stats["crash_times"][0] < now - policy["window"]:
+                stats["crash_times"].popleft()
+            if len(stats["crash_times"]) > policy["max_restarts"]:
+                stats["state"] = "crash_loop"
+                stats["next_restart_at"] = None
+                logging.error(f"{name} is crash looping, giving up after {policy['max_restarts']} restarts in {policy['window']}s")
+                return
+            delay = stats["backoff"] if stats["backoff"] is not None else policy["backoff_initial"]
+            stats["backoff"] = min(delay * policy["backoff_multiplier"], policy["backoff_max"])
+            stats["state"] = "backoff"
+            self.cancel(name)
+            timer = threading.Timer(delay, self.restart, args=(name,))
+            timer.daemon = True
+            self.timers[name] = timer
+            stats["next_restart_at"] = time.time() + delay
+            timer.start()
+            logging.info(f"Restarting {name} in {delay:.1f}s")
+
+    def restart(self, name):
+        with self.lock:
+            self.timers.pop(name, None)
+            if not self.enabled:
+                return
+            stats = self.get_stats(name)
+            stats["next_restart_at"] = None
+        try:
+            restarted = self.relaunch(name)
+        except Exception as e:
+            logging.error(f"Error restarting {name}: {str(e)}")
+            restarted = False
+        with self.lock:
+            if restarted:
+                stats["restarts"] += 1
+                stats["restart_times"].append(time.time())
+                stats["state"] = "ok"
+
+    def report(self):
+        now = time.time()
+        with self.lock:
+            return {
+                name: {
+                    "state": stats["state"],
+                    "policy": self.policy_for(name)["policy"],
+                    "restarts": stats["restarts"],
+                    "restarts_last_hour": sum(1 for t in stats["restart_times"] if t >= now - 3600),
+                    "backoff": stats["backoff"],
+                    "next_restart_in": round(stats["next_restart_at"] - now, 3) if stats["next_restart_at"] else None,
+                    "last_exit_code": stats["last_exit_code"],
+                    "exit_codes": dict(stats["exit_codes"]),
+                    "uptime_seconds": stats["uptime"].to_dict(),
+                    "uptime_seconds_by_reason": {reason: histogram.to_dict() for reason, histogram in stats["uptime_by_reason"].items()},
+                }
+                for name, stats in self.stats.items()
+            }
+
+class MetricRing:
+    FIELDS = (
+        ("timestamp", "d"),
+        ("cpu_percent", "f"),
+        ("cpu_seconds", "d"),
+        ("rss_bytes", "Q"),
+        ("peak_rss_bytes", "Q"),
+        ("swap_bytes", "Q"),
+        ("threads", "L"),
+        ("fds", "L"),
+        ("read_bytes", "Q"),
+        ("write_bytes", "Q"),
+    )
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = {field: array(code, [0]) * capacity for field, code in self.FIELDS}
+        self.head = 0
+        self.count = 0
+
+    def append(self, sample):
+        for field, column in self.columns.items():
+            column[self.head] = sample[field]
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self):
+        if not self.count:
+            return None
+        index = (self.head - 1) % self.capacity
+        return {field: column[index] for field, column in self.columns.items()}
+
+    def series(self, since=None, limit=None):
+        start = (self.head - self.count) % self.capacity
+        order = [(start + k) % self.capacity for k in range(self.count)]
+        if since is not None:
+            timestamps = self.columns["timestamp"]
+            order = [i for i in order if timestamps[i] > since]
+        if limit:
+            order = order[-limit:]
+        return {field: [column[i] for i in order] for field, column in self.columns.items()}
+
+class ProcessSampler:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def __init__(self, proc_mgr, interval=METRICS_INTERVAL, history=METRICS_HISTORY, on_sample=None):
+        self.proc_mgr = proc_mgr
+        self.interval = interval
+        self.history = history
+        self.on_sample = on_sample
+        self.lock = threading.Lock()
+        self.rings = {}
+        self.pids = {}
+        self.previous = {}
+        self.overhead = {"sweeps": 0, "last_sweep_ms": 0.0, "cpu_seconds": 0.0, "cpu_percent": 0.0}
+        self.started = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        if not os.path.isdir("/proc"):
+            logging.warning("/proc is not available, process metrics are disabled")
+            return
+        self.started = time.monotonic()
+        self.thread.start()
+
+    def run(self):
+        while True:
+            wall = time.monotonic()
+            cpu = time.thread_time()
+            try:
+                sampled = self.sweep()
+            except Exception as e:
+                logging.error(f"Error sampling process metrics: {str(e)}")
+                sampled = 0
+            elapsed = time.monotonic() - wall
+            with self.lock:
+                self.overhead["sweeps"] += 1
+                self.overhead["last_sweep_ms"] = round(elapsed * 1000, 3)
+                self.overhead["cpu_seconds"] += time.thread_time() - cpu
+                uptime = time.monotonic() - self.started
+                self.overhead["cpu_percent"] = round(self.overhead["cpu_seconds"] * 100 / uptime, 4) if uptime > 0 else 0.0
+            if sampled and self.on_sample:
+                try:
+                    self.on_sample()
+                except Exception as e:
+                    logging.error(f"Error publishing process metrics: {str(e)}")
+            time.sleep(max(self.interval - elapsed, 0.05))
+
+    @staticmethod
+    def read_bytes(path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.read(fd, 8192)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def field_after(data, key):
+        start = data.find(key)
+        if start < 0:
+            return 0
+        start += len(key)
+        return int(data[start:data.index(b"\n", start)].split()[0])
+
+    def read_process(self, pid):
+        base = f"/proc/{pid}"
+        stat = self.read_bytes(f"{base}/stat")
+        fields = stat[stat.rfind(b")") + 2:].split()
+        sample = {
+            "cpu_ticks": int(fields[11]) + int(fields[12]),
+            "threads": int(fields[17]),
+            "rss_bytes": int(fields[21]) * self.PAGE_SIZE,
+            "peak_rss_bytes": 0,
+            "swap_bytes": 0,
+            "fds": 0,
+            "read_bytes": 0,
+            "write_bytes": 0,
+        }
+        status = self.read_bytes(f"{base}/status")
+        sample["peak_rss_bytes"] = self.field_after(status, b"\nVmHWM:") * 1024
+        sample["swap_bytes"] = self.field_after(status, b"\nVmSwap:") * 1024
+        try:
+            io = self.read_bytes(f"{base}/io")
+            sample["read_bytes"] = self.field_after(io, b"\nread_bytes:")
+            sample["write_bytes"] = self.field_after(io, b"\nwrite_bytes:")
+        except OSError:
+            pass
+        try:
+            sample["fds"] = len(os.listdir(f"{base}/fd"))
+        except OSError:
+            pass
+        return sample
+
+    def sweep(self):
+        targets = [(name, p.pid) for p, name in list(self.proc_mgr.processes) if p.returncode is None]
+        now = time.time()
+        clock = time.monotonic()
+        sampled = 0
+        for name, pid in targets:
+            try:
+                sample = self.read_process(pid)
+            except (OSError, ValueError, IndexError):
+                continue
+            previous = self.previous.get(name)
+            if previous and previous[0] == pid and clock > previous[2]:
+                ticks = sample["cpu_ticks"] - previous[1]
+                sample["cpu_percent"] = round(ticks / self.CLOCK_TICKS * 100 / (clock - previous[2]), 2)
+            else:
+                sample["cpu_percent"] = 0.0
+            self.previous[name] = (pid, sample["cpu_ticks"], clock)
+            sample["cpu_seconds"] = sample.pop("cpu_ticks") / self.CLOCK_TICKS
+            sample["timestamp"] = now
+            with self.lock:
+                ring = self.rings.get(name)
+                if ring is None:
+                    ring = self.rings[name] = MetricRing(self.history)
+                ring.append(sample)
+                self.pids[name] = pid
+            sampled += 1
+        live = {name for name, _ in targets}
+        known = {name for _, name in list(self.proc_mgr.processes)}
+        with self.lock:
+            for name in list(self.rings):
+                if name not in live:
+                    self.pids.pop(name, None)
+                    self.previous.pop(name, None)
+                    if name not in known:
+                        del self.rings[name]
+        return sampled
+
+    def latest(self, name):
+        with self.lock:
+            ring = self.rings.get(name)
+            if ring is None or name not in self.pids:
+                return None
+            sample = ring.latest()
+        return {
+            "cpu_percent": round(sample["cpu_percent"], 2),
+            "rss_bytes": sample["rss_bytes"],
+            "threads": sample["threads"],
+            "fds": sample["fds"],
+        }
+
+    def report(self, names=None, since=None, limit=None, series=False):
+        with self.lock:
+            processes = {}
+            for name, ring in self.rings.items():
+                if names and name not in names:
+                    continue
+                latest = ring.latest()
+                if latest is not None:
+                    latest["cpu_percent"] = round(latest["cpu_percent"], 2)
+                processes[name] = {"pid": self.pids.get(name), "running": name in self.pids, "latest": latest}
+                if series:
+                    processes[name]["series"] = ring.series(since, limit)
+            return {
+                "interval": self.interval,
+                "history": self.history,
+                "sampler": dict(self.overhead),
+                "processes": processes,
+            }
+
+    def prometheus(self):
+        gauges = [
+            ("cpu_percent", "gauge", "CPU usage over the last sampling interval, in percent of one core"),
+            ("cpu_seconds", "counter", "Total user and system CPU time"),
+            ("rss_bytes", "gauge", "Resident set size"),
+            ("peak_rss_bytes", "gauge", "Peak resident set size"),
+            ("swap_bytes", "gauge", "Swapped out memory"),
+            ("threads", "gauge", "Number of threads"),
+            ("fds", "gauge", "Number of open file descriptors"),
+            ("read_bytes", "counter", "Bytes read from storage"),
+            ("write_bytes", "counter", "Bytes written to storage"),
+        ]
+        with self.lock:
+            latest = {name: ring.latest() for name, ring in self.rings.items() if name in self.pids}
+            overhead = dict(self.overhead)
+        lines = []
+        for field, kind, description in gauges:
+            metric = f"{METRICS_PREFIX}_{field}_total" if kind == "counter" else f"{METRICS_PREFIX}_{field}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, sample in sorted(latest.items()):
+                if sample is None:
+                    continue
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                value = round(sample[field], 4) if isinstance(sample[field], float) else sample[field]
+                lines.append(f'{metric}{{name="{label}",type="{server_type_of(name)}"}} {value}')
+        lines.append(f"# HELP {METRICS_PREFIX}_sampler_cpu_percent CPU used by the metrics sampler, in percent of one core")
+        lines.append(f"# TYPE {METRICS_PREFIX}_sampler_cpu_percent gauge")
+        lines.append(f"{METRICS_PREFIX}_sampler_cpu_percent {overhead['cpu_percent']}")
+        lines.append(f"# HELP {METRICS_PREFIX}_sampler_sweep_seconds Duration of the last sampling sweep")
+        lines.append(f"# TYPE {METRICS_PREFIX}_sampler_sweep_seconds gauge")
+        lines.append(f"{METRICS_PREFIX}_sampler_sweep_seconds {overhead['last_sweep_ms'] / 1000}")
+        return "\n".join(lines) + "\n"
+
+class FileManager:
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.config_dir = os.path.join(base_dir, "configuration")
+        self.proxy_dir = os.path.join(base_dir, "proxy")
+        self.gameserver_dir = os.path.join(base_dir, "gameserver")
+        self.limbo_dir = os.path.join(base_dir, "limbo")
+        self.services_dir = os.path.join(base_dir, "services")
+        self.logs_dir = os.path.join(base_dir, "logs")
+
+    def copy_file_if_not_exists(self, src, dst):
+        if not os.path.exists(dst) and os.path.exists(src):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+            logging.info(f"Copied {src} -> {dst}")
+
+FICLONE = 0x40049409
+
+def clone_file(src, dst, allow_hardlink=True):
+    if allow_hardlink and os.path.exists(dst) and os.path.samefile(src, dst):
+        return "unchanged"
+    tmp = f"{dst}.tmp-{os.getpid()}-{threading.get_ident()}"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    method = None
+    if allow_hardlink:
+        try:
+            os.link(src, tmp)
+            method = "hardlink"
+        except OSError:
+            pass
+    if method is None and fcntl is not None and platform.system().lower() == "linux":
+        try:
+            with open(src, "rb") as s, open(tmp, "wb") as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            shutil.copystat(src, tmp)
+            method = "reflink"
+        except OSError:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+    if method is None:
+        shutil.copy2(src, tmp)
+        method = "copy"
+    os.replace(tmp, dst)
+    return method
+
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+libc = None
+
+def punch_hole(fd, offset, length):
+    global libc
+    if libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+    if libc.fallocate(fd, FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, offset, length) != 0:
+        raise OSError(ctypes.get_errno(), "fallocate failed")
+
+def mount_point(path):
+    path = os.path.realpath(path)
+    best = "/"
+    try:
+        with open("/proc/self/mountinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), line.split(" ")[4])
+                if len(point) > len(best) and (path == point or path.startswith(point.rstrip("/") + "/")):
+                    best = point
+        return best
+    except (OSError, IndexError):
+        pass
+    dev = os.stat(path).st_dev
+    while path != os.path.dirname(path) and os.stat(os.path.dirname(path)).st_dev == dev:
+        path = os.path.dirname(path)
+    return path
+
+def cache_encode(value):
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith("$") for key in value):
+            return {key: cache_encode(item) for key, item in value.items()}
+        return {"$map": [[cache_encode(key), cache_encode(item)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return [cache_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {"$tuple": [cache_encode(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {"$set": [cache_encode(item) for item in value]}
+    if isinstance(value, bytes):
+        return {"$bytes": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise ValueError(f"Cannot cache {type(value).__name__} values")
+
+CACHE_TAGS = {
+    "$map": lambda items: {cache_decode(key): cache_decode(item) for key, item in items},
+    "$tuple": lambda items: tuple(cache_decode(item) for item in items),
+    "$set": lambda items: {cache_decode(item) for item in items},
+    "$bytes": lambda text: base64.b64decode(text),
+    "$datetime": lambda text: datetime.datetime.fromisoformat(text),
+    "$date": lambda text: datetime.date.fromisoformat(text),
+}
+
+def cache_decode(value):
+    if isinstance(value, list):
+        return [cache_decode(item) for item in value]
+    if isinstance(value, dict):
+        if len(value) == 1:
+            tag, inner = next(iter(value.items()))
+            if tag in CACHE_TAGS:
+                return CACHE_TAGS[tag](inner)
+        return {key: cache_decode(item) for key, item in value.items()}
+    return value
+
+def cached_stamp(value):
+    return isinstance(value, tuple) and len(value) == 3 and all(isinstance(part, int) for part in value)
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def atomic_write(path, data):
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+class ConfigPathError(Exception):
+    pass
+
+class ConfigStore:
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.write_locks = collections.defaultdict(threading.Lock)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def kind(path):
+        if path.endswith(".json"):
+            return "json"
+        if path.endswith(".toml"):
+            return "toml"
+        if path.endswith(".yml") or path.endswith(".yaml"):
+            return "yaml"
+        return "text"
+
+    @staticmethod
+    def parse(kind, raw):
+        if kind == "json":
+            return json.loads(raw)
+        if kind == "toml":
+            return toml.loads(raw)
+        if kind == "yaml":
+            return yaml.load(raw, Loader=YAML_LOADER)
+        return raw
+
+    @staticmethod
+    def serialize(kind, content):
+        if kind == "json":
+            return json.dumps(content, indent=2)
+        if kind == "toml":
+            return toml.dumps(content)
+        if kind == "yaml":
+            return yaml.dump(content, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        return str(content)
+
+    def get(self, path):
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry["stamp"] == stamp:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        return self.store(path, (st.st_mtime_ns, st.st_size, st.st_ino), data)
+
+    def store(self, path, stamp, data):
+        kind = self.kind(path)
+        raw = data.decode("utf-8")
+        entry = {
+            "stamp": stamp,
+            "etag": hashlib.sha256(data).hexdigest()[:32],
+            "type": kind,
+            "raw": raw,
+            "content": self.parse(kind, raw),
+            "body": None,
+        }
+        with self.lock:
+            current = self.entries.get(path)
+            if current is None or current["stamp"] != stamp:
+                self.entries[path] = entry
+        return entry
+
+    @staticmethod
+    def apply(kind, tree, field_path, value, create=False):
+        if not field_path:
+            return value
+        if kind == "text":
+            raise ConfigPathError("Field editing not supported for this file type")
+        keys = field_path.split('.')
+        current = tree
+        for key in keys[:-1]:
+            if not isinstance(current, dict):
+                raise ConfigPathError(f"Invalid field path: {field_path}")
+            if current.get(key) is None:
+                if not create:
+                    raise ConfigPathError(f"Invalid field path: {field_path}")
+                current[key] = {}
+            current = current[key]
+        if not isinstance(current, dict):
+            raise ConfigPathError(f"Invalid field path: {field_path}")
+        current[keys[-1]] = value
+        return tree
+
+    def update(self, path, content, field_path=None, if_match=None):
+        kind = self.kind(path)
+        with self.write_locks[path]:
+            if if_match is not None and os.path.exists(path) and not if_match.contains(self.get(path)["etag"]):
+                return None
+            if field_path:
+                content = self.apply(kind, copy.deepcopy(self.get(path)["content"]), field_path, content, os.path.basename(path) == JVM_PROFILES_FILE)
+            data = self.serialize(kind, content).encode("utf-8")
+            atomic_write(path, data)
+            st = os.stat(path)
+            return self.store(path, (st.st_mtime_ns, st.st_size, st.st_ino), data)
+
+    def update_many(self, operations):
+        paths = sorted({path for path, _, _ in operations})
+        locks = [self.write_locks[path] for path in paths]
+        for lock in locks:
+            lock.acquire()
+        try:
+            trees = {}
+            for index, (path, field_path, value) in enumerate(operations):
+                kind = self.kind(path)
+                if path not in trees:
+                    trees[path] = copy.deepcopy(self.get(path)["content"]) if os.path.exists(path) else None
+                try:
+                    trees[path] = self.apply(kind, trees[path], field_path, value, os.path.basename(path) == JVM_PROFILES_FILE)
+                except (KeyError, TypeError) as e:
+                    raise ConfigPathError(f"Operation {index}: invalid field path {field_path} ({str(e)})")
+                except ConfigPathError as e:
+                    raise ConfigPathError(f"Operation {index}: {str(e)}")
+            files = {}
+            for path, tree in trees.items():
+                kind = self.kind(path)
+                try:
+                    data = self.serialize(kind, tree).encode("utf-8")
+                    self.parse(kind, data.decode("utf-8"))
+                except Exception as e:
+                    raise ConfigPathError(f"{os.path.basename(path)} would not be valid {kind}: {str(e)}")
+                files[path] = data
+            self.commit(files)
+            entries = {}
+            for path, data in files.items():
+                st = os.stat(path)
+                entries[path] = self.store(path, (st.st_mtime_ns, st.st_size, st.st_ino), data)
+            return entries
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def commit(self, files):
+        batch_id = f"{os.getpid()}-{time.time_ns()}"
+        staged = []
+        try:
+            for path, data in files.items():
+                tmp = f"{path}.batch-{batch_id}"
+                staged.append((tmp, path))
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if os.path.exists(path):
+                    shutil.copymode(path, tmp)
+        except BaseException:
+            for tmp, _ in staged:
+                if os.path.lexists(tmp):
+                    os.remove(tmp)
+            raise
+        atomic_write(self.journal_path, json.dumps({"id": batch_id, "files": staged}).encode("utf-8"))
+        self.roll_forward(staged)
+        os.remove(self.journal_path)
+
+    def roll_forward(self, staged):
+        for tmp, path in staged:
+            if os.path.exists(tmp):
+                os.replace(tmp, path)
+        if hasattr(os, "O_DIRECTORY"):
+            for directory in {os.path.dirname(path) for _, path in staged}:
+                fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def recover(self):
+        if os.path.exists(self.journal_path):
+            try:
+                with open(self.journal_path, "r", encoding="utf-8") as f:
+                    journal = json.load(f)
+                logging.warning(f"Completing interrupted config batch {journal['id']}")
+                self.roll_forward(journal["files"])
+            except Exception as e:
+                logging.error(f"Error replaying config journal {self.journal_path}: {str(e)}")
+            os.remove(self.journal_path)
+        directory = os.path.dirname(self.journal_path)
+        for entry in os.scandir(directory):
+            if ".batch-" in entry.name and entry.is_file():
+                logging.info(f"Removing abandoned config batch file {entry.name}")
+                os.remove(entry.path)
+
+    def invalidate(self, path=None):
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(path, None)
+
+    def report(self):
+        with self.lock:
+            return {"files": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+class ArtifactStore:
+    def __init__(self, root, base_dir=None):
+        self.root = root
+        self.base_dir = os.path.realpath(base_dir or os.path.dirname(os.path.dirname(root)))
+        self.blobs_dir = os.path.join(root, "sha256")
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.index_path = os.path.join(root, "index.json")
+        self.lock = threading.Lock()
+        self.hash_cache = {}
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.index = {"artifacts": {}, "mirrors": []}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.error(f"Ignoring unreadable artifact index: {str(e)}")
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def save(self):
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.index["artifacts"].get(url)
+            if entry and os.path.exists(self.blob_path(entry["sha256"])):
+                return dict(entry)
+            return None
+
+    def touch(self, url):
+        with self.lock:
+            entry = self.index["artifacts"].get(url)
+            if entry:
+                entry["checked_at"] = time.time()
+                self.save()
+
+    def add(self, url, file_path, etag=None, last_modified=None):
+        digest = sha256_file(file_path)
+        blob = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(file_path)
+        else:
+            os.chmod(file_path, 0o444)
+            os.replace(file_path, blob)
+        with self.lock:
+            previous = self.index["artifacts"].get(url, {})
+            history = [h for h in previous.get("history", []) if h != digest]
+            if previous.get("sha256") and previous["sha256"] != digest:
+                history.insert(0, previous["sha256"])
+            entry = {
+                "sha256": digest,
+                "size": os.path.getsize(blob),
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+                "checked_at": time.time(),
+                "history": history,
+            }
+            self.index["artifacts"][url] = entry
+            self.save()
+            return dict(entry)
+
+    def mirror_dir(self, directory):
+        point = mount_point(directory)
+        if point == mount_point(self.blobs_dir):
+            return None
+        if point != self.base_dir and not point.startswith(self.base_dir + os.sep):
+            point = os.path.realpath(directory)
+        return os.path.join(point, ARTIFACT_MIRROR_DIRNAME)
+
+    def deploy(self, digest, path):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        blob = self.blob_path(digest)
+        mirror = self.mirror_dir(directory)
+        if mirror is None:
+            return clone_file(blob, path)
+        local = os.path.join(mirror, digest[:2], digest)
+        if not os.path.exists(local):
+            os.makedirs(os.path.dirname(local), exist_ok=True)
+            clone_file(blob, local, allow_hardlink=False)
+            os.chmod(local, 0o444)
+            with self.lock:
+                mirrors = self.index.setdefault("mirrors", [])
+                if mirror not in mirrors:
+                    mirrors.append(mirror)
+                    self.save()
+        return clone_file(local, path)
+
+    def hash_file(self, path):
+        st = os.stat(path)
+        key = (path, st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        with self.lock:
+            digest = self.hash_cache.get(key)
+        if digest is None:
+            digest = sha256_file(path)
+            with self.lock:
+                self.hash_cache[key] = digest
+        return digest
+
+    def gc(self, keep_versions=1, in_use=()):
+        with self.lock:
+            keep = set(in_use)
+            for entry in self.index["artifacts"].values():
+                keep.add(entry["sha256"])
+                keep.update(entry.get("history", [])[:keep_versions])
+                entry["history"] = entry.get("history", [])[:keep_versions]
+            removed = []
+            freed = 0
+            mirrors = [m for m in self.index.get("mirrors", []) if os.path.isdir(m)]
+            for blobs_dir in [self.blobs_dir] + mirrors:
+                for prefix in os.listdir(blobs_dir):
+                    prefix_dir = os.path.join(blobs_dir, prefix)
+                    for digest in os.listdir(prefix_dir):
+                        blob = os.path.join(prefix_dir, digest)
+                        st = os.stat(blob)
+                        if digest in keep or st.st_nlink > 1:
+                            continue
+                        os.remove(blob)
+                        if blobs_dir == self.blobs_dir:
+                            removed.append(digest)
+                        freed += st.st_size
+            self.index["mirrors"] = mirrors
+            self.save()
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            if time.time() - os.path.getmtime(path) > 86400:
+                os.remove(path)
+        return removed, freed
+
+    def listing(self):
+        with self.lock:
+            return {url: dict(entry) for url, entry in self.index["artifacts"].items()}
+
+class LogPipeline:
+    def __init__(self, log_path, max_bytes, backups, ring_lines):
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.ring = collections.deque(maxlen=ring_lines)
+        self.lock = threading.Lock()
+        self.rotate_lock = threading.Lock()
+        self.partial = b""
+        self.file = open(log_path, "ab")
+        self.size = self.file.tell()
+        self.base = 0
+        self.thread = None
+        self.listeners = []
+
+    def attach(self, stream):
+        self.thread = threading.Thread(target=self.pump, args=(stream,), daemon=True)
+        self.thread.start()
+
+    def follow(self, spool_path, p):
+        self.thread = threading.Thread(target=self.pump_spool, args=(spool_path, p), daemon=True)
+        self.thread.start()
+
+    def pump_spool(self, spool_path, p):
+        inotify = None
+        pidfd = None
+        try:
+            try:
+                inotify = Inotify()
+                inotify.add_watch(spool_path, Inotify.IN_MODIFY)
+            except (OSError, AttributeError):
+                if inotify:
+                    inotify.close()
+                inotify = None
+            if p is not None:
+                try:
+                    pidfd = os.pidfd_open(p.pid)
+                except (OSError, AttributeError):
+                    pidfd = None
+            with open(spool_path, "r+b") as spool, open(os.open(f"{spool_path}.offset", os.O_RDWR | os.O_CREAT, 0o644), "r+b") as marker:
+                saved = marker.read(8)
+                offset = struct.unpack("<Q", saved)[0] if len(saved) == 8 else 0
+                punched = offset - offset % LOG_SPOOL_PUNCH_BYTES
+                spool.seek(offset)
+                gone = p is None
+                warned = False
+                while True:
+                    exited = gone or p.poll() is not None
+                    chunk = spool.read(65536)
+                    if not chunk:
+                        if exited:
+                            break
+                        if inotify:
+                            ready, _, _ = select.select([inotify.fd] + ([pidfd] if pidfd is not None else []), [], [], LOG_SPOOL_EXIT_CHECK)
+                            gone = pidfd in ready
+                            inotify.read_events(0)
+                        else:
+                            time.sleep(LOG_SPOOL_POLL_INTERVAL)
+                        continue
+                    self.write(chunk)
+                    offset += len(chunk)
+                    os.pwrite(marker.fileno(), struct.pack("<Q", offset), 0)
+                    if offset - punched >= LOG_SPOOL_PUNCH_BYTES:
+                        try:
+                            punch_hole(spool.fileno(), punched, offset - offset % LOG_SPOOL_PUNCH_BYTES - punched)
+                            punched = offset - offset % LOG_SPOOL_PUNCH_BYTES
+                        except OSError as e:
+                            if not warned:
+                                logging.warning(f"Cannot free consumed output in {spool_path}: {str(e)}")
+                                warned = True
+            if self.partial:
+                self.write(b"\n")
+            for path in (spool_path, f"{spool_path}.offset"):
+                if os.path.exists(path):
+                    os.remove(path)
+        except Exception as e:
+            logging.error(f"Log pipeline for {self.log_path} failed: {str(e)}")
+        finally:
+            if inotify:
+                inotify.close()
+            if pidfd is not None:
+                os.close(pidfd)
+            with self.lock:
+                self.file.close()
+
+    def pump(self, stream):
+        read = getattr(stream, "read1", stream.read)
+        try:
+            while True:
+                chunk = read(65536)
+                if not chunk:
+                    break
+                self.write(chunk)
+            if self.partial:
+                self.write(b"\n")
+        except Exception as e:
+            logging.error(f"Log pipeline for {self.log_path} failed: {str(e)}")
+        finally:
+            stream.close()
+            with self.lock:
+                self.file.close()
+
+    def write(self, chunk):
+        data = self.partial + chunk
+        lines = data.split(b"\n")
+        self.partial = lines.pop()
+        decoded = [line.decode("utf-8", errors="replace") + "\n" for line in lines]
+        for listener in list(self.listeners):
+            for line in decoded:
+                listener(line)
+        with self.lock:
+            for line in decoded:
+                self.ring.append(line)
+            cut = chunk.rfind(b"\n") + 1
+            if cut and self.size + len(chunk) >= self.max_bytes:
+                self.file.write(chunk[:cut])
+                self.size += cut
+                self.rotate()
+                chunk = chunk[cut:]
+            self.file.write(chunk)
+            self.file.flush()
+            self.size += len(chunk)
+
+    def rotate(self):
+        self.file.close()
+        pending = f"{self.log_path}.rotating-{time.time_ns()}"
+        os.replace(self.log_path, pending)
+        self.file = open(self.log_path, "ab")
+        self.base += self.size
+        self.size = 0
+        threading.Thread(target=self.compress_segment, args=(pending,), daemon=True).start()
+
+    def compress_segment(self, pending):
+        with self.rotate_lock:
+            try:
+                for i in range(self.backups, 0, -1):
+                    segment = f"{self.log_path}.{i}.gz"
+                    if not os.path.exists(segment):
+                        continue
+                    if i >= self.backups:
+                        os.remove(segment)
+                    else:
+                        os.replace(segment, f"{self.log_path}.{i + 1}.gz")
+                if self.backups > 0:
+                    with open(pending, "rb") as src, gzip.open(f"{self.log_path}.1.gz.tmp", "wb") as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                    os.replace(f"{self.log_path}.1.gz.tmp", f"{self.log_path}.1.gz")
+                os.remove(pending)
+                logging.info(f"Rotated {self.log_path}")
+            except Exception as e:
+                logging.error(f"Error rotating {self.log_path}: {str(e)}")
+
+    def retarget(self, log_path):
+        with self.lock:
+            self.file.close()
+            with open(self.log_path, "rb") as src, open(log_path, "ab") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(self.log_path)
+            self.log_path = log_path
+            self.file = open(log_path, "ab")
+            self.size = self.file.tell()
+            self.base = 0
+
+    def tail(self, count):
+        with self.lock:
+            start = max(len(self.ring) - count, 0)
+            return list(itertools.islice(self.ring, start, None)), self.base + self.size - len(self.partial)
+
+LOG_LINE_PATTERNS = [
+    re.compile(rb"^(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,3}))?\s+([A-Z]+)\s+(\S+)\s+--"),
+    re.compile(rb"^\[(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,3}))?\] \[[^\]]*/([A-Z]+)\] \[([^\]]+)\]"),
+]
+LOG_LEVEL_ALIASES = {"WARNING": "WARN", "SEVERE": "ERROR", "CRITICAL": "FATAL"}
+LOG_INDEX_CHUNK_SIZE = 1024 * 1024
+LOG_TRIGRAM_BLOCK_LINES = 64
+
+def parse_time_of_day(value, upper=False):
+    parts = value.strip().split(':')
+    if not 1 <= len(parts) <= 3:
+        raise ValueError(f"Invalid time: {value}")
+    seconds, _, millis = parts[-1].partition('.') if len(parts) == 3 else (parts[-1], '', '')
+    fields = [int(p) for p in parts[:-1]] + [int(seconds)]
+    units = [3600000, 60000, 1000][:len(fields)]
+    result = sum(f * u for f, u in zip(fields, units))
+    if millis:
+        result += int(millis.ljust(3, '0')[:3])
+    elif upper:
+        result += units[-1] - 1
+    return result
+
+def format_time_of_day(ms):
+    if ms < 0:
+        return None
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+class LogFileIndex:
+    def __init__(self, source, server_id, log_path):
+        self.source = source
+        self.server_id = server_id
+        self.log_path = log_path
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.inode = None
+        self.indexed_to = 0
+        self.offsets = array('Q')
+        self.times = array('l')
+        self.levels = {}
+        self.loggers = {}
+        self.monotonic = True
+        self.last_entry = (-1, None, None)
+        self.trigrams = {}
+        self.block = []
+        self.sealed = 0
+
+    def update(self):
+        with self.lock:
+            try:
+                st = os.stat(self.log_path)
+            except FileNotFoundError:
+                self.reset()
+                return
+            if st.st_ino != self.inode or st.st_size < self.indexed_to:
+                self.reset()
+                self.inode = st.st_ino
+            if st.st_size == self.indexed_to:
+                return
+            with open(self.log_path, 'rb') as f:
+                f.seek(self.indexed_to)
+                while self.indexed_to < st.st_size:
+                    chunk = f.read(min(LOG_INDEX_CHUNK_SIZE, st.st_size - self.indexed_to))
+                    cut = chunk.rfind(b'\n') + 1
+                    if cut == 0:
+                        break
+                    pos = self.indexed_to
+                    for line in chunk[:cut].split(b'\n')[:-1]:
+                        self.add_line(pos, line)
+                        pos += len(line) + 1
+                    self.indexed_to = pos
+                    f.seek(pos)
+
+    def add_line(self, pos, line):
+        line_no = len(self.offsets)
+        self.offsets.append(pos)
+        for pattern in LOG_LINE_PATTERNS:
+            m = pattern.match(line)
+            if m:
+                hours, minutes, seconds, millis, level, logger = m.groups()
+                ms = (int(hours) * 3600 + int(minutes) * 60 + int(seconds)) * 1000 + int((millis or b"0").ljust(3, b"0"))
+                level = level.decode('ascii')
+                level = LOG_LEVEL_ALIASES.get(level, level)
+                logger = logger.decode('utf-8', errors='ignore').lower()
+                if ms < self.last_entry[0]:
+                    self.monotonic = False
+                self.last_entry = (ms, level, logger)
+                break
+        ms, level, logger = self.last_entry
+        self.times.append(ms)
+        if level:
+            self.levels.setdefault(level, array('I')).append(line_no)
+            self.loggers.setdefault(logger, array('I')).append(line_no)
+            short = logger.rsplit('.', 1)[-1]
+            if short != logger:
+                self.loggers.setdefault(short, array('I')).append(line_no)
+        self.block.append(line.lower())
+        if len(self.block) == LOG_TRIGRAM_BLOCK_LINES:
+            self.seal_block()
+
+    def seal_block(self):
+        text = b"\n".join(self.block)
+        block_no = self.sealed // LOG_TRIGRAM_BLOCK_LINES
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            self.trigrams.setdefault(gram, array('I')).append(block_no)
+        self.sealed += len(self.block)
+        self.block = []
+
+    def text_blocks(self, text):
+        try:
+            needle = text.lower().encode('ascii')
+        except UnicodeEncodeError:
+            return None
+        grams = {needle[i:i + 3] for i in range(len(needle) - 2)}
+        if not grams:
+            return None
+        postings = sorted((self.trigrams.get(gram, ()) for gram in grams), key=len)
+        blocks = set(postings[0])
+        for posting in postings[1:]:
+            if not blocks:
+                break
+            blocks.intersection_update(posting)
+        return blocks
+
+    def candidates(self, levels, loggers, start_ms, end_ms, text=None):
+        with self.lock:
+            if levels:
+                lines = sorted(set().union(*(self.levels.get(level, ()) for level in levels)))
+            else:
+                lo, hi = 0, len(self.offsets)
+                if self.monotonic and start_ms is not None:
+                    lo = bisect.bisect_left(self.times, start_ms)
+                if self.monotonic and end_ms is not None:
+                    hi = bisect.bisect_right(self.times, end_ms)
+                lines = range(lo, hi)
+            if loggers:
+                allowed = set().union(*(self.loggers.get(logger, ()) for logger in loggers))
+                lines = [ln for ln in lines if ln in allowed]
+            blocks = self.text_blocks(text) if text else None
+            if blocks is not None:
+                sealed = self.sealed
+                lines = [ln for ln in lines if ln >= sealed or ln // LOG_TRIGRAM_BLOCK_LINES in blocks]
+            times = self.times
+            return [
+                (times[ln], ln) for ln in lines
+                if (start_ms is None or times[ln] >= start_ms) and (end_ms is None or times[ln] <= end_ms)
+            ]
+
+    def read_lines(self, line_numbers):
+        with self.lock:
+            runs = []
+            for ln in sorted(line_numbers):
+                if runs and runs[-1][1] == ln:
+                    runs[-1][1] = ln + 1
+                else:
+                    runs.append([ln, ln + 1])
+            spans = [
+                (first, self.offsets[first:last], self.offsets[last] if last < len(self.offsets) else self.indexed_to)
+                for first, last in runs
+            ]
+        result = {}
+        with open(self.log_path, 'rb') as f:
+            for first, starts, end in spans:
+                f.seek(starts[0])
+                data = f.read(end - starts[0])
+                for i, start in enumerate(starts):
+                    stop = starts[i + 1] if i + 1 < len(starts) else end
+                    line = data[start - starts[0]:stop - starts[0]]
+                    result[first + i] = line.rstrip(b'\r\n').decode('utf-8', errors='ignore')
+        return result
+
+class LogSearchIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}
+
+    def get(self, source, server_id, log_path):
+        with self.lock:
+            index = self.files.get(log_path)
+            if index is None:
+                index = LogFileIndex(source, server_id, log_path)
+                self.files[log_path] = index
+            return index
+
+    def search(self, sources, levels=None, loggers=None, start_ms=None, end_ms=None, text=None, offset=0, limit=100):
+        matches = []
+        indexes = []
+        for i, (source, (server_id, log_path)) in enumerate(sorted(sources.items())):
+            index = self.get(source, server_id, log_path)
+            index.update()
+            indexes.append(index)
+            matches.extend((ms, i, ln) for ms, ln in index.candidates(levels, loggers, start_ms, end_ms, text))
+        matches.sort()
+        if text:
+            needle = text.lower()
+            filtered = []
+            for i, index in enumerate(indexes):
+                lines = [ln for _, idx, ln in matches if idx == i]
+                texts = index.read_lines(lines)
+                filtered.extend((ms, idx, ln) for ms, idx, ln in matches if idx == i and needle in texts[ln].lower())
+            filtered.sort()
+            matches = filtered
+        page = matches[offset:offset + limit]
+        by_index = collections.defaultdict(list)
+        for _, i, ln in page:
+            by_index[i].append(ln)
+        texts = {i: indexes[i].read_lines(lines) for i, lines in by_index.items()}
+        results = []
+        for ms, i, ln in page:
+            index = indexes[i]
+            results.append({
+                "source": index.source,
+                "server_id": index.server_id,
+                "line": ln + 1,
+                "time": format_time_of_day(ms),
+                "text": texts[i][ln]
+            })
+        return results, len(matches)
+
+class ReadinessTracker:
+    def __init__(self, supervisor):
+        self.supervisor = supervisor
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.histograms = {}
+        self.variants = {}
+
+    def begin(self, name, p, pipeline, label=None, port=None, adopted=False):
+        probe = get_readiness_probe(name)
+        if probe.get("port") == "config":
+            probe["port"] = port or "listen"
+        checks = set()
+        if probe.get("log") and not (adopted and probe.get("port")):
+            checks.add("log")
+        if probe.get("port"):
+            checks.add("port")
+        state = {"p": p, "started": time.monotonic(), "checks": checks, "any": probe.get("any", False), "pipeline": pipeline, "listener": None, "timer": None, "label": label}
+        with self.lock:
+            self.pending[name] = state
+        self.supervisor.update(name, p.pid, readiness="starting", time_to_ready=None)
+        if not checks:
+            self.mark_ready(name, p)
+            return
+        if "log" in checks:
+            pattern = re.compile(probe["log"])
+            state["listener"] = lambda line: pattern.search(line) and self.check_passed(name, p, "log")
+            pipeline.listeners.append(state["listener"])
+        if "port" in checks:
+            threading.Thread(target=self.probe_port, args=(name, p, probe["port"]), daemon=True).start()
+        state["timer"] = threading.Timer(probe["timeout"], self.mark_failed, args=(name, p, "timeout"))
+        state["timer"].daemon = True
+        state["timer"].start()
+
+    def probe_port(self, name, p, port):
+        while self.is_pending(name, p):
+            if port == "listen":
+                if listening_ports(p.pid):
+                    self.check_passed(name, p, "port")
+                    return
+                time.sleep(0.25)
+                continue
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    self.check_passed(name, p, "port")
+                    return
+            except OSError:
+                time.sleep(0.25)
+
+    def is_pending(self, name, p):
+        with self.lock:
+            state = self.pending.get(name)
+            return bool(state and state["p"] is p)
+
+    def check_passed(self, name, p, check):
+        with self.lock:
+            state = self.pending.get(name)
+            if not state or state["p"] is not p:
+                return
+            state["checks"].discard(check)
+            if state["checks"] and not state["any"]:
+                return
+        self.mark_ready(name, p)
+
+    def finish(self, name, p):
+        with self.lock:
+            state = self.pending.get(name)
+            if not state or state["p"] is not p:
+                return None
+            del self.pending[name]
+        if state["timer"]:
+            state["timer"].cancel()
+        if state["listener"] in state["pipeline"].listeners:
+            state["pipeline"].listeners.remove(state["listener"])
+        return time.monotonic() - state["started"], state["label"]
+
+    def observe(self, server_type, elapsed, label=None):
+        with self.lock:
+            self.histograms.setdefault(server_type, Histogram(STARTUP_BUCKETS)).observe(elapsed)
+            if label:
+                variants = self.variants.setdefault(server_type, {})
+                variants.setdefault(label, Histogram(STARTUP_BUCKETS)).observe(elapsed)
+
+    def mark_ready(self, name, p):
+        finished = self.finish(name, p)
+        if finished is None:
+            return
+        elapsed, label = finished
+        self.observe(server_type_of(name), elapsed, label)
+        logging.info(f"{name} ready after {elapsed:.2f}s")
+        self.supervisor.update(name, p.pid, readiness="ready", time_to_ready=round(elapsed, 3))
+
+    def mark_failed(self, name, p, reason):
+        finished = self.finish(name, p)
+        if finished is None:
+            return
+        elapsed = finished[0]
+        logging.warning(f"{name} failed readiness ({reason}) after {elapsed:.2f}s")
+        self.supervisor.update(name, p.pid, readiness="failed", readiness_error=reason)
+
+    def on_exit(self, name):
+        with self.lock:
+            state = self.pending.get(name)
+        if state and state["p"].poll() is not None:
+            self.mark_failed(name, state["p"], "exited")
+
+    def report(self):
+        with self.lock:
+            return {server_type: histogram.to_dict() for server_type, histogram in self.histograms.items()}
+
+    def variant_report(self, server_type):
+        with self.lock:
+            return {label: histogram.to_dict() for label, histogram in self.variants.get(server_type, {}).items()}
+
+class JvmProfileStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.overrides = {}
+
+    def ensure_file(self):
+        if os.path.exists(self.path):
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("# Overrides for the built-in JVM profiles and admission settings.\n")
+            f.write("# Only keys set here replace the defaults; GET /api/admission shows the effective values.\n")
+            f.write("# warm_pool members run the full server and register with the network while waiting, so players can be routed to them before they are claimed.\n")
+            yaml.dump({"admission": {}, "profiles": {}}, f, default_flow_style=False, sort_keys=False)
+
+    def load(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return {}
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self.lock:
+            if stamp == self.stamp:
+                return self.overrides
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = yaml.safe_load(f) or {}
+                if not isinstance(data, dict):
+                    raise ValueError("expected a mapping")
+                self.overrides = data
+            except Exception as e:
+                logging.error(f"Error loading {self.path}, keeping previous profiles: {str(e)}")
+            self.stamp = stamp
+            return self.overrides
+
+    def profile(self, name):
+        profiles = self.load().get("profiles") or {}
+        server_type = server_type_of(name)
+        layers = ["default"]
+        if any(server_type == s.value for s in ServiceType):
+            layers.append("services")
+        layers.append(server_type)
+        settings = {}
+        for layer in layers:
+            settings.update(JVM_PROFILES.get(layer, {}))
+            settings.update(profiles.get(layer) or {})
+        return settings
+
+    def admission_settings(self):
+        settings = dict(ADMISSION_SETTINGS)
+        settings.update(self.load().get("admission") or {})
+        return settings
+
+    def java_options(self, name):
+        profile = self.profile(name)
+        options = []
+        if profile.get("heap_min"):
+            options.append(f"-Xms{profile['heap_min']}")
+        if profile.get("heap_max"):
+            options.append(f"-Xmx{profile['heap_max']}")
+        gc = profile.get("gc")
+        if gc:
+            if gc not in JVM_GC_FLAGS:
+                raise ValueError(f"Unknown GC {gc} for {name}, expected one of {', '.join(JVM_GC_FLAGS)}")
+            options.append(JVM_GC_FLAGS[gc])
+        if profile.get("parallel_gc_threads"):
+            options.append(f"-XX:ParallelGCThreads={int(profile['parallel_gc_threads'])}")
+        if profile.get("conc_gc_threads"):
+            options.append(f"-XX:ConcGCThreads={int(profile['conc_gc_threads'])}")
+        if profile.get("active_processor_count"):
+            options.append(f"-XX:ActiveProcessorCount={int(profile['active_processor_count'])}")
+        options.extend(str(flag) for flag in profile.get("extra_flags") or [])
+        return options
+
+    def memory_footprint(self, name):
+        profile = self.profile(name)
+        overhead = parse_size(profile.get("overhead") or 0)
+        heap_max = parse_size(profile["heap_max"]) if profile.get("heap_max") else 0
+        heap_min = parse_size(profile["heap_min"]) if profile.get("heap_min") else 0
+        return heap_max + overhead, heap_min + overhead
+
+class AdmissionError(Exception):
+    pass
+
+class AdmissionQueued(Exception):
+    pass
+
+class MemoryAdmission:
+    CGROUP_V2 = ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current")
+    CGROUP_V1 = ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes")
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.cond = threading.Condition()
+        self.reservations = {}
+        self.waiting = 0
+        self.waiters = set()
+        self.cancelled = set()
+        self.stats = {"admitted": 0, "queued": 0, "refused": 0}
+        self.evict = None
+
+    @staticmethod
+    def read_meminfo():
+        info = {}
+        try:
+            with open("/proc/meminfo", 'r') as f:
+                for line in f:
+                    key, _, rest = line.partition(':')
+                    fields = rest.split()
+                    if fields:
+                        info[key] = int(fields[0]) * 1024
+        except OSError:
+            pass
+        return info
+
+    @classmethod
+    def read_cgroup(cls):
+        for limit_path, usage_path in (cls.CGROUP_V2, cls.CGROUP_V1):
+            try:
+                with open(limit_path, 'r') as f:
+                    raw = f.read().strip()
+                with open(usage_path, 'r') as f:
+                    usage = int(f.read().strip())
+            except (OSError, ValueError):
+                continue
+            if raw == "max" or int(raw) >= 1 << 60:
+                return None, usage
+            return int(raw), usage
+        return None, None
+
+    def host_memory(self):
+        info = self.read_meminfo()
+        total = info.get("MemTotal")
+        available = info.get("MemAvailable", info.get("MemFree"))
+        limit, usage = self.read_cgroup()
+        if limit is not None:
+            total = limit if total is None else min(total, limit)
+            headroom = max(limit - (usage or 0), 0)
+            available = headroom if available is None else min(available, headroom)
+        return total, available, limit
+
+    def check(self, reserve_bytes, floor_bytes, settings):
+        total, available, _ = self.host_memory()
+        if total is None:
+            return None
+        reserve = parse_size(settings.get("reserve") or 0)
+        committed = sum(self.reservations.values())
+        budget = total - reserve
+        if committed + reserve_bytes > budget:
+            return f"would commit {(committed + reserve_bytes) // 1048576}M of a {budget // 1048576}M budget"
+        if available is not None and floor_bytes > available - reserve:
+            return f"needs {floor_bytes // 1048576}M but only {max(available - reserve, 0) // 1048576}M is available"
+        return None
+
+    def admit(self, name, queue=True, wait=True):
+        settings = self.profiles.admission_settings()
+        reserve_bytes, floor_bytes = self.profiles.memory_footprint(name)
+        with self.cond:
+            self.reservations.pop(name, None)
+            if not settings.get("enabled", True):
+                self.reservations[name] = reserve_bytes
+                self.stats["admitted"] += 1
+                return
+            if queue and not wait:
+                reason = self.check(reserve_bytes, floor_bytes, settings)
+                if reason is None:
+                    self.reservations[name] = reserve_bytes
+                    self.stats["admitted"] += 1
+                    return
+                if settings.get("mode") == "refuse" and not self.evict:
+                    self.stats["refused"] += 1
+                    logging.warning(f"Refused launch of {name}: {reason}")
+                    raise AdmissionError(f"Not enough memory to start {name}: {reason}")
+                raise AdmissionQueued(f"Launch of {name} queued: {reason}")
+            deadline = time.monotonic() + float(settings.get("queue_timeout") or 0)
+            queued = False
+            evicting = False
+            while True:
+                if name in self.cancelled:
+                    self.cancelled.discard(name)
+                    self.waiters.discard(name)
+                    self.waiting -= 1
+                    raise AdmissionError(f"Queued launch of {name} was cancelled")
+                reason = self.check(reserve_bytes, floor_bytes, settings)
+                if reason is None:
+                    self.reservations[name] = reserve_bytes
+                    self.stats["admitted"] += 1
+                    if queued:
+                        self.waiters.discard(name)
+                        self.waiting -= 1
+                        logging.info(f"Admitted queued launch of {name}")
+                    return
+                if queue and not evicting and self.evict and self.evict(name):
+                    evicting = True
+                    deadline = max(deadline, time.monotonic() + WARM_EVICTION_WAIT)
+                remaining = deadline - time.monotonic()
+                if (settings.get("mode") == "refuse" and not evicting) or not queue or remaining <= 0:
+                    if queued:
+                        self.waiters.discard(name)
+                        self.waiting -= 1
+                    self.stats["refused"] += 1
+                    logging.warning(f"Refused launch of {name}: {reason}")
+                    raise AdmissionError(f"Not enough memory to start {name}: {reason}")
+                if not queued:
+                    queued = True
+                    self.waiters.add(name)
+                    self.waiting += 1
+                    self.stats["queued"] += 1
+                    logging.info(f"Queued launch of {name}: {reason}")
+                self.cond.wait(min(remaining, 1.0))
+
+    def release(self, name):
+        with self.cond:
+            if self.reservations.pop(name, None) is not None:
+                self.cond.notify_all()
+
+    def cancel(self, name):
+        with self.cond:
+            if name not in self.waiters:
+                return False
+            self.cancelled.add(name)
+            self.cond.notify_all()
+            return True
+
+    def rename(self, old, new):
+        with self.cond:
+            if old in self.reservations:
+                self.reservations[new] = self.reservations.pop(old)
+
+    def adopt(self, name):
+        reserve_bytes, _ = self.profiles.memory_footprint(name)
+        with self.cond:
+            self.reservations[name] = reserve_bytes
+
+    def report(self):
+        total, available, limit = self.host_memory()
+        with self.cond:
+            return {
+                "settings": self.profiles.admission_settings(),
+                "total_bytes": total,
+                "available_bytes": available,
+                "cgroup_limit_bytes": limit,
+                "committed_bytes": sum(self.reservations.values()),
+                "reservations": dict(self.reservations),
+                "waiting": self.waiting,
+                **self.stats
+            }
+
+class CdsArchiveManager:
+    def __init__(self, starter):
+        self.starter = starter
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.status = {}
+        self.queue = collections.deque()
+        self.forced = set()
+        self.worker = None
+        self.jvm_keys = {}
+
+    @staticmethod
+    def is_game_server(name):
+        server_type = server_type_of(name)
+        return any(server_type == t for _, t in ALL_SERVER_TYPES)
+
+    def jvm_key(self, java):
+        key = self.jvm_keys.get(java)
+        if key is None:
+            path = os.path.realpath(shutil.which(java) or java)
+            try:
+                st = os.stat(path)
+                key = hashlib.sha256(f"{path}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:8]
+            except OSError:
+                key = "unknown"
+            self.jvm_keys[java] = key
+        return key
+
+    def archive_path(self, server_type, jar, digest, java="java"):
+        return os.path.join(os.path.dirname(jar), "cds", f"{server_type}-{digest[:16]}-{self.jvm_key(java)}.jsa")
+
+    def options(self, name, cmd):
+        artifact = self.starter.artifacts.get(name)
+        if not CDS_SETTINGS["enabled"] or not self.is_game_server(name) or not artifact or not artifact["sha256"]:
+            return [], None
+        archive = self.archive_path(server_type_of(name), artifact["jar"], artifact["sha256"], cmd[0])
+        if os.path.isfile(archive):
+            return [f"-XX:SharedArchiveFile={archive}"], "cds"
+        with self.lock:
+            if not CDS_SETTINGS["train_on_launch"] or archive in self.in_flight.values():
+                return [], "cold"
+            os.makedirs(os.path.dirname(archive), exist_ok=True)
+            self.in_flight[name] = archive
+        logging.info(f"No CDS archive for {name}, dumping one when it exits")
+        return [f"-XX:ArchiveClassesAtExit={archive}.tmp"], "cold"
+
+    def rename(self, old, new):
+        with self.lock:
+            if old in self.in_flight:
+                self.in_flight[new] = self.in_flight.pop(old)
+
+    def promote(self, server_type, archive):
+        tmp = archive + ".tmp"
+        if not os.path.isfile(tmp) or os.path.getsize(tmp) == 0:
+            return False
+        os.replace(tmp, archive)
+        prefix = f"{server_type}-"
+        for entry in os.scandir(os.path.dirname(archive)):
+            if entry.name.startswith(prefix) and entry.name.endswith(".jsa") and entry.path != archive and entry.name[len(prefix):].count("-") == 1:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        logging.info(f"Stored CDS archive {archive} ({os.path.getsize(archive)} bytes)")
+        return True
+
+    def on_exit(self, name, exit_code):
+        with self.lock:
+            archive = self.in_flight.pop(name, None)
+        if archive is None:
+            return
+        if exit_code in CDS_SETTINGS["clean_exit_codes"]:
+            self.promote(server_type_of(name), archive)
+        elif os.path.exists(archive + ".tmp"):
+            os.remove(archive + ".tmp")
+
+    def train_async(self, server_types, force=False):
+        with self.lock:
+            for server_type in server_types:
+                if server_type not in self.queue and self.status.get(server_type, {}).get("state") not in ("queued", "training"):
+                    self.queue.append(server_type)
+                    self.status.setdefault(server_type, {})["state"] = "queued"
+                if force and server_type in self.queue:
+                    self.forced.add(server_type)
+            if not self.worker or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.drain, daemon=True)
+                self.worker.start()
+
+    def drain(self):
+        while True:
+            with self.lock:
+                if not self.queue:
+                    return
+                server_type = self.queue.popleft()
+                force = server_type in self.forced
+                self.forced.discard(server_type)
+            try:
+                self.train(server_type, force)
+            except Exception as e:
+                logging.error(f"CDS training run for {server_type} failed: {str(e)}")
+                self.set_status(server_type, state="failed", error=str(e))
+
+    def set_status(self, server_type, **fields):
+        with self.lock:
+            self.status.setdefault(server_type, {}).update(fields)
+
+    def train(self, server_type, force=False):
+        starter = self.starter
+        jar = os.path.join(starter.gameserver_dir, "HypixelCore.jar")
+        digest = starter.artifact_store.hash_file(jar)
+        archive = self.archive_path(server_type, jar, digest)
+        if os.path.isfile(archive) and not force:
+            self.set_status(server_type, state="ready", error=None)
+            return
+        os.makedirs(os.path.dirname(archive), exist_ok=True)
+        try:
+            cmd = ["java"] + starter.profiles.java_options(server_type) + [f"-XX:ArchiveClassesAtExit={archive}.tmp", "-jar", "HypixelCore.jar", server_type]
+            self.set_status(server_type, state="training", error=None, started_at=time.time())
+            if starter.admission:
+                starter.admission.admit(server_type)
+            workspace = f"CDS_{server_type}"
+            try:
+                p = subprocess.Popen(java_command(cmd), cwd=starter.gameserver_cwd(workspace), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                pipeline = LogPipeline(os.path.join(starter.logs_dir, f"cds-{server_type}.log"), **get_log_retention(server_type))
+                probe = get_readiness_probe(server_type)
+                pattern = re.compile(probe["log"])
+                ready = threading.Event()
+                pipeline.listeners.append(lambda line: pattern.search(line) and ready.set())
+                started = time.monotonic()
+                pipeline.attach(p.stdout)
+                deadline = started + CDS_SETTINGS["training_timeout"]
+                while not ready.wait(0.25):
+                    if probe.get("any") and probe.get("port") == "listen" and listening_ports(p.pid):
+                        ready.set()
+                        break
+                    if p.poll() is not None or time.monotonic() > deadline:
+                        break
+                elapsed = time.monotonic() - started
+                if ready.is_set():
+                    if starter.readiness:
+                        starter.readiness.observe(server_type, elapsed, "cold")
+                    time.sleep(CDS_SETTINGS["training_warmup"])
+                if p.poll() is None:
+                    p.terminate()
+                    try:
+                        p.wait(timeout=60)
+                    except subprocess.TimeoutExpired:
+                        p.kill()
+                        p.wait()
+            finally:
+                if starter.admission:
+                    starter.admission.release(server_type)
+                if starter.workspaces:
+                    starter.workspaces.release(workspace)
+            if not ready.is_set():
+                raise RuntimeError(f"server did not become ready (exit code {p.returncode})")
+            if p.returncode not in CDS_SETTINGS["clean_exit_codes"] or not self.promote(server_type, archive):
+                raise RuntimeError(f"no archive was written (exit code {p.returncode})")
+            self.set_status(server_type, state="ready", training_seconds=round(elapsed, 3), built_at=time.time())
+        finally:
+            with self.lock:
+                dumping = archive in self.in_flight.values()
+            if not dumping and os.path.exists(archive + ".tmp"):
+                os.remove(archive + ".tmp")
+
+    def report(self):
+        jar = os.path.join(self.starter.gameserver_dir, "HypixelCore.jar")
+        try:
+            digest = self.starter.artifact_store.hash_file(jar)
+        except OSError:
+            digest = None
+        result = {}
+        for _, server_type in ALL_SERVER_TYPES:
+            archive = self.archive_path(server_type, jar, digest) if digest else None
+            exists = bool(archive and os.path.isfile(archive))
+            variants = self.starter.readiness.variant_report(server_type) if self.starter.readiness else {}
+            cold, cds = variants.get("cold"), variants.get("cds")
+            with self.lock:
+                status = dict(self.status.get(server_type, {}))
+            result[server_type] = {
+                **status,
+                "archive": archive if exists else None,
+                "archive_bytes": os.path.getsize(archive) if exists else None,
+                "cold": cold,
+                "cds": cds,
+                "speedup": round(cold["mean"] / cds["mean"], 2) if cold and cds and cds["mean"] else None,
+            }
+        return result
+
+class InstanceWorkspaces:
+    def __init__(self, template):
+        self.template = template
+        self.root = os.path.join(template, WORKSPACE_DIRNAME)
+        self.lock = threading.Lock()
+        self.reflink = None
+        self.workspaces = {}
+        self.trash = itertools.count(1)
+
+    def path_of(self, name):
+        return os.path.join(self.root, name)
+
+    def template_path(self, path):
+        rel = os.path.relpath(path, self.root)
+        if rel.startswith(os.pardir) or os.sep not in rel:
+            return path
+        return os.path.join(self.template, rel.split(os.sep, 1)[1])
+
+    def probe(self):
+        os.makedirs(self.root, exist_ok=True)
+        src = os.path.join(self.root, f".probe-{os.getpid()}")
+        dst = src + ".clone"
+        try:
+            with open(src, "wb") as f:
+                f.write(b"probe")
+            self.reflink = clone_file(src, dst, allow_hardlink=False) == "reflink"
+        except OSError:
+            self.reflink = False
+        finally:
+            for path in (src, dst):
+                if os.path.lexists(path):
+                    os.remove(path)
+        logging.info(f"Game server workspaces under {self.root} use {'reflinks' if self.reflink else 'hardlinks'}")
+
+    def shareable(self, rel, world):
+        if world or any(fnmatch.fnmatch(rel, pattern) for pattern in WORKSPACE_PRIVATE_PATTERNS):
+            return False
+        return any(fnmatch.fnmatch(rel, pattern) for pattern in WORKSPACE_SHARED_PATTERNS)
+
+    def materialize(self, src, dst, rel, world=False):
+        if os.path.islink(src):
+            os.symlink(os.readlink(src), dst)
+            return "symlink"
+        if self.reflink or not self.shareable(rel, world):
+            return clone_file(src, dst, allow_hardlink=False)
+        try:
+            mode = os.stat(src).st_mode
+            if mode & 0o222:
+                os.chmod(src, mode & ~0o222)
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            return clone_file(src, dst, allow_hardlink=False)
+
+    def provision(self, name):
+        with self.lock:
+            if self.reflink is None:
+                self.probe()
+            path = self.path_of(name)
+            self.discard(path)
+            started = time.perf_counter()
+            tmp = f"{path}.tmp-{os.getpid()}"
+            if os.path.lexists(tmp):
+                shutil.rmtree(tmp)
+            methods = collections.Counter()
+            worlds = set()
+            try:
+                for current, dirs, names in os.walk(self.template):
+                    rel = os.path.relpath(current, self.template)
+                    if rel == os.curdir:
+                        dirs[:] = [d for d in dirs if d not in WORKSPACE_SKIP]
+                        rel = ""
+                    world = os.path.dirname(current) in worlds
+                    if world or WORKSPACE_WORLD_MARKERS.intersection(names) or WORKSPACE_WORLD_MARKERS.intersection(dirs):
+                        worlds.add(current)
+                        world = True
+                    target = os.path.join(tmp, rel)
+                    os.makedirs(target, exist_ok=True)
+                    shutil.copymode(current, target)
+                    for filename in names:
+                        methods[self.materialize(os.path.join(current, filename), os.path.join(target, filename), os.path.join(rel, filename).replace(os.sep, "/"), world)] += 1
+                os.rename(tmp, path)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.workspaces[name] = {"path": path, "created_at": time.time(), "provision_ms": elapsed_ms, "methods": dict(methods)}
+        logging.info(f"Provisioned workspace for {name} in {elapsed_ms}ms ({', '.join(f'{n} {m}' for m, n in sorted(methods.items()))})")
+        return path
+
+    def discard(self, path):
+        if not os.path.lexists(path):
+            return
+        trash = f"{path}.trash-{os.getpid()}-{next(self.trash)}"
+        os.rename(path, trash)
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def rename(self, old, new):
+        with self.lock:
+            source = self.path_of(old)
+            if not os.path.isdir(source):
+                return None
+            target = self.path_of(new)
+            self.discard(target)
+            os.rename(source, target)
+            entry = self.workspaces.pop(old, {})
+            self.workspaces[new] = dict(entry, path=target)
+            return target
+
+    def adopt(self, name):
+        path = self.path_of(name)
+        if os.path.isdir(path):
+            with self.lock:
+                self.workspaces[name] = {"path": path, "created_at": os.stat(path).st_mtime, "adopted": True}
+
+    def release(self, name):
+        with self.lock:
+            self.workspaces.pop(name, None)
+            path = self.path_of(name)
+            if not os.path.lexists(path):
+                return False
+            self.discard(path)
+        logging.info(f"Released workspace for {name}")
+        return True
+
+    def prune(self, keep=()):
+        if not os.path.isdir(self.root):
+            return []
+        removed = []
+        with self.lock:
+            for entry in os.listdir(self.root):
+                if entry in keep:
+                    continue
+                if ".tmp-" in entry or ".trash-" in entry or entry.startswith(WARM_PREFIX) or entry.startswith("CDS_"):
+                    shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+                    removed.append(entry)
+        if removed:
+            logging.info(f"Pruned {len(removed)} stale game server workspaces")
+        return removed
+
+    def usage(self, path):
+        files = shared = private_bytes = 0
+        for current, _, names in os.walk(path):
+            for filename in names:
+                try:
+                    st = os.lstat(os.path.join(current, filename))
+                except OSError:
+                    continue
+                files += 1
+                if st.st_nlink > 1:
+                    shared += 1
+                else:
+                    private_bytes += st.st_size
+        return {"files": files, "shared": shared, "private_bytes": private_bytes}
+
+    def report(self):
+        with self.lock:
+            workspaces = {name: dict(entry) for name, entry in self.workspaces.items()}
+        for name, entry in workspaces.items():
+            entry.update(self.usage(entry["path"]))
+        return {
+            "enabled": GAMESERVER_WORKSPACES,
+            "root": self.root,
+            "mode": None if self.reflink is None else ("reflink" if self.reflink else "hardlink"),
+            "shared_patterns": WORKSPACE_SHARED_PATTERNS,
+            "private_patterns": WORKSPACE_PRIVATE_PATTERNS,
+            "workspaces": workspaces,
+        }
+
+class WarmPool:
+    def __init__(self, starter, proc_mgr, supervisor, restart_manager):
+        self.starter = starter
+        self.proc_mgr = proc_mgr
+        self.supervisor = supervisor
+        self.restart_manager = restart_manager
+        self.lock = threading.Lock()
+        self.members = collections.defaultdict(list)
+        self.retiring = set()
+        self.failures = collections.Counter()
+        self.retry_at = {}
+        self.stats = {}
+        self.sequence = itertools.count(1)
+        self.wake = threading.Event()
+        self.enabled = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    @staticmethod
+    def is_member(name):
+        return name.startswith(WARM_PREFIX)
+
+    def target_size(self, server_type):
+        return max(int(self.starter.profiles.profile(server_type).get("warm_pool") or 0), 0)
+
+    def get_stats(self, server_type):
+        stats = self.stats.get(server_type)
+        if stats is None:
+            stats = {"claims": 0, "hits": 0, "misses": 0, "launched": 0, "failed": 0, "claim_latency_ms": Histogram(WARM_CLAIM_BUCKETS_MS)}
+            self.stats[server_type] = stats
+        return stats
+
+    def start(self):
+        self.enabled = True
+        self.thread.start()
+
+    def shutdown(self):
+        self.enabled = False
+        self.wake.set()
+
+    def run(self):
+        while self.enabled:
+            try:
+                self.refill()
+            except Exception as e:
+                logging.error(f"Error refilling warm pool: {str(e)}")
+            self.wake.wait(WARM_POOL_CHECK_INTERVAL)
+            self.wake.clear()
+
+    def refill(self):
+        if not os.path.isfile(os.path.join(self.starter.gameserver_dir, "HypixelCore.jar")):
+            return
+        for _, server_type in ALL_SERVER_TYPES:
+            target = self.target_size(server_type)
+            with self.lock:
+                members = list(self.members[server_type])
+                waiting = time.time() < self.retry_at.get(server_type, 0)
+            for name in members:
+                if (self.supervisor.get(name) or {}).get("readiness") == "failed":
+                    self.on_failed(name)
+            for name in members[target:]:
+                self.retire(name)
+            for _ in range(target - len(members)):
+                if waiting or not self.enabled or not self.launch(server_type):
+                    break
+
+    def launch(self, server_type):
+        name = f"{WARM_PREFIX}{server_type}_{next(self.sequence)}"
+        self.restart_manager.set_policy(name, "never")
+        try:
+            self.starter.launch(name, ["java", "-jar", "HypixelCore.jar", server_type], self.starter.gameserver_cwd(name), f"{name}.log", queue=False)
+        except (AdmissionError, PortAllocationError) as e:
+            self.restart_manager.forget(name)
+            if self.starter.workspaces:
+                self.starter.workspaces.release(name)
+            if self.starter.registry:
+                self.starter.registry.forget(name)
+            with self.lock:
+                self.retry_at[server_type] = time.time() + WARM_POOL_ADMISSION_RETRY
+            logging.info(f"Not refilling warm pool for {server_type}: {str(e)}")
+            return False
+        with self.lock:
+            self.members[server_type].append(name)
+            stats = self.get_stats(server_type)
+            stats["launched"] += 1
+            first = stats["launched"] == 1
+        if first:
+            logging.warning(f"Warm {server_type} instances register with the network while waiting; players can be routed to them before they are claimed")
+        return True
+
+    def retire(self, name):
+        p = self.proc_mgr.get(name)
+        if p and p.poll() is None:
+            logging.info(f"Stopping surplus warm instance {name}")
+            self.supervisor.mark_stopping(name)
+            p.terminate()
+
+    def evict(self, name):
+        if self.is_member(name):
+            return False
+        with self.lock:
+            members = [n for names in self.members.values() for n in names]
+        for n in reversed(members):
+            entry = self.supervisor.get(n)
+            if entry and entry["running"] and entry["state"] != "stopping":
+                with self.lock:
+                    self.retry_at[server_type_of(n)] = time.time() + WARM_POOL_ADMISSION_RETRY
+                logging.info(f"Evicting warm instance {n} to make room for {name}")
+                self.retire(n)
+                return True
+        return False
+
+    def on_exit(self, name, entry):
+        server_type = server_type_of(name)
+        with self.lock:
+            if name not in self.members[server_type]:
+                return
+            self.members[server_type].remove(name)
+            if name in self.retiring:
+                self.retiring.discard(name)
+            elif entry["state"] != "stopped":
+                self.get_stats(server_type)["failed"] += 1
+                self.failures[server_type] += 1
+                self.retry_at[server_type] = time.time() + min(2 ** self.failures[server_type], WARM_POOL_BACKOFF_MAX)
+        self.release(name)
+
+    def release(self, name):
+        self.proc_mgr.discard(name)
+        self.supervisor.forget(name)
+        self.restart_manager.forget(name)
+        self.starter.artifacts.pop(name, None)
+        spec = self.starter.specs.pop(name, None)
+        if spec:
+            log_path = os.path.join(self.starter.logs_dir, spec[2])
+            self.starter.pipelines.pop(log_path, None)
+            try:
+                os.remove(log_path)
+            except OSError:
+                pass
+        if self.starter.workspaces:
+            self.starter.workspaces.release(name)
+        if self.starter.registry:
+            self.starter.registry.forget(name)
+        self.wake.set()
+
+    def on_ready(self, name):
+        with self.lock:
+            self.failures.pop(server_type_of(name), None)
+
+    def on_failed(self, name):
+        server_type = server_type_of(name)
+        with self.lock:
+            if name not in self.members[server_type] or name in self.retiring:
+                return
+            self.retiring.add(name)
+            self.get_stats(server_type)["failed"] += 1
+            self.failures[server_type] += 1
+            self.retry_at[server_type] = time.time() + min(2 ** self.failures[server_type], WARM_POOL_BACKOFF_MAX)
+        logging.warning(f"Warm instance {name} never became ready, replacing it")
+        self.retire(name)
+
+    def claim(self, server_type, instance_name):
+        started = time.perf_counter()
+        with self.lock:
+            stats = self.get_stats(server_type)
+            stats["claims"] += 1
+            candidates = [name for name in self.members[server_type] if (self.supervisor.get(name) or {}).get("readiness") == "ready"]
+            if not candidates:
+                stats["misses"] += 1
+                self.wake.set()
+                return False
+            name = candidates[0]
+            self.members[server_type].remove(name)
+        if not self.supervisor.rename(name, instance_name):
+            p = self.proc_mgr.get(name)
+            alive = p is not None and p.poll() is None
+            with self.lock:
+                stats["misses"] += 1
+                if alive:
+                    self.members[server_type].append(name)
+                    self.retiring.add(name)
+            if alive:
+                self.retire(name)
+            else:
+                self.release(name)
+            self.wake.set()
+            return False
+        self.proc_mgr.rename(name, instance_name)
+        self.starter.rename(name, instance_name, f"{instance_name}.log")
+        self.restart_manager.forget(name)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            stats["hits"] += 1
+            stats["claim_latency_ms"].observe(elapsed_ms)
+        logging.info(f"Claimed warm instance {name} as {instance_name} in {elapsed_ms:.1f}ms")
+        self.wake.set()
+        return True
+
+    def report(self):
+        with self.lock:
+            members = {server_type: list(names) for server_type, names in self.members.items()}
+            stats = {server_type: dict(s, claim_latency_ms=s["claim_latency_ms"].to_dict()) for server_type, s in self.stats.items()}
+        result = {}
+        for _, server_type in ALL_SERVER_TYPES:
+            target = self.target_size(server_type)
+            names = members.get(server_type, [])
+            if not target and not names and server_type not in stats:
+                continue
+            states = [(self.supervisor.get(name) or {}).get("readiness") for name in names]
+            entry = stats.get(server_type) or {"claims": 0, "hits": 0, "misses": 0, "launched": 0, "failed": 0, "claim_latency_ms": Histogram(WARM_CLAIM_BUCKETS_MS).to_dict()}
+            result[server_type] = {
+                **entry,
+                "target": target,
+                "ready": states.count("ready"),
+                "starting": len(names) - states.count("ready"),
+                "members": names,
+                "advertised": True,
+                "hit_rate": round(entry["hits"] / entry["claims"], 3) if entry["claims"] else None,
+            }
+        return result
+
+class ServiceStarter:
+    def __init__(self, base_dir, config_dir, proxy_dir, limbo_dir, services_dir, gameserver_dir, logs_dir, proc_mgr, artifact_store=None):
+        self.base_dir = base_dir
+        self.config_dir = config_dir
+        self.proxy_dir = proxy_dir
+        self.limbo_dir = limbo_dir
+        self.services_dir = services_dir
+        self.gameserver_dir = gameserver_dir
+        self.logs_dir = logs_dir
+        self.proc_mgr = proc_mgr
+        self.pipelines = {}
+        self.specs = {}
+        self.artifact_store = artifact_store
+        self.artifacts = {}
+        self.readiness = None
+        self.profiles = None
+        self.admission = None
+        self.cds = None
+        self.workspaces = None
+        self.registry = None
+        self.spool_dir = None
+        self.spool_ok = None
+        self.queued = {}
+
+    def configured_port(self, name):
+        try:
+            if name == "Proxy":
+                return int(toml.load(os.path.join(self.proxy_dir, "velocity.toml"))["bind"].rsplit(":", 1)[1])
+            if name == "NanoLimbo":
+                with open(os.path.join(self.limbo_dir, "settings.yml"), "r") as f:
+                    return int(yaml.safe_load(f)["bind"]["port"])
+        except FileNotFoundError:
+            pass
+        except (OSError, KeyError, IndexError, TypeError, ValueError, toml.TomlDecodeError, yaml.YAMLError) as e:
+            logging.warning(f"Could not read the {name} port from its config: {str(e)}")
+        return None
+
+    def spooling(self):
+        if self.spool_ok is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            probe = os.path.join(self.spool_dir, f".probe-{os.getpid()}")
+            try:
+                with open(probe, "wb") as f:
+                    f.write(b"\0" * LOG_SPOOL_PUNCH_BYTES * 2)
+                    f.flush()
+                    punch_hole(f.fileno(), 0, LOG_SPOOL_PUNCH_BYTES)
+                self.spool_ok = True
+            except OSError as e:
+                logging.warning(f"{self.spool_dir} cannot free consumed output ({str(e)}); child output goes through pipes and is not kept across API restarts")
+                self.spool_ok = False
+            finally:
+                if os.path.exists(probe):
+                    os.remove(probe)
+        return self.spool_ok
+
+    def spool_path(self, pid, start_ticks):
+        return os.path.join(self.spool_dir, f"{pid}-{start_ticks}.out")
+
+    def open_pipeline(self, name, log_name):
+        log_path = os.path.join(self.logs_dir, log_name)
+        pipeline = LogPipeline(log_path, **get_log_retention(name))
+        if log_path in self.pipelines:
+            pipeline.base = self.pipelines[log_path].base
+        self.pipelines[log_path] = pipeline
+        return pipeline
+
+    def gameserver_cwd(self, name):
+        if self.workspaces:
+            return self.workspaces.provision(name)
+        return self.gameserver_dir
+
+    def record_artifact(self, name, cmd, cwd):
+        if not self.artifact_store or "-jar" not in cmd:
+            return
+        jar = os.path.join(cwd, cmd[cmd.index("-jar") + 1])
+        if self.workspaces:
+            jar = self.workspaces.template_path(jar)
+        try:
+            digest = self.artifact_store.hash_file(jar)
+        except OSError as e:
+            logging.warning(f"Could not hash {jar} for {name}: {str(e)}")
+            digest = None
+        self.artifacts[name] = {"jar": jar, "sha256": digest, "launched_at": time.time()}
+
+    def launch(self, name, cmd, cwd, log_name, queue=True, wait=True):
+        if not wait and name in self.queued:
+            raise AdmissionQueued(f"Launch of {name} is already queued")
+        self.specs[name] = (cmd, cwd, log_name)
+        self.record_artifact(name, cmd, cwd)
+        if self.profiles:
+            cmd = cmd[:1] + self.profiles.java_options(name) + cmd[1:]
+        cds_label = None
+        if self.cds:
+            cds_options, cds_label = self.cds.options(name, cmd)
+            cmd = cmd[:1] + cds_options + cmd[1:]
+        if self.admission:
+            try:
+                self.admission.admit(name, queue, wait)
+            except AdmissionQueued as e:
+                logging.info(str(e))
+                self.queued[name] = time.time()
+                threading.Thread(target=self.launch_queued, args=(name,), daemon=True).start()
+                raise
+        argv = java_command(cmd)
+        port = self.configured_port(name)
+        spool = None
+        stdout = subprocess.PIPE
+        try:
+            if self.registry:
+                self.registry.reserve(name, port)
+            if self.spool_dir and self.spooling():
+                spool = os.path.join(self.spool_dir, f"launch-{time.time_ns()}-{threading.get_ident()}.out")
+                stdout = open(spool, "ab")
+            try:
+                p = subprocess.Popen(
+                    argv,
+                    cwd=cwd,
+                    stdout=stdout,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+            finally:
+                if spool:
+                    stdout.close()
+            start_ticks = proc_start_ticks(p.pid, live=False)
+        except Exception:
+            if spool and os.path.exists(spool):
+                os.remove(spool)
+            if self.admission:
+                self.admission.release(name)
+            if self.cds:
+                self.cds.on_exit(name, None)
+            if self.registry:
+                self.registry.mark_exited(name)
+            raise
+        if self.registry:
+            self.registry.record(name, p, start_ticks, argv, self.specs[name][0], cwd, log_name, (self.artifacts.get(name) or {}).get("sha256"))
+        if spool and start_ticks is not None:
+            target = self.spool_path(p.pid, start_ticks)
+            os.rename(spool, target)
+        elif spool:
+            logging.warning(f"Could not read the start time of {name} (PID {p.pid}); its output will not survive an API restart")
+            target = spool
+        pipeline = self.open_pipeline(name, log_name)
+        self.proc_mgr.add(p, name)
+        if self.readiness:
+            self.readiness.begin(name, p, pipeline, cds_label, port)
+        if spool:
+            pipeline.follow(target, p)
+        else:
+            pipeline.attach(p.stdout)
+        return p
+
+    def launch_queued(self, name):
+        try:
+            self.launch(name, *self.specs[name])
+        except Exception as e:
+            logging.warning(f"Queued launch of {name} failed: {str(e)}")
+            if self.workspaces:
+                self.workspaces.release(name)
+        finally:
+            self.queued.pop(name, None)
+
+    def rename(self, old, new, log_name):
+        cmd, cwd, old_log_name = self.specs.pop(old)
+        if self.workspaces:
+            cwd = self.workspaces.rename(old, new) or cwd
+        if self.registry:
+            self.registry.rename(old, new)
+        self.specs[new] = (cmd, cwd, log_name)
+        if old in self.artifacts:
+            self.artifacts[new] = self.artifacts.pop(old)
+        old_path = os.path.join(self.logs_dir, old_log_name)
+        new_path = os.path.join(self.logs_dir, log_name)
+        pipeline = self.pipelines.pop(old_path, None)
+        if pipeline:
+            pipeline.retarget(new_path)
+            self.pipelines[new_path] = pipeline
+        if self.admission:
+            self.admission.rename(old, new)
+        if self.cds:
+            self.cds.rename(old, new)
+
+    def get_pipeline(self, log_path):
+        pipeline = self.pipelines.get(log_path)
+        if pipeline and pipeline.thread and pipeline.thread.is_alive():
+            return pipeline
+        return None
+
+    def start_proxy(self, wait=True):
+        jar = os.path.join(self.proxy_dir, "velocity.jar")
+        if not os.path.isfile(jar):
+            logging.warning("Proxy velocity jar missing")
+            return None
+        return self.launch("Proxy", ["java", "-jar", "velocity.jar"], self.proxy_dir, "velocity.log", wait=wait)
+
+    def start_nanolimbo(self, wait=True):
+        jar = os.path.join(self.limbo_dir, "NanoLimbo.jar")
+        if not os.path.isfile(jar):
+            logging.warning("NanoLimbo jar missing")
+            return None
+        return self.launch("NanoLimbo", ["java", "-jar", "NanoLimbo.jar"], self.limbo_dir, "NanoLimbo.log", wait=wait)
+
+class Inotify:
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        if platform.system().lower() != "linux":
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+
+    def add_watch(self, path, mask):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.paths[wd] = path
+        return wd
+
+    def read_events(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        events = []
+        while ready:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, pos)
+                pos += self.EVENT_HEADER.size
+                name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+                pos += length
+                events.append((self.paths.get(wd), mask, name))
+            ready, _, _ = select.select([self.fd], [], [], 0)
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class LogFollower:
+    def __init__(self, log_path, on_lines, batch_interval=0.2, poll_interval=0.5):
+        self.log_path = log_path
+        self.on_lines = on_lines
+        self.batch_interval = batch_interval
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.base = log_offset_base(log_path)
+        if self.reopen():
+            self.offset = os.fstat(self.file.fileno()).st_size
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        inotify = None
+        try:
+            inotify = Inotify()
+            inotify.add_watch(
+                os.path.dirname(self.log_path),
+                Inotify.IN_MODIFY | Inotify.IN_CREATE | Inotify.IN_MOVED_TO | Inotify.IN_CLOSE_WRITE,
+            )
+        except (OSError, AttributeError) as e:
+            logging.info(f"inotify unavailable for {self.log_path}, polling instead: {str(e)}")
+            if inotify:
+                inotify.close()
+            inotify = None
+        name = os.path.basename(self.log_path)
+        try:
+            while not self.stop_event.is_set():
+                if inotify:
+                    events = inotify.read_events(1.0)
+                    if not any(event_name == name for _, _, event_name in events):
+                        continue
+                else:
+                    self.stop_event.wait(self.poll_interval)
+                self.stop_event.wait(self.batch_interval)
+                self.read_appended()
+        except Exception as e:
+            logging.error(f"Log follower for {self.log_path} stopped: {str(e)}")
+        finally:
+            if inotify:
+                inotify.close()
+            if self.file:
+                self.file.close()
+
+    def reopen(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+        try:
+            self.file = open(self.log_path, 'rb')
+        except FileNotFoundError:
+            self.inode = None
+            return False
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        self.offset = 0
+        return True
+
+    def drain(self, batch, sizes):
+        has_more = True
+        while has_more:
+            lines, self.offset, _, has_more = offload(read_lines_from, self.file, self.offset, LOG_READ_MAX_BYTES, sizes)
+            if not lines:
+                break
+            batch.extend(lines)
+
+    def read_appended(self):
+        batch = []
+        sizes = []
+        start_offset = self.base + self.offset
+        reset = False
+        if self.file:
+            if os.fstat(self.file.fileno()).st_size < self.offset:
+                reset = True
+                self.offset = 0
+                start_offset = self.base
+            self.drain(batch, sizes)
+        try:
+            inode = os.stat(self.log_path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode is not None and inode != self.inode:
+            end = self.base + self.offset
+            followed = self.file is not None
+            pipeline = starter.pipelines.get(self.log_path)
+            rotated = followed and pipeline is not None and pipeline.base in (self.base, end)
+            if self.reopen():
+                if rotated:
+                    self.base = end
+                else:
+                    reset = reset or followed
+                    del batch[:], sizes[:]
+                    self.base = log_offset_base(self.log_path)
+                    start_offset = self.base
+                self.drain(batch, sizes)
+        if batch or reset:
+            self.on_lines(batch, sizes, start_offset, self.base + self.offset, reset)
+
+class ConfigWatcher:
+    WATCH_MASK = Inotify.IN_CLOSE_WRITE | Inotify.IN_MOVED_TO | Inotify.IN_MOVED_FROM | Inotify.IN_CREATE | Inotify.IN_DELETE
+
+    def __init__(self, base_dir, roots, store, on_change, poll_interval=None, debounce=None):
+        self.base_dir = base_dir
+        self.roots = roots
+        self.store = store
+        self.on_change = on_change
+        self.poll_interval = poll_interval or CONFIG_WATCH_POLL_INTERVAL
+        self.debounce = debounce or CONFIG_WATCH_DEBOUNCE
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.known = {}
+        self.hooks = []
+        self.mode = None
+        self.events = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self, prime=()):
+        for path in prime:
+            if self.tracked(path) and os.path.isfile(path):
+                self.check(path, notify=False)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def add_hook(self, pattern, fn):
+        self.hooks.append((pattern, fn))
+
+    def relative(self, path):
+        return os.path.relpath(path, self.base_dir).replace(os.sep, "/")
+
+    def root_of(self, path):
+        for directory, recursive, names in self.roots:
+            parent = os.path.dirname(path)
+            if parent == directory or (recursive and parent.startswith(directory + os.sep)):
+                if names is None or os.path.basename(path) in names:
+                    return directory
+        return None
+
+    def excluded(self, path):
+        relative = self.relative(path)
+        return any(relative == e or relative.startswith(e + "/") for e in CONFIG_WATCH_EXCLUDE)
+
+    def watches_tree(self, path):
+        return not self.excluded(path) and any(recursive and (path == d or path.startswith(d + os.sep)) for d, recursive, _ in self.roots)
+
+    def tracked(self, path):
+        name = os.path.basename(path)
+        if ".tmp" in name or ".batch-" in name or name.startswith("."):
+            return False
+        return name.endswith(CONFIG_WATCH_EXTENSIONS) and self.root_of(path) is not None and not self.excluded(path)
+
+    def directories(self):
+        for directory, recursive, _ in self.roots:
+            if not os.path.isdir(directory):
+                continue
+            yield directory
+            if recursive:
+                for current, dirs, _ in os.walk(directory):
+                    dirs[:] = [d for d in dirs if not self.excluded(os.path.join(current, d))]
+                    for d in dirs:
+                        yield os.path.join(current, d)
+
+    def scan(self):
+        stamps = {}
+        for directory in self.directories():
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and self.tracked(entry.path):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    stamps[entry.path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return stamps
+
+    def run(self):
+        inotify = None
+        try:
+            inotify = Inotify()
+            for directory in self.directories():
+                inotify.add_watch(directory, self.WATCH_MASK)
+        except (OSError, AttributeError) as e:
+            logging.info(f"inotify unavailable for config watcher, polling every {self.poll_interval}s: {str(e)}")
+            if inotify:
+                inotify.close()
+            inotify = None
+        try:
+            if inotify:
+                self.mode = "inotify"
+                self.run_inotify(inotify)
+            else:
+                self.mode = "polling"
+                self.run_polling()
+        except Exception as e:
+            logging.error(f"Config watcher stopped: {str(e)}")
+        finally:
+            if inotify:
+                inotify.close()
+
+    def run_inotify(self, inotify):
+        pending = set()
+        first = None
+        while not self.stop_event.is_set():
+            events = inotify.read_events(self.debounce if pending else 1.0)
+            if pending and (not events or time.monotonic() - first >= CONFIG_WATCH_MAX_DELAY):
+                self.process(pending)
+                pending = set()
+                if not events:
+                    continue
+            if not pending:
+                first = time.monotonic()
+            for directory, mask, name in events:
+                if mask & Inotify.IN_Q_OVERFLOW:
+                    logging.warning("Config watcher queue overflowed, rescanning")
+                    pending.update(self.scan())
+                    pending.update(p for p in self.known if not os.path.exists(p))
+                    continue
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & Inotify.IN_ISDIR:
+                    if mask & (Inotify.IN_CREATE | Inotify.IN_MOVED_TO) and self.watches_tree(path):
+                        for current, dirs, files in os.walk(path):
+                            dirs[:] = [d for d in dirs if not self.excluded(os.path.join(current, d))]
+                            inotify.add_watch(current, self.WATCH_MASK)
+                            pending.update(p for p in (os.path.join(current, f) for f in files) if self.tracked(p))
+                    continue
+                if self.tracked(path):
+                    pending.add(path)
+
+    def run_polling(self):
+        stamps = self.scan()
+        while not self.stop_event.wait(self.poll_interval):
+            current = self.scan()
+            changed = {p for p, stamp in current.items() if stamps.get(p) != stamp}
+            changed.update(p for p in stamps if p not in current)
+            stamps = current
+            if changed:
+                self.process(changed)
+
+    def process(self, paths):
+        changed = []
+        for path in sorted(paths):
+            try:
+                event = self.check(path)
+            except Exception as e:
+                logging.error(f"Error handling config change in {path}: {str(e)}")
+                continue
+            if event:
+                changed.append((path, event))
+        if not changed:
+            return
+        self.on_change(changed)
+        for path, event in changed:
+            for pattern, fn in self.hooks:
+                if fnmatch.fnmatch(event["file"], pattern):
+                    try:
+                        fn(path, event)
+                    except Exception as e:
+                        logging.error(f"Config hook for {pattern} failed: {str(e)}")
+
+    def check(self, path, notify=True):
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            stamp = None
+        with self.lock:
+            old = self.known.get(path)
+        if old is not None and old[0] == stamp:
+            return
+        tree = None
+        error = None
+        if stamp is None:
+            self.store.invalidate(path)
+            with self.lock:
+                self.known.pop(path, None)
+            kind = "deleted"
+        else:
+            try:
+                tree = self.store.get(path)["content"]
+            except Exception as e:
+                self.store.invalidate(path)
+                error = str(e)
+            with self.lock:
+                self.known[path] = (stamp, tree)
+            kind = "modified" if old is not None else "created"
+        if not notify:
+            return None
+        changes = None
+        if old is not None and old[1] is not None and tree is not None:
+            changes = [{"op": op["op"], "path": op["path"]} for op in json_diff(old[1], tree)]
+            if not changes:
+                return None
+        event = {"file": self.relative(path), "event": kind, "changes": changes, "error": error, "time": time.time()}
+        self.events += 1
+        logging.info(f"Config {event['file']} {kind}" + (f" ({len(changes)} change(s))" if changes is not None else ""))
+        return event
+
+    def report(self):
+        with self.lock:
+            tracked = len(self.known)
+        return {"mode": self.mode, "events": self.events, "tracked": tracked, "hooks": [pattern for pattern, _ in self.hooks]}
+
+class SkyBlockSnapshot:
+    def __init__(self, root, path):
+        self.root = root
+        self.path = path
+        self.lock = threading.Lock()
+        self.files = {}
+        self.indexes = None
+        self.digest = None
+        self.dirty = True
+        self.loaded = False
+        self.stats = {}
+
+    def invalidate(self, *_):
+        self.dirty = True
+
+    def load(self):
+        self.loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = cache_decode(json.load(f))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable SkyBlock snapshot {self.path}: {str(e)}")
+            return
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SKYBLOCK_SNAPSHOT_VERSION:
+            return
+        files = snapshot.get("files")
+        if not isinstance(files, dict) or not all(
+            isinstance(rel, str) and isinstance(record, dict) and cached_stamp(record.get("stamp")) and isinstance(record.get("sha256"), str) and "data" in record
+            for rel, record in files.items()
+        ):
+            logging.warning(f"Ignoring malformed SkyBlock snapshot {self.path}")
+            return
+        self.files = files
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            data = json.dumps(cache_encode({"version": SKYBLOCK_SNAPSHOT_VERSION, "digest": self.digest, "files": self.files}), separators=(",", ":")).encode("utf-8")
+        except ValueError as e:
+            logging.warning(f"Not caching SkyBlock snapshot: {str(e)}")
+            return None
+        atomic_write(self.path, data)
+        return len(data)
+
+    def sources(self):
+        for current, dirs, names in os.walk(self.root):
+            dirs.sort()
+            for name in sorted(names):
+                if name.endswith((".yml", ".yaml")):
+                    path = os.path.join(current, name)
+                    yield os.path.relpath(path, self.root).replace(os.sep, "/"), path
+
+    def refresh(self):
+        with self.lock:
+            started = time.perf_counter()
+            if not self.loaded:
+                self.load()
+            by_hash = {record["sha256"]: record for record in self.files.values()}
+            files = {}
+            parsed = 0
+            errors = {}
+            for rel, path in self.sources():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+                record = self.files.get(rel)
+                if record and record["stamp"] == stamp:
+                    files[rel] = record
+                    continue
+                with open(path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if digest in by_hash:
+                    files[rel] = dict(by_hash[digest], stamp=stamp)
+                    continue
+                try:
+                    data = yaml.load(raw, Loader=YAML_LOADER)
+                except yaml.YAMLError as e:
+                    errors[rel] = str(e)
+                    if record:
+                        files[rel] = record
+                    continue
+                files[rel] = {"stamp": stamp, "sha256": digest, "data": data}
+                parsed += 1
+            changed = parsed > 0 or files.keys() != self.files.keys() or any(files[rel]["sha256"] != self.files[rel]["sha256"] for rel in files)
+            restamped = any(files[rel] is not self.files.get(rel) for rel in files)
+            self.files = files
+            self.digest = hashlib.sha256("".join(f"{rel}:{r['sha256']}\n" for rel, r in sorted(files.items())).encode()).hexdigest()
+            if changed or self.indexes is None:
+                self.indexes = self.build_indexes(files)
+            size = self.save() if changed or restamped else self.stats.get("snapshot_bytes")
+            self.dirty = False
+            self.stats = {
+                "digest": self.digest,
+                "files": len(files),
+                "parsed": parsed,
+                "errors": errors,
+                "refresh_ms": round((time.perf_counter() - started) * 1000, 3),
+                "refreshed_at": time.time(),
+                "snapshot_bytes": size,
+            }
+            if parsed:
+                logging.info(f"SkyBlock snapshot {self.digest[:12]} rebuilt, parsed {parsed}/{len(files)} files in {self.stats['refresh_ms']}ms")
+            return self.indexes
+
+    def build_indexes(self, files):
+        indexes = {
+            "items": {},
+            "categories": collections.defaultdict(list),
+            "rarities": collections.defaultdict(list),
+            "components": collections.defaultdict(list),
+            "skills": {},
+            "levels": {},
+            "collections": {},
+            "reforges": {},
+            "reforge_types": collections.defaultdict(list),
+        }
+        for rel, record in sorted(files.items()):
+            data = record["data"]
+            if not isinstance(data, dict):
+                continue
+            section, _, rest = rel.partition("/")
+            name = os.path.splitext(rest)[0]
+            if section == "items":
+                for item in data.get("items") or []:
+                    if not isinstance(item, dict) or "id" not in item:
+                        continue
+                    item_id = str(item["id"]).upper()
+                    indexes["items"].setdefault(item_id, []).append({"category": name, "item": item})
+                    indexes["categories"][name.lower()].append(item_id)
+                    indexes["rarities"][str(item.get("rarity") or "").upper()].append(item_id)
+                    for component in item.get("components") or []:
+                        if isinstance(component, dict) and "id" in component:
+                            indexes["components"][str(component["id"]).upper()].append(item_id)
+            elif section == "skills":
+                rewards = {int(r["level"]): r for r in data.get("rewards") or [] if isinstance(r, dict) and "level" in r}
+                indexes["skills"][name.lower()] = {"name": data.get("name"), "rewards": rewards}
+            elif section == "levels":
+                for entry in data.get("levels") or []:
+                    if isinstance(entry, dict) and "level" in entry:
+                        indexes["levels"][int(entry["level"])] = entry
+            elif section == "collections":
+                for entry in data.get("collections") or []:
+                    if isinstance(entry, dict) and "itemType" in entry:
+                        indexes["collections"][str(entry["itemType"]).upper()] = {"category": data.get("name"), "rewards": entry.get("rewards") or []}
+            elif section == "reforges":
+                indexes["reforges"][name.lower()] = data
+                for applicable in data.get("applicableTypes") or []:
+                    indexes["reforge_types"][str(applicable).upper()].append(name.lower())
+        return indexes
+
+    def get(self):
+        if self.dirty or self.indexes is None:
+            return self.refresh()
+        return self.indexes
+
+    def report(self):
+        indexes = self.get()
+        return dict(
+            self.stats,
+            version=SKYBLOCK_SNAPSHOT_VERSION,
+            items=len(indexes["items"]),
+            categories=sorted(indexes["categories"]),
+            skills=sorted(indexes["skills"]),
+            levels=len(indexes["levels"]),
+            collections=len(indexes["collections"]),
+            reforges=len(indexes["reforges"]),
+        )
+
+class RegionGrid:
+    def __init__(self, regions, cell=SPATIAL_GRID_CELL):
+        self.regions = regions
+        self.cell = cell
+        self.cells = collections.defaultdict(list)
+        for index, region in enumerate(regions):
+            for key in self.cells_of(region["min"], region["max"]):
+                self.cells[key].append(index)
+
+    def cells_of(self, low, high):
+        c = self.cell
+        return itertools.product(*(range(int(low[i] // c), int(high[i] // c) + 1) for i in range(3)))
+
+    def containing(self, point):
+        c = self.cell
+        candidates = self.cells.get((int(point[0] // c), int(point[1] // c), int(point[2] // c)), ())
+        found = [self.regions[i] for i in candidates if all(self.regions[i]["min"][a] <= point[a] <= self.regions[i]["max"][a] for a in range(3))]
+        found.sort(key=lambda r: r["volume"])
+        return found
+
+    def candidate_pairs(self):
+        pairs = set()
+        for indexes in self.cells.values():
+            for a, b in itertools.combinations(indexes, 2):
+                pairs.add((a, b) if a < b else (b, a))
+        return sorted(pairs)
+
+class KdTree:
+    def __init__(self, points):
+        self.points = points
+        self.root = self.build(list(range(len(points))), 0)
+
+    def build(self, indexes, depth):
+        if not indexes:
+            return None
+        axis = depth % 3
+        indexes.sort(key=lambda i: self.points[i]["position"][axis])
+        middle = len(indexes) // 2
+        return (indexes[middle], axis, self.build(indexes[:middle], depth + 1), self.build(indexes[middle + 1:], depth + 1))
+
+    def nearest(self, target, k=1, max_distance=None):
+        best = []
+        limit = max_distance * max_distance if max_distance is not None else None
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            index, axis, left, right = node
+            position = self.points[index]["position"]
+            distance = sum((position[a] - target[a]) ** 2 for a in range(3))
+            if limit is None or distance <= limit:
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, index))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, index))
+            delta = target[axis] - position[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            bound = delta * delta
+            if (len(best) < k or bound < -best[0][0]) and (limit is None or bound <= limit):
+                stack.append(far)
+            stack.append(near)
+        return [(self.points[i], (-d) ** 0.5) for d, i in sorted(best, reverse=True)]
+
+class SpatialIndex:
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.regions = {}
+        self.grids = {}
+        self.trees = {}
+        self.problems = []
+
+    def sources(self):
+        return [os.path.join(self.root, "Minestom.regions.csv")] + [os.path.join(self.root, f) for f, _ in SPATIAL_POINT_SETS.values()]
+
+    @staticmethod
+    def read_csv(path):
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                return list(csv.DictReader(f))
+        except FileNotFoundError:
+            return []
+
+    def load(self):
+        stamp = []
+        for path in self.sources():
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except OSError:
+                stamp.append(None)
+        stamp = tuple(stamp)
+        with self.lock:
+            if stamp == self.stamp:
+                return self
+            started = time.perf_counter()
+            problems = []
+            regions = collections.defaultdict(list)
+            for row in self.read_csv(self.sources()[0]):
+                try:
+                    a = [float(row[k]) for k in ("x1", "y1", "z1")]
+                    b = [float(row[k]) for k in ("x2", "y2", "z2")]
+                except (KeyError, TypeError, ValueError):
+                    problems.append({"kind": "invalid_row", "id": row.get("_id"), "detail": "non-numeric coordinates"})
+                    continue
+                low = [min(a[i], b[i]) for i in range(3)]
+                high = [max(a[i], b[i]) for i in range(3)]
+                zone = (row.get("serverType") or "").strip().upper()
+                region = {
+                    "id": row.get("_id"),
+                    "type": row.get("type"),
+                    "serverType": zone or None,
+                    "min": low,
+                    "max": high,
+                    "volume": (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1),
+                }
+                if not zone:
+                    problems.append({"kind": "missing_server_type", "id": region["id"]})
+                regions[zone or "UNKNOWN"].append(region)
+            trees = {}
+            for dataset, (filename, zone_field) in SPATIAL_POINT_SETS.items():
+                zones = collections.defaultdict(list)
+                for row in self.read_csv(os.path.join(self.root, filename)):
+                    try:
+                        position = [float(row[k]) for k in ("x", "y", "z")]
+                    except (KeyError, TypeError, ValueError):
+                        problems.append({"kind": "invalid_row", "dataset": dataset, "id": row.get("_id"), "detail": "non-numeric coordinates"})
+                        continue
+                    point = {k: v for k, v in row.items() if k not in ("x", "y", "z")}
+                    point["position"] = position
+                    zones[(row.get(zone_field) or "").strip().upper() or "UNKNOWN"].append(point)
+                trees[dataset] = {zone: KdTree(points) for zone, points in zones.items()}
+            self.regions = dict(regions)
+            self.grids = {zone: RegionGrid(items) for zone, items in regions.items()}
+            self.trees = trees
+            self.problems = problems
+            self.stamp = stamp
+            logging.info(f"Built spatial index over {sum(len(r) for r in regions.values())} regions and {sum(len(t.points) for z in trees.values() for t in z.values())} points in {(time.perf_counter() - started) * 1000:.1f}ms")
+            return self
+
+    def regions_at(self, zone, points):
+        grid = self.load().grids.get(zone.upper())
+        if grid is None:
+            return [[] for _ in points]
+        return [grid.containing(point) for point in points]
+
+    def nearest(self, dataset, zone, points, k=1, max_distance=None):
+        tree = self.load().trees.get(dataset, {}).get(zone.upper())
+        if tree is None:
+            return [[] for _ in points]
+        return [tree.nearest(point, k, max_distance) for point in points]
+
+    def report(self):
+        self.load()
+        overlaps = []
+        for zone, grid in self.grids.items():
+            for a, b in grid.candidate_pairs():
+                ra, rb = grid.regions[a], grid.regions[b]
+                low = [max(ra["min"][i], rb["min"][i]) for i in range(3)]
+                high = [min(ra["max"][i], rb["max"][i]) for i in range(3)]
+                if any(low[i] > high[i] for i in range(3)):
+                    continue
+                shared = (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1)
+                smaller, larger = sorted((ra, rb), key=lambda r: r["volume"])
+                overlaps.append({
+                    "serverType": zone,
+                    "regions": [ra["id"], rb["id"]],
+                    "volume": shared,
+                    "nested": shared == smaller["volume"],
+                    "inside": larger["id"] if shared == smaller["volume"] else None,
+                })
+        seen = collections.Counter(r["id"] for regions in self.regions.values() for r in regions)
+        duplicates = sorted(i for i, n in seen.items() if n > 1)
+        orphans = []
+        for dataset, zones in self.trees.items():
+            for zone, tree in zones.items():
+                grid = self.grids.get(zone)
+                if grid is None:
+                    continue
+                for point in tree.points:
+                    if not grid.containing(point["position"]):
+                        orphans.append({"dataset": dataset, "id": point.get("_id"), "zone": zone, "position": point["position"]})
+        return {
+            "regions": {zone: len(items) for zone, items in self.regions.items()},
+            "points": {dataset: {zone: len(tree.points) for zone, tree in zones.items()} for dataset, zones in self.trees.items()},
+            "problems": self.problems,
+            "duplicate_ids": duplicates,
+            "overlaps": [o for o in overlaps if not o["nested"]],
+            "nested": len([o for o in overlaps if o["nested"]]),
+            "points_outside_regions": orphans,
+        }
+
+class ResourcePackBuilder:
+    LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+    CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+    END_RECORD = struct.Struct("<IHHHHIIH")
+    UTF8_FLAG = 0x800
+    DOS_DATE = (1 << 5) | 1
+
+    def __init__(self, root, output, manifest_path):
+        self.root = root
+        self.output = output
+        self.manifest_path = manifest_path
+        self.lock = threading.Lock()
+        self.swap_lock = threading.Lock()
+        self.entries = {}
+        self.sha1 = None
+        self.size = None
+        self.dirty = True
+        self.loaded = False
+        self.checked_at = None
+        self.stats = {}
+
+    def invalidate(self, *_):
+        self.dirty = True
+
+    def stale(self):
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < PACK_CHECK_INTERVAL:
+            return False
+        self.checked_at = now
+        entries = self.entries
+        seen = 0
+        for name, path in self.sources():
+            entry = entries.get(name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                return True
+            if entry is None or entry["stamp"] != (st.st_mtime_ns, st.st_size, st.st_ino):
+                return True
+            seen += 1
+        return seen != len(entries)
+
+    def load(self):
+        self.loaded = True
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = cache_decode(json.load(f))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable pack manifest {self.manifest_path}: {str(e)}")
+            return
+        if not isinstance(manifest, dict) or manifest.get("version") != PACK_MANIFEST_VERSION:
+            return
+        entries = manifest.get("entries")
+        if not isinstance(manifest.get("sha1"), str) or not isinstance(manifest.get("size"), int) or not isinstance(entries, dict) or not all(
+            isinstance(entry, dict) and cached_stamp(entry.get("stamp")) and all(isinstance(entry.get(key), int) for key in ("offset", "compressed", "crc", "size", "method"))
+            for entry in entries.values()
+        ):
+            logging.warning(f"Ignoring malformed pack manifest {self.manifest_path}")
+            return
+        try:
+            size = os.path.getsize(self.output)
+        except OSError:
+            return
+        if size == manifest["size"]:
+            self.entries = manifest["entries"]
+            self.sha1 = manifest["sha1"]
+            self.size = size
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        data = {"version": PACK_MANIFEST_VERSION, "sha1": self.sha1, "size": self.size, "entries": self.entries}
+        atomic_write(self.manifest_path, json.dumps(cache_encode(data), separators=(",", ":")).encode("utf-8"))
+
+    def sources(self):
+        for directory, prefix in PACK_SOURCES:
+            top = os.path.join(self.root, directory)
+            for current, dirs, names in os.walk(top):
+                dirs.sort()
+                for name in sorted(names):
+                    path = os.path.join(current, name)
+                    yield prefix + os.path.relpath(path, top).replace(os.sep, "/"), path
+
+    @staticmethod
+    def encode(name, path, known):
+        with open(path, "rb") as f:
+            raw = f.read()
+        minify = name.endswith(PACK_MINIFY_EXTENSIONS)
+        digest = hashlib.sha1(raw).hexdigest()
+        if (digest, minify) in known:
+            return known[(digest, minify)], None
+        data = raw
+        problem = None
+        if minify:
+            try:
+                data = json.dumps(json.loads(raw), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            except ValueError as e:
+                problem = str(e)
+        compressor = zlib.compressobj(PACK_COMPRESS_LEVEL, zlib.DEFLATED, -15)
+        packed = compressor.compress(data) + compressor.flush()
+        method = zlib.DEFLATED
+        if len(packed) >= len(data):
+            packed, method = data, 0
+        meta = {"sha1": digest, "minify": minify, "crc": zlib.crc32(data), "method": method, "size": len(data), "source_size": len(raw), "problem": problem}
+        return meta, packed
+
+    def build(self, force=False):
+        with self.lock:
+            started = time.perf_counter()
+            if not self.loaded:
+                self.load()
+            previous = {} if force or self.sha1 is None else self.entries
+            known = {(entry["sha1"], entry["minify"]): entry for entry in previous.values()}
+            plan = []
+            for name, path in self.sources():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+                entry = previous.get(name)
+                plan.append((name, path, stamp, entry if entry and entry["stamp"] == stamp else None))
+            if len(plan) > 0xFFFF:
+                raise ValueError(f"{PACK_NAME} has {len(plan)} files, more than a zip without zip64 can hold")
+            encoded = {}
+            pending = [(name, path) for name, path, _, entry in plan if entry is None]
+            if pending:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, PACK_PARALLELISM)) as pool:
+                    futures = {pool.submit(self.encode, name, path, known): name for name, path in pending}
+                    for future in concurrent.futures.as_completed(futures):
+                        encoded[futures[future]] = future.result()
+            recompressed = len([packed for _, packed in encoded.values() if packed is not None])
+            unchanged = recompressed == 0 and {name for name, _, _, _ in plan} == previous.keys()
+            if unchanged:
+                if pending:
+                    self.entries = {name: entry or dict(encoded[name][0], stamp=stamp) for name, _, stamp, entry in plan}
+                    self.save()
+            else:
+                self.write(plan, encoded, previous)
+            self.dirty = False
+            self.checked_at = time.monotonic()
+            self.stats = {
+                "files": len(plan),
+                "recompressed": recompressed,
+                "reused": len(plan) - recompressed,
+                "problems": {name: entry["problem"] for name, entry in self.entries.items() if entry["problem"]},
+                "build_ms": round((time.perf_counter() - started) * 1000, 3),
+                "built_at": time.time(),
+            }
+            if not unchanged:
+                logging.info(f"Built {PACK_NAME} {self.sha1} ({self.size} bytes), recompressed {recompressed}/{len(plan)} files in {self.stats['build_ms']}ms")
+            return self.status()
+
+    def write(self, plan, encoded, previous):
+        os.makedirs(os.path.dirname(self.output), exist_ok=True)
+        tmp = f"{self.output}.tmp-{os.getpid()}"
+        digest = hashlib.sha1()
+        entries = {}
+        central = []
+        offset = 0
+        old = open(self.output, "rb") if previous else None
+        try:
+            with open(tmp, "wb") as out:
+                for name, _, stamp, entry in plan:
+                    packed = None
+                    if entry is None:
+                        entry, packed = encoded[name]
+                    if packed is None:
+                        old.seek(entry["offset"])
+                        packed = old.read(entry["compressed"])
+                    encoded_name = name.encode("utf-8")
+                    header = self.LOCAL_HEADER.pack(
+                        0x04034b50, 20, self.UTF8_FLAG, entry["method"], 0, self.DOS_DATE,
+                        entry["crc"], len(packed), entry["size"], len(encoded_name), 0,
+                    ) + encoded_name
+                    central.append(self.CENTRAL_HEADER.pack(
+                        0x02014b50, 20, 20, self.UTF8_FLAG, entry["method"], 0, self.DOS_DATE,
+                        entry["crc"], len(packed), entry["size"], len(encoded_name), 0, 0, 0, 0, 0o644 << 16, offset,
+                    ) + encoded_name)
+                    out.write(header)
+                    out.write(packed)
+                    digest.update(header)
+                    digest.update(packed)
+                    entries[name] = dict(entry, stamp=stamp, offset=offset + len(header), compressed=len(packed))
+                    offset += len(header) + len(packed)
+                    if offset > 0xFFFFFFFF:
+                        raise ValueError(f"{PACK_NAME} is larger than a zip without zip64 can hold")
+                directory = b"".join(central)
+                trailer = directory + self.END_RECORD.pack(0x06054b50, 0, 0, len(central), len(central), len(directory), offset, 0)
+                out.write(trailer)
+                digest.update(trailer)
+                out.flush()
+                os.fsync(out.fileno())
+            with self.swap_lock:
+                os.replace(tmp, self.output)
+                self.entries = entries
+                self.sha1 = digest.hexdigest()
+                self.size = offset + len(trailer)
+        except BaseException:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            if old is not None:
+                old.close()
+        atomic_write(f"{self.output}.sha1", f"{self.sha1}\n".encode())
+        self.save()
+
+    def get(self):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    self.load()
+        if self.dirty or self.sha1 is None or self.stale():
+            return self.build()
+        return self.status()
 
-class ProcessManager:
+    def status(self):
+        return dict(self.stats, name=PACK_NAME, sha1=self.sha1, size=self.size)
+
+class LogStreamHub:
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.lock = threading.Lock()
+        self.followers = {}
+        self.subscriptions = {}
+
+    def subscribe(self, sid, server_id, log_path):
+        with self.lock:
+            subscribers = self.subscriptions.setdefault(server_id, set())
+            subscribers.add(sid)
+            if server_id not in self.followers:
+                follower = LogFollower(
+                    log_path,
+                    lambda lines, sizes, start, end, reset: self.publish(server_id, lines, sizes, start, end, reset),
+                )
+                self.followers[server_id] = follower
+                follower.start()
+                logging.info(f"Started log follower for {server_id}")
+
+    def unsubscribe(self, sid, server_id):
+        with self.lock:
+            subscribers = self.subscriptions.get(server_id)
+            if not subscribers:
+                return
+            subscribers.discard(sid)
+            if not subscribers:
+                del self.subscriptions[server_id]
+                follower = self.followers.pop(server_id, None)
+                if follower:
+                    follower.stop()
+                    logging.info(f"Stopped log follower for {server_id}")
+
+    def unsubscribe_all(self, sid):
+        with self.lock:
+            server_ids = [server_id for server_id, subscribers in self.subscriptions.items() if sid in subscribers]
+        for server_id in server_ids:
+            self.unsubscribe(sid, server_id)
+
+    def publish(self, server_id, lines, sizes, start_offset, end_offset, reset):
+        self.socketio.emit('log_lines', {
+            "server_id": server_id,
+            "logs": lines,
+            "sizes": sizes,
+            "start_offset": start_offset,
+            "offset": end_offset,
+            "reset": reset
+        }, to=f"logs:{server_id}")
+
+def json_pointer(path, key):
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+def json_diff(old, new, path=""):
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    if isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": json_pointer(path, key)})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": json_pointer(path, key), "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, json_pointer(path, key)))
+        return ops
+    if isinstance(new, list):
+        ops = []
+        for index, (a, b) in enumerate(zip(old, new)):
+            ops.extend(json_diff(a, b, json_pointer(path, index)))
+        for index in range(len(old), len(new)):
+            ops.append({"op": "add", "path": json_pointer(path, index), "value": new[index]})
+        for index in range(len(old) - 1, len(new) - 1, -1):
+            ops.append({"op": "remove", "path": json_pointer(path, index)})
+        return ops
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+class InstanceTracker(set):
     def __init__(self):
-        self.processes = []
+        super().__init__()
+        self.lock = threading.Lock()
+        self.by_type = collections.defaultdict(dict)
 
-    def add(self, p, name):
-        self.processes.append((p, name))
-        logging.info(f"Started {name} PID={p.pid}")
+    def add(self, name):
+        with self.lock:
+            super().add(name)
+            server_type, _, number = name.rpartition('_')
+            if server_type and number.isdigit():
+                self.by_type[server_type][int(number)] = name
 
-    def cleanup(self):
-        logging.info("Shutting down all processes")
-        for p, name in self.processes:
-            if p.poll() is None:
-                logging.info(f"Stopping {name}")
-                p.terminate()
-                try:
-                    p.wait(timeout=10)
-                except subprocess.TimeoutExpired:
-                    logging.warning(f"Force killing {name}")
-                    p.kill()
-        self.kill_java()
+    def discard(self, name):
+        with self.lock:
+            super().discard(name)
+            self.unindex(name)
+
+    def remove(self, name):
+        with self.lock:
+            super().remove(name)
+            self.unindex(name)
+
+    def unindex(self, name):
+        server_type, _, number = name.rpartition('_')
+        if number.isdigit() and self.by_type[server_type].get(int(number)) == name:
+            del self.by_type[server_type][int(number)]
+
+    def instances_of(self, server_type):
+        with self.lock:
+            return dict(self.by_type.get(server_type, {}))
+
+class PortAllocationError(Exception):
+    pass
+
+class InstanceRegistry:
+    LIVE_STATES = ("starting", "running")
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INSTANCE_REGISTRY_VERSION:
+            self.db.execute("DROP TABLE IF EXISTS instances")
+            self.db.execute("PRAGMA user_version=%d" % INSTANCE_REGISTRY_VERSION)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS instances (
+                name TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                pid INTEGER,
+                start_ticks INTEGER,
+                started_at REAL,
+                port INTEGER,
+                artifact_sha256 TEXT,
+                argv TEXT,
+                cmd TEXT,
+                cwd TEXT,
+                log_name TEXT,
+                exit_code INTEGER,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS instances_port ON instances(port)")
+
+    def reserve(self, name, port=None):
+        with self.lock:
+            if port is not None:
+                owner = self.db.execute(
+                    "SELECT name FROM instances WHERE name != ? AND port = ? AND state IN (?, ?)", (name, port) + self.LIVE_STATES
+                ).fetchone()
+                if owner:
+                    raise PortAllocationError(f"Port {port} for {name} is already used by {owner['name']}")
+            self.db.execute(
+                "INSERT INTO instances (name, state, port, updated_at) VALUES (?, 'starting', ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET state = 'starting', port = excluded.port, pid = NULL, start_ticks = NULL, exit_code = NULL, updated_at = excluded.updated_at",
+                (name, port, time.time()),
+            )
+
+    def record(self, name, p, start_ticks, argv, cmd, cwd, log_name, artifact_sha256):
+        with self.lock:
+            self.db.execute(
+                "UPDATE instances SET state = 'running', pid = ?, start_ticks = ?, started_at = ?, argv = ?, cmd = ?, cwd = ?, log_name = ?, "
+                "artifact_sha256 = ?, exit_code = NULL, updated_at = ? WHERE name = ?",
+                (p.pid, start_ticks, time.time(), json.dumps(argv), json.dumps(cmd), cwd, log_name, artifact_sha256, time.time(), name),
+            )
+
+    def mark_exited(self, name, exit_code=None):
+        with self.lock:
+            self.db.execute(
+                "UPDATE instances SET state = 'exited', pid = NULL, exit_code = ?, updated_at = ? WHERE name = ?",
+                (exit_code, time.time(), name),
+            )
+
+    def rename(self, old, new):
+        with self.lock:
+            self.db.execute("DELETE FROM instances WHERE name = ?", (new,))
+            self.db.execute("UPDATE instances SET name = ?, updated_at = ? WHERE name = ?", (new, time.time(), old))
+
+    def forget(self, name):
+        with self.lock:
+            return self.db.execute("DELETE FROM instances WHERE name = ?", (name,)).rowcount > 0
+
+    def get(self, name):
+        with self.lock:
+            row = self.db.execute("SELECT * FROM instances WHERE name = ?", (name,)).fetchone()
+        return self.to_dict(row) if row else None
+
+    def port_of(self, name):
+        entry = self.get(name)
+        if not entry:
+            return None
+        if entry["port"] is None and entry["pid"] and entry["state"] == "running":
+            ports = listening_ports(entry["pid"])
+            if ports:
+                entry["port"] = min(ports)
+                with self.lock:
+                    self.db.execute("UPDATE instances SET port = ? WHERE name = ? AND pid = ?", (entry["port"], name, entry["pid"]))
+        return entry["port"]
 
     @staticmethod
-    def kill_java():
-        logging.info("Killing leftover java processes")
-        try:
-            if platform.system().lower() == "windows":
-                subprocess.run(["taskkill", "/F", "/IM", "java.exe"], capture_output=True)
+    def to_dict(row):
+        entry = dict(row)
+        for field in ("argv", "cmd"):
+            entry[field] = json.loads(entry[field]) if entry[field] else None
+        return entry
+
+    def entries(self, states=None):
+        with self.lock:
+            if states:
+                rows = self.db.execute(f"SELECT * FROM instances WHERE state IN ({', '.join('?' * len(states))}) ORDER BY name", tuple(states)).fetchall()
             else:
-                subprocess.run(["pkill", "-f", "java -jar"], capture_output=True)
-        except Exception as e:
-            logging.error(str(e))
+                rows = self.db.execute("SELECT * FROM instances ORDER BY name").fetchall()
+        return [self.to_dict(row) for row in rows]
 
-class FileManager:
-    def __init__(self, base_dir):
-        self.base_dir = base_dir
-        self.config_dir = os.path.join(base_dir, "configuration")
-        self.proxy_dir = os.path.join(base_dir, "proxy")
-        self.gameserver_dir = os.path.join(base_dir, "gameserver")
-        self.limbo_dir = os.path.join(base_dir, "limbo")
-        self.services_dir = os.path.join(base_dir, "services")
-        self.logs_dir = os.path.join(base_dir, "logs")
+    def verify(self, entry):
+        if not entry["pid"] or entry["start_ticks"] is None:
+            return None
+        cmdline = proc_cmdline(entry["pid"])
+        if proc_start_ticks(entry["pid"]) != entry["start_ticks"] or not cmdline or cmdline[len(cmdline) - len(entry["argv"]) + 1:] != entry["argv"][1:]:
+            return None
+        return AdoptedProcess(entry["pid"], entry["start_ticks"], entry["argv"])
 
-    def copy_file_if_not_exists(self, src, dst):
-        if not os.path.exists(dst) and os.path.exists(src):
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copy2(src, dst)
-            logging.info(f"Copied {src} -> {dst}")
+    def report(self):
+        return {
+            "path": self.path,
+            "keep_on_exit": INSTANCE_KEEP_ON_EXIT,
+            "instances": [dict(entry, port=self.port_of(entry["name"])) for entry in self.entries()],
+        }
 
-class ServiceStarter:
-    def __init__(self, base_dir, config_dir, proxy_dir, limbo_dir, services_dir, gameserver_dir, logs_dir, proc_mgr):
-        self.base_dir = base_dir
-        self.config_dir = config_dir
-        self.proxy_dir = proxy_dir
-        self.limbo_dir = limbo_dir
-        self.services_dir = services_dir
-        self.gameserver_dir = gameserver_dir
-        self.logs_dir = logs_dir
-        self.proc_mgr = proc_mgr
+class StatusModel:
+    def __init__(self, socketio, build, window=0.1):
+        self.socketio = socketio
+        self.build = build
+        self.window = window
+        self.lock = threading.Lock()
+        self.emit_lock = threading.Lock()
+        self.version = 0
+        self.document = None
+        self.timer = None
+        self.stats = {"flushes": 0, "patches": 0, "ops": 0, "coalesced": 0}
 
-    def start_proxy(self):
-        jar = os.path.join(self.proxy_dir, "velocity.jar")
-        if not os.path.isfile(jar):
-            logging.warning("Proxy velocity jar missing")
-            return
-        log = open(os.path.join(self.logs_dir, "velocity.log"), "a")
-        p = subprocess.Popen(
-            ["java", "-jar", "velocity.jar"],
-            cwd=self.proxy_dir,
-            stdout=log,
-            stderr=subprocess.STDOUT,
-        )
-        self.proc_mgr.add(p, "Proxy")
+    def schedule(self):
+        with self.lock:
+            if self.timer is not None:
+                self.stats["coalesced"] += 1
+                return
+            self.timer = threading.Timer(self.window, self.tick)
+            self.timer.daemon = True
+            self.timer.start()
 
-    def start_nanolimbo(self):
-        jar = os.path.join(self.limbo_dir, "NanoLimbo.jar")
-        if not os.path.isfile(jar):
-            logging.warning("NanoLimbo jar missing")
-            return
-        log = open(os.path.join(self.logs_dir, "NanoLimbo.log"), "a")
-        p = subprocess.Popen(
-            ["java", "-jar", "NanoLimbo.jar"],
-            cwd=self.limbo_dir,
-            stdout=log,
-            stderr=subprocess.STDOUT,
-        )
-        self.proc_mgr.add(p, "NanoLimbo")
+    def tick(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error(f"Error flushing server status: {str(e)}")
+            with self.lock:
+                if self.timer is not None:
+                    return
+                self.timer = threading.Timer(STATUS_RETRY_DELAY, self.tick)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.emit_lock:
+            with self.lock:
+                self.timer = None
+                self.stats["flushes"] += 1
+                document = self.build()
+                if self.document is None:
+                    self.document = document
+                    self.version += 1
+                    return
+                ops = json_diff(self.document, document)
+                if not ops:
+                    return
+                self.document = document
+                self.version += 1
+                self.stats["patches"] += 1
+                self.stats["ops"] += len(ops)
+                patch = {"version": self.version, "base": self.version - 1, "ops": ops}
+            self.socketio.emit('server_status_patch', patch)
+
+    def snapshot(self):
+        document = self.build()
+        with self.lock:
+            if self.document is None:
+                self.document = document
+                self.version += 1
+            changed = document != self.document
+            result = dict(self.document, version=self.version)
+        if changed:
+            self.schedule()
+        return result
 
 def setup_logging():
     logging.basicConfig(
@@ -155,11 +4297,11 @@ def setup_logging():
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization"]}})
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SERVER_MODE)
 
 LOG_FILE = "api_server.log"
 process_manager = ProcessManager()
-base_dir = os.path.dirname(os.path.abspath(__file__))
+base_dir = os.environ.get("API_BASE_DIR") or os.path.dirname(os.path.abspath(__file__))
 config_dir = os.path.join(base_dir, "configuration")
 proxy_dir = os.path.join(base_dir, "proxy")
 limbo_dir = os.path.join(base_dir, "limbo")
@@ -167,103 +4309,243 @@ services_dir = os.path.join(base_dir, "services")
 gameserver_dir = os.path.join(base_dir, "gameserver")
 logs_dir = os.path.join(base_dir, "logs")
 
-file_mgr = FileManager(base_dir)
-starter = ServiceStarter(base_dir, config_dir, proxy_dir, limbo_dir, services_dir, gameserver_dir, logs_dir, process_manager)
-
 os.makedirs(logs_dir, exist_ok=True)
 os.makedirs(config_dir, exist_ok=True)
 
 setup_logging()
 
-instance_tracker = set()
-download_status = {"status": "idle", "progress": 0, "current": "", "errors": []}
+file_mgr = FileManager(base_dir)
+config_store = ConfigStore(os.path.join(config_dir, ".config-batch.journal"))
+config_store.recover()
+artifact_store = ArtifactStore(os.path.join(base_dir, "downloads", "store"), base_dir)
+starter = ServiceStarter(base_dir, config_dir, proxy_dir, limbo_dir, services_dir, gameserver_dir, logs_dir, process_manager, artifact_store)
+jvm_profiles = JvmProfileStore(os.path.join(config_dir, JVM_PROFILES_FILE))
+jvm_profiles.ensure_file()
+admission = MemoryAdmission(jvm_profiles)
+starter.profiles = jvm_profiles
+starter.admission = admission
+cds_archives = CdsArchiveManager(starter)
+starter.cds = cds_archives
+workspaces = InstanceWorkspaces(gameserver_dir) if GAMESERVER_WORKSPACES else None
+starter.workspaces = workspaces
+instance_registry = InstanceRegistry(os.path.join(base_dir, "downloads", "state", "instances.db"))
+starter.registry = instance_registry
+starter.spool_dir = os.path.join(base_dir, "downloads", "state", "spool")
+log_hub = LogStreamHub(socketio)
+log_index = LogSearchIndex()
+
+instance_tracker = InstanceTracker()
+download_status = {
+    "status": "idle",
+    "progress": 0,
+    "current": "",
+    "errors": [],
+    "bytes_done": 0,
+    "bytes_total": 0,
+    "throughput": 0,
+    "files": {}
+}
 download_lock = threading.Lock()
 
+DEFAULT_RELEASE_BASE = "https://github.com/Swofty-Developments/HypixelSkyBlock/releases/download/latest"
+DOWNLOAD_PARALLELISM = int(os.environ.get("DOWNLOAD_PARALLELISM", "4"))
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 30
+
 class Downloader:
-    def __init__(self, base_dir, force_download=False):
+    def __init__(self, base_dir, force_download=False, release_base=None, parallelism=None, store=None):
         self.base_dir = base_dir
         self.force_download = force_download
-        self.release_base = "https://github.com/Swofty-Developments/HypixelSkyBlock/releases/download/latest"
+        self.release_base = (release_base or os.environ.get("RELEASE_BASE_URL") or DEFAULT_RELEASE_BASE).rstrip("/")
+        self.parallelism = max(parallelism or DOWNLOAD_PARALLELISM, 1)
         self.config_dir = os.path.join(base_dir, "configuration")
         self.services_dir = os.path.join(base_dir, "services")
         self.downloads_dir = os.path.join(base_dir, "downloads")
+        self.store = store or artifact_store
+        self.started_at = None
         os.makedirs(self.downloads_dir, exist_ok=True)
 
+    def update_file_status(self, filename, **fields):
+        with download_lock:
+            entry = download_status["files"].setdefault(filename, {"status": "pending", "bytes_done": 0, "bytes_total": 0})
+            entry.update(fields)
+            files = download_status["files"].values()
+            download_status["bytes_done"] = sum(f["bytes_done"] for f in files)
+            download_status["bytes_total"] = sum(f["bytes_total"] for f in files)
+            fetched = download_status["bytes_done"] - sum(f.get("bytes_reused", 0) for f in files)
+            download_status["current"] = ", ".join(name for name, f in download_status["files"].items() if f["status"] == "downloading")
+            if download_status["bytes_total"]:
+                download_status["progress"] = min(int(download_status["bytes_done"] * 100 / download_status["bytes_total"]), 100)
+            elapsed = time.time() - self.started_at if self.started_at else 0
+            download_status["throughput"] = int(fetched / elapsed) if elapsed > 0 else 0
+
+    def download_file(self, url, download_path, validators=None):
+        filename = os.path.basename(download_path)
+        part_path = download_path + ".part"
+        meta_path = part_path + ".json"
+        headers = {}
+        for attempt in range(1, DOWNLOAD_RETRIES + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            req = urllib.request.Request(url)
+            if offset:
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        partial = json.load(f)
+                except (OSError, ValueError):
+                    partial = {}
+                etag = partial.get("etag")
+                validator = etag if etag and not etag.startswith("W/") else partial.get("last_modified")
+                if validator:
+                    req.add_header("Range", f"bytes={offset}-")
+                    req.add_header("If-Range", validator)
+                else:
+                    offset = 0
+            if not offset and validators:
+                if validators.get("etag"):
+                    req.add_header("If-None-Match", validators["etag"])
+                if validators.get("last_modified"):
+                    req.add_header("If-Modified-Since", validators["last_modified"])
+            try:
+                with urllib.request.urlopen(req, timeout=DOWNLOAD_TIMEOUT) as resp:
+                    headers = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+                    length = int(resp.headers.get("Content-Length") or 0)
+                    if offset and resp.status == 206:
+                        mode = "ab"
+                        logging.info(f"Resuming {filename} at byte {offset}")
+                    else:
+                        offset = 0
+                        mode = "wb"
+                        atomic_write(meta_path, json.dumps(headers).encode())
+                    done = offset
+                    self.update_file_status(filename, status="downloading", bytes_done=done, bytes_total=offset + length, bytes_reused=offset)
+                    with open(part_path, mode) as f:
+                        while True:
+                            chunk = resp.read(DOWNLOAD_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            done += len(chunk)
+                            self.update_file_status(filename, bytes_done=done)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    if length and done < offset + length:
+                        raise IOError(f"Incomplete download of {filename}: {done}/{offset + length} bytes")
+                break
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and not offset:
+                    return None
+                if e.code == 416 and offset:
+                    break
+                if attempt == DOWNLOAD_RETRIES or e.code < 500:
+                    raise
+                logging.warning(f"Retrying {filename} after HTTP {e.code} (attempt {attempt})")
+            except (urllib.error.URLError, IOError, TimeoutError) as e:
+                if attempt == DOWNLOAD_RETRIES:
+                    raise
+                logging.warning(f"Retrying {filename} after error: {str(e)} (attempt {attempt})")
+        os.replace(part_path, download_path)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        size = os.path.getsize(download_path)
+        self.update_file_status(filename, bytes_done=size, bytes_total=size)
+        return headers
+
     def fetch(self, url, path):
         filename = os.path.basename(path)
-        download_path = os.path.join(self.downloads_dir, filename)
-        
-        with download_lock:
-            download_status["current"] = filename
+        entry = self.store.lookup(url)
         
-        if os.path.exists(download_path) and not self.force_download:
-            logging.info(f"Exists in downloads: {download_path}")
+        if entry and not self.force_download:
+            logging.info(f"Cached artifact {filename} sha256={entry['sha256'][:12]}")
+            self.update_file_status(filename, bytes_done=entry["size"], bytes_total=entry["size"], bytes_reused=entry["size"])
         else:
-            os.makedirs(self.downloads_dir, exist_ok=True)
-            logging.info(f"Downloading {url} to {download_path}")
+            download_path = os.path.join(self.store.tmp_dir, filename)
+            logging.info(f"Downloading {url}")
             try:
-                urllib.request.urlretrieve(url, download_path)
+                headers = self.download_file(url, download_path, validators=entry)
             except Exception as e:
+                self.update_file_status(filename, status="error")
                 with download_lock:
                     download_status["errors"].append(f"Failed to download {filename}: {str(e)}")
                 raise
+            if headers is None:
+                logging.info(f"{filename} unchanged upstream, keeping sha256={entry['sha256'][:12]}")
+                self.store.touch(url)
+                self.update_file_status(filename, bytes_done=entry["size"], bytes_total=entry["size"], bytes_reused=entry["size"])
+            else:
+                entry = self.store.add(url, download_path, headers.get("etag"), headers.get("last_modified"))
+                logging.info(f"Stored {filename} sha256={entry['sha256'][:12]}")
         
-        os.makedirs(os.path.dirname(path), exist_ok=True)
         if not os.path.exists(path) or self.force_download:
-            shutil.copy2(download_path, path)
-            logging.info(f"Copied {download_path} -> {path}")
+            method = self.store.deploy(entry["sha256"], path)
+            logging.info(f"Deployed {filename} -> {path} ({method})")
+        self.update_file_status(filename, status="done", sha256=entry["sha256"])
 
     def download_services(self, selected=None):
-        total = len(ServiceType) if not selected else len(selected)
-        completed = 0
-        
+        self.started_at = time.time()
         with download_lock:
-            download_status["status"] = "downloading"
-            download_status["progress"] = 0
-            download_status["errors"] = []
+            download_status.update({
+                "status": "downloading",
+                "progress": 0,
+                "current": "",
+                "errors": [],
+                "bytes_done": 0,
+                "bytes_total": 0,
+                "throughput": 0,
+                "files": {}
+            })
         
         try:
+            jobs = []
             services_to_download = selected if selected else ServiceType
             for s in services_to_download:
                 if isinstance(s, str):
                     s = ServiceType[s.upper().replace('.JAR', '')]
+                jobs.append((f"{self.release_base}/{s.value}", os.path.join(self.services_dir, s.value)))
+            jobs.append((f"{self.release_base}/HypixelCore.jar", os.path.join(self.services_dir, "HypixelCore.jar")))
+            jobs.append((f"{self.release_base}/SkyBlockProxy.jar", os.path.join(self.config_dir, "SkyBlockProxy.jar")))
+        except Exception as e:
+            logging.error(f"Error preparing download: {str(e)}")
+            with download_lock:
+                download_status["status"] = "error"
+                download_status["errors"].append(f"Unknown service {str(e)}" if isinstance(e, KeyError) else str(e))
+            return
+        
+        with download_lock:
+            download_status["files"] = {os.path.basename(path): {"status": "pending", "bytes_done": 0, "bytes_total": 0} for _, path in jobs}
+        
+        failed = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallelism) as pool:
+            futures = {pool.submit(self.fetch, url, path): path for url, path in jobs}
+            for future in concurrent.futures.as_completed(futures):
                 try:
-                    self.fetch(
-                        f"{self.release_base}/{s.value}",
-                        os.path.join(self.services_dir, s.value),
-                    )
-                    completed += 1
-                    with download_lock:
-                        download_status["progress"] = int((completed / total) * 100)
+                    future.result()
                 except Exception as e:
-                    logging.error(f"Error downloading {s.value}: {str(e)}")
-            
-            self.fetch(
-                f"{self.release_base}/HypixelCore.jar",
-                os.path.join(self.services_dir, "HypixelCore.jar"),
-            )
-            
-            self.fetch(
-                "https://github.com/Swofty-Developments/HypixelSkyBlock/releases/download/latest/SkyBlockProxy.jar",
-                os.path.join(self.config_dir, "SkyBlockProxy.jar"),
-            )
-            
-            with download_lock:
+                    failed += 1
+                    logging.error(f"Error downloading {os.path.basename(futures[future])}: {str(e)}")
+        
+        with download_lock:
+            download_status["current"] = ""
+            if failed:
+                download_status["status"] = "error"
+            else:
                 download_status["status"] = "completed"
                 download_status["progress"] = 100
-        except Exception as e:
-            with download_lock:
-                download_status["status"] = "error"
-                download_status["errors"].append(str(e))
-            logging.error(f"Download error: {str(e)}")
+        logging.info(f"Download finished: {len(jobs) - failed}/{len(jobs)} files in {time.time() - self.started_at:.1f}s")
 
 def get_server_status():
     status = {}
-    for p, name in process_manager.processes:
-        is_running = p.poll() is None
+    for name, entry in supervisor.snapshot().items():
+        if WarmPool.is_member(name):
+            continue
         status[name] = {
-            "running": is_running,
-            "pid": p.pid if is_running else None
+            "running": entry["running"],
+            "pid": entry["pid"],
+            "state": "queued" if not entry["running"] and name in starter.queued else entry["state"],
+            "exit_code": entry["exit_code"],
+            "readiness": entry["readiness"],
+            "time_to_ready": entry["time_to_ready"],
+            "metrics": process_sampler.latest(name)
         }
         if name not in instance_tracker:
             instance_tracker.add(name)
@@ -274,68 +4556,160 @@ def get_server_status():
                 "running": False,
                 "pid": None
             }
+            if tracked_name in starter.queued:
+                status[tracked_name]["state"] = "queued"
     
     return status
 
-def broadcast_server_status():
-    try:
-        status = get_server_status()
-        result = {
-            "proxy": {"id": "proxy", "name": "Proxy", "type": "proxy", "running": status.get("Proxy", {}).get("running", False)},
-            "limbo": {"id": "nanolimbo", "name": "NanoLimbo", "type": "limbo", "running": status.get("NanoLimbo", {}).get("running", False)},
-            "services": [],
-            "gameservers": {}
-        }
-        
-        for s in ServiceType:
-            name = s.value.replace('.jar', '')
-            result["services"].append({
-                "id": name.lower(),
-                "name": name,
-                "type": "service",
-                "running": status.get(s.value, {}).get("running", False)
+def relaunch_process(name):
+    spec = starter.specs.get(name)
+    if spec is None or supervisor.is_running(name):
+        return False
+    process_manager.discard(name, exited_only=True)
+    starter.launch(name, *spec)
+    instance_tracker.add(name)
+    return True
+
+restart_manager = RestartManager(relaunch_process)
+
+def handle_process_change(name, entry):
+    if not entry["running"]:
+        readiness_tracker.on_exit(name)
+        admission.release(name)
+        cds_archives.on_exit(name, entry["exit_code"])
+        instance_registry.mark_exited(name, entry["exit_code"])
+    restart_manager.on_change(name, entry)
+    if WarmPool.is_member(name):
+        if not entry["running"]:
+            warm_pool.on_exit(name, entry)
+        elif entry.get("readiness") == "ready":
+            warm_pool.on_ready(name)
+        elif entry.get("readiness") == "failed":
+            warm_pool.on_failed(name)
+        return
+    socketio.emit('process_event', {
+        "name": name,
+        "state": entry["state"],
+        "running": entry["running"],
+        "pid": entry["pid"],
+        "exit_code": entry["exit_code"],
+        "readiness": entry.get("readiness"),
+        "time_to_ready": entry.get("time_to_ready")
+    })
+    broadcast_server_status()
+
+supervisor = ProcessSupervisor(on_change=handle_process_change)
+process_manager.supervisor = supervisor
+process_sampler = ProcessSampler(process_manager, on_sample=lambda: broadcast_server_status())
+readiness_tracker = ReadinessTracker(supervisor)
+starter.readiness = readiness_tracker
+warm_pool = WarmPool(starter, process_manager, supervisor, restart_manager)
+admission.evict = warm_pool.evict
+
+def adopt_instances():
+    adopted = []
+    following = set()
+    for entry in instance_registry.entries(InstanceRegistry.LIVE_STATES):
+        name = entry["name"]
+        p = instance_registry.verify(entry)
+        spool = starter.spool_path(entry["pid"], entry["start_ticks"]) if entry["pid"] else None
+        if p is None:
+            if spool and entry["log_name"] and os.path.exists(spool):
+                starter.open_pipeline(name, entry["log_name"]).pump_spool(spool, None)
+            instance_registry.mark_exited(name)
+            continue
+        if WarmPool.is_member(name):
+            logging.info(f"Stopping warm instance {name} left by a previous run")
+            p.terminate()
+            instance_registry.forget(name)
+            continue
+        starter.specs[name] = (entry["cmd"], entry["cwd"], entry["log_name"])
+        starter.record_artifact(name, entry["cmd"], entry["cwd"])
+        if name in starter.artifacts:
+            starter.artifacts[name].update(sha256=entry["artifact_sha256"], launched_at=entry["started_at"])
+        if workspaces:
+            workspaces.adopt(name)
+        admission.adopt(name)
+        process_manager.add(p, name, adopted=True)
+        pipeline = starter.open_pipeline(name, entry["log_name"])
+        readiness_tracker.begin(name, p, pipeline, port=entry["port"], adopted=True)
+        if os.path.exists(spool):
+            pipeline.follow(spool, p)
+            following.add(os.path.basename(spool))
+        instance_tracker.add(name)
+        adopted.append(name)
+    if os.path.isdir(starter.spool_dir):
+        for entry in os.listdir(starter.spool_dir):
+            if entry.split(".", 1)[0] + ".out" not in following:
+                os.remove(os.path.join(starter.spool_dir, entry))
+    if adopted:
+        logging.info(f"Re-adopted {len(adopted)} running instances: {', '.join(adopted)}")
+    return adopted
+supervisor.start()
+process_sampler.start()
+
+def build_server_status():
+    status = get_server_status()
+    result = {
+        "proxy": {"id": "proxy", "name": "Proxy", "type": "proxy", "running": status.get("Proxy", {}).get("running", False), "metrics": status.get("Proxy", {}).get("metrics")},
+        "limbo": {"id": "nanolimbo", "name": "NanoLimbo", "type": "limbo", "running": status.get("NanoLimbo", {}).get("running", False), "metrics": status.get("NanoLimbo", {}).get("metrics")},
+        "services": [],
+        "gameservers": {}
+    }
+    
+    for s in ServiceType:
+        name = s.value.replace('.jar', '')
+        result["services"].append({
+            "id": name.lower(),
+            "name": name,
+            "type": "service",
+            "running": status.get(s.value, {}).get("running", False),
+            "metrics": status.get(s.value, {}).get("metrics")
+        })
+    
+    for enabled, server in ALL_SERVER_TYPES:
+        server_lower = server.lower()
+        instances = [
+            {
+                "id": f"{server_lower}_{instance_num}",
+                "instance": instance_num,
+                "running": status.get(tracked_name, {}).get("running", False),
+                "metrics": status.get(tracked_name, {}).get("metrics")
+            }
+            for instance_num, tracked_name in sorted(instance_tracker.instances_of(server).items())
+        ]
+        if not instances:
+            instances.append({
+                "id": f"{server_lower}_0",
+                "instance": 0,
+                "running": False,
+                "metrics": None
             })
-        
-        for enabled, server in ALL_SERVER_TYPES:
-            server_name = server
-            server_lower = server.lower()
-            if server_lower not in result["gameservers"]:
-                result["gameservers"][server_lower] = {
-                    "name": server_name,
-                    "instances": []
-                }
-            
-            instances = []
-            for tracked_name in instance_tracker:
-                if tracked_name.startswith(server_name + "_"):
-                    try:
-                        instance_num = int(tracked_name.split("_", 1)[1])
-                        instances.append({
-                            "id": f"{server_lower}_{instance_num}",
-                            "instance": instance_num,
-                            "running": status.get(tracked_name, {}).get("running", False)
-                        })
-                    except ValueError:
-                        continue
-            
-            if not instances:
-                instances.append({
-                    "id": f"{server_lower}_0",
-                    "instance": 0,
-                    "running": False
-                })
-            
-            instances.sort(key=lambda x: x["instance"])
-            result["gameservers"][server_lower]["instances"] = instances
-        
-        socketio.emit('server_status', result)
-    except Exception as e:
-        logging.error(f"Error broadcasting server status: {str(e)}")
+        result["gameservers"][server_lower] = {"name": server, "instances": instances}
+    
+    return result
+
+STATUS_COALESCE_WINDOW = 0.1
+STATUS_RETRY_DELAY = 1.0
+status_model = StatusModel(socketio, build_server_status, STATUS_COALESCE_WINDOW)
+
+def broadcast_server_status():
+    status_model.schedule()
 
 @socketio.on('connect')
 def handle_connect():
     emit('connected', {'data': 'Connected'})
-    broadcast_server_status()
+    try:
+        emit('server_status', status_model.snapshot())
+    except Exception as e:
+        logging.error(f"Error sending server status snapshot: {str(e)}")
+
+@socketio.on('status_resync')
+def handle_status_resync():
+    try:
+        emit('server_status', status_model.snapshot())
+    except Exception as e:
+        logging.error(f"Error sending server status snapshot: {str(e)}")
 
 @app.after_request
 def after_request(response):
@@ -355,59 +4729,7 @@ def list_servers():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
     try:
-        status = get_server_status()
-        result = {
-            "proxy": {"id": "proxy", "name": "Proxy", "type": "proxy", "running": status.get("Proxy", {}).get("running", False)},
-            "limbo": {"id": "nanolimbo", "name": "NanoLimbo", "type": "limbo", "running": status.get("NanoLimbo", {}).get("running", False)},
-            "services": [],
-            "gameservers": {}
-        }
-        
-        for s in ServiceType:
-            name = s.value.replace('.jar', '')
-            result["services"].append({
-                "id": name.lower(),
-                "name": name,
-                "type": "service",
-                "running": status.get(s.value, {}).get("running", False)
-            })
-        
-        for enabled, server in ALL_SERVER_TYPES:
-            server_name = server
-            if server_name not in result["gameservers"]:
-                result["gameservers"][server_name] = {
-                    "name": server_name,
-                    "instances": []
-                }
-            
-            instances = []
-            max_instance = -1
-            
-            for instance_name, instance_status in status.items():
-                if instance_name.startswith(f"{server_name}_"):
-                    try:
-                        instance_num = int(instance_name.split('_')[-1])
-                        instances.append({
-                            "id": f"{server_name.lower()}_{instance_num}",
-                            "instance": instance_num,
-                            "running": instance_status.get("running", False)
-                        })
-                        max_instance = max(max_instance, instance_num)
-                    except ValueError:
-                        pass
-            
-            if len(instances) == 0:
-                instances.append({
-                    "id": f"{server_name.lower()}_0",
-                    "instance": 0,
-                    "running": False
-                })
-            else:
-                instances.sort(key=lambda x: x["instance"])
-            
-            result["gameservers"][server_name]["instances"] = instances
-    
-        return jsonify(result)
+        return jsonify(build_server_status())
     except Exception as e:
         logging.error(f"Error listing servers: {str(e)}")
         return jsonify({
@@ -417,78 +4739,95 @@ def list_servers():
             "gameservers": {}
         }), 500
 
+def start_target(server_id, wait=True):
+    if server_id == "proxy":
+        if supervisor.is_running("Proxy"):
+            return {"error": "Proxy is already running"}, 400
+        restart_manager.reset("Proxy")
+        if not starter.start_proxy(wait):
+            return {"error": "velocity.jar missing"}, 404
+        instance_tracker.add("Proxy")
+        return {"message": "Proxy started"}, 200
+    
+    elif server_id == "nanolimbo":
+        if supervisor.is_running("NanoLimbo"):
+            return {"error": "NanoLimbo is already running"}, 400
+        restart_manager.reset("NanoLimbo")
+        if not starter.start_nanolimbo(wait):
+            return {"error": "NanoLimbo.jar missing"}, 404
+        instance_tracker.add("NanoLimbo")
+        return {"message": "NanoLimbo started"}, 200
+    
+    else:
+        service_found = False
+        for s in ServiceType:
+            service_id = s.value.replace('.jar', '').lower()
+            if server_id == service_id:
+                service_found = True
+                if supervisor.is_running(s.value):
+                    return {"error": f"{s.value} is already running"}, 400
+                jar = os.path.join(services_dir, s.value)
+                if not os.path.isfile(jar):
+                    return {"error": f"{s.value} missing"}, 404
+                restart_manager.reset(s.value)
+                starter.launch(
+                    s.value,
+                    ["java", "-jar", s.value],
+                    services_dir,
+                    s.value.replace('.jar', '.log'),
+                    wait=wait,
+                )
+                instance_tracker.add(s.value)
+                return {"message": f"{s.value} started"}, 200
+        
+        if not service_found:
+            parts = server_id.rsplit('_', 1)
+            if len(parts) == 2:
+                server_name = parts[0].upper()
+                instance = int(parts[1])
+                server_exists = any(server == server_name for _, server in ALL_SERVER_TYPES)
+                if server_exists:
+                    if supervisor.is_running(f"{server_name}_{instance}"):
+                        return {"error": f"{server_name} {instance} is already running"}, 400
+                    core = os.path.join(gameserver_dir, "HypixelCore.jar")
+                    if not os.path.isfile(core):
+                        return {"error": f"HypixelCore.jar missing"}, 404
+                    instance_name = f"{server_name}_{instance}"
+                    restart_manager.reset(instance_name)
+                    if warm_pool.claim(server_name, instance_name):
+                        instance_tracker.add(instance_name)
+                        return {"message": f"{server_name} {instance} started", "warm": True}, 200
+                    try:
+                        starter.launch(
+                            instance_name,
+                            ["java", "-jar", "HypixelCore.jar", server_name],
+                            starter.gameserver_cwd(instance_name),
+                            f"{instance_name}.log",
+                            wait=wait,
+                        )
+                    except (AdmissionError, PortAllocationError):
+                        if workspaces:
+                            workspaces.release(instance_name)
+                        raise
+                    instance_tracker.add(instance_name)
+                    return {"message": f"{server_name} {instance} started"}, 200
+            return {"error": "Server not found"}, 404
+
 @app.route('/api/servers/<server_id>/start', methods=['POST', 'OPTIONS'])
 def start_server(server_id):
     if request.method == 'OPTIONS':
         return jsonify({}), 200
     try:
-        status = get_server_status()
-        
-        if server_id == "proxy":
-            if status.get("Proxy", {}).get("running", False):
-                return jsonify({"error": "Proxy is already running"}), 400
-            starter.start_proxy()
-            instance_tracker.add("Proxy")
-            threading.Timer(0.5, broadcast_server_status).start()
-            return jsonify({"message": "Proxy started"})
-        
-        elif server_id == "nanolimbo":
-            if status.get("NanoLimbo", {}).get("running", False):
-                return jsonify({"error": "NanoLimbo is already running"}), 400
-            starter.start_nanolimbo()
-            instance_tracker.add("NanoLimbo")
-            threading.Timer(0.5, broadcast_server_status).start()
-            return jsonify({"message": "NanoLimbo started"})
-        
-        else:
-            service_found = False
-            for s in ServiceType:
-                service_id = s.value.replace('.jar', '').lower()
-                if server_id == service_id:
-                    service_found = True
-                    if status.get(s.value, {}).get("running", False):
-                        return jsonify({"error": f"{s.value} is already running"}), 400
-                    jar = os.path.join(services_dir, s.value)
-                    if not os.path.isfile(jar):
-                        return jsonify({"error": f"{s.value} missing"}), 404
-                    log = open(os.path.join(logs_dir, f"{s.value.replace('.jar', '.log')}"), "a")
-                    p = subprocess.Popen(
-                        ["java", "-Xms256M", "-Xmx512M", "-jar", s.value],
-                        cwd=services_dir,
-                        stdout=log,
-                        stderr=subprocess.STDOUT,
-                    )
-                    process_manager.add(p, s.value)
-                    instance_tracker.add(s.value)
-                    threading.Timer(0.5, broadcast_server_status).start()
-                    return jsonify({"message": f"{s.value} started"})
-            
-            if not service_found:
-                parts = server_id.rsplit('_', 1)
-                if len(parts) == 2:
-                    server_name = parts[0].upper()
-                    instance = int(parts[1])
-                    server_exists = any(server == server_name for _, server in ALL_SERVER_TYPES)
-                    if server_exists:
-                        if status.get(f"{server_name}_{instance}", {}).get("running", False):
-                            return jsonify({"error": f"{server_name} {instance} is already running"}), 400
-                        core = os.path.join(gameserver_dir, "HypixelCore.jar")
-                        if not os.path.isfile(core):
-                            return jsonify({"error": f"HypixelCore.jar missing"}), 404
-                        log = open(os.path.join(logs_dir, f"{server_name}_{instance}.log"), "a")
-                        p = subprocess.Popen(
-                            ["java", "-Xms1G", "-Xmx2G", "-jar", "HypixelCore.jar", server_name],
-                            cwd=gameserver_dir,
-                            stdout=log,
-                            stderr=subprocess.STDOUT,
-                        )
-                        instance_name = f"{server_name}_{instance}"
-                        process_manager.add(p, instance_name)
-                        instance_tracker.add(instance_name)
-                        threading.Timer(0.5, broadcast_server_status).start()
-                        return jsonify({"message": f"{server_name} {instance} started"})
-                return jsonify({"error": "Server not found"}), 404
+        payload, code = start_target(server_id, wait=False)
+        return jsonify(payload), code
     
+    except AdmissionQueued as e:
+        name = resolve_process_name(server_id)
+        if name:
+            instance_tracker.add(name)
+        return jsonify({"message": str(e), "queued": True}), 202
+    except (AdmissionError, PortAllocationError) as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         logging.error(f"Error starting server {server_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -498,56 +4837,181 @@ def start_server(server_id):
 def index():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
-    return jsonify({"message": "Hello, World!"})
+    return jsonify({"message": "Hello, World!"})
+
+def resolve_process_name(server_id):
+    if server_id == "proxy":
+        return "Proxy"
+    if server_id == "nanolimbo":
+        return "NanoLimbo"
+    for s in ServiceType:
+        if server_id == s.value.replace('.jar', '').lower():
+            return s.value
+    parts = server_id.rsplit('_', 1)
+    if len(parts) == 2 and parts[1].isdigit():
+        return f"{parts[0].upper()}_{int(parts[1])}"
+    return None
+
+def stop_target(server_id, timeout=10):
+    target_name = resolve_process_name(server_id)
+    if target_name in starter.queued and starter.admission and starter.admission.cancel(target_name):
+        return {"message": f"Cancelled queued launch of {target_name}"}, 200
+    
+    p = process_manager.get(target_name) if target_name else None
+    if p and p.poll() is None:
+        logging.info(f"Stopping {target_name}")
+        supervisor.mark_stopping(target_name)
+        p.terminate()
+        try:
+            p.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logging.warning(f"Force killing {target_name}")
+            p.kill()
+        process_manager.discard(target_name)
+        return {"message": f"{target_name} stopped"}, 200
+    
+    if target_name and restart_manager.cancel_pending(target_name):
+        return {"message": f"Pending restart of {target_name} cancelled"}, 200
+    
+    return {"error": "Server not found or not running"}, 404
+
+@app.route('/api/servers/<server_id>/stop', methods=['POST', 'OPTIONS'])
+def stop_server(server_id):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        payload, code = stop_target(server_id)
+        return jsonify(payload), code
+        
+    except Exception as e:
+        logging.error(f"Error stopping server {server_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+FLEET_PARALLELISM = 16
+FLEET_READY_TIMEOUT = 180
+FLEET_FOUNDATION_SERVICES = (ServiceType.DATA_MUTEX.value, ServiceType.API.value)
+
+def fleet_tier(name):
+    if name in FLEET_FOUNDATION_SERVICES:
+        return 0
+    if name and name.endswith('.jar'):
+        return 1
+    if name == "Proxy":
+        return 3
+    return 2
+
+def expand_fleet_targets(targets, starting):
+    server_ids = []
+    for target in targets:
+        target = str(target).lower()
+        if target in ("all", "services"):
+            server_ids.extend(s.value.replace('.jar', '').lower() for s in ServiceType)
+        if target == "all":
+            server_ids.extend(["nanolimbo", "proxy"])
+        if target in ("all", "gameservers"):
+            server_names = {server for _, server in ALL_SERVER_TYPES}
+            if starting:
+                server_ids.extend(f"{server.lower()}_0" for enabled, server in ALL_SERVER_TYPES if enabled)
+                candidates = [n for n in instance_tracker if not supervisor.is_running(n)]
+            else:
+                candidates = [n for n in supervisor.snapshot() if supervisor.is_running(n)]
+            server_ids.extend(n.lower() for n in candidates if server_type_of(n) in server_names and n != server_type_of(n) and not WarmPool.is_member(n))
+        if target not in ("all", "services", "gameservers"):
+            server_ids.append(target)
+    return list(dict.fromkeys(server_ids))
+
+def wait_for_tier(names, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        entries = [supervisor.get(name) or {} for name in names]
+        if all(not e.get("running") or e.get("readiness") in ("ready", "failed") for e in entries):
+            break
+        time.sleep(0.05)
+    failed = []
+    for name in names:
+        entry = supervisor.get(name) or {}
+        if not entry.get("running") or entry.get("readiness") != "ready":
+            failed.append(name)
+    return failed
+
+def run_fleet_action(action, server_ids):
+    starting = action == "start"
+    tiers = collections.defaultdict(list)
+    for server_id in server_ids:
+        tiers[fleet_tier(resolve_process_name(server_id))].append(server_id)
+    order = sorted(tiers) if starting else sorted(tiers, reverse=True)
+    target_fn = start_target if starting else stop_target
+    results = {}
+    failed_dependency = None
+    
+    def run_target(server_id):
+        try:
+            payload, code = target_fn(server_id)
+        except (AdmissionError, PortAllocationError) as e:
+            payload, code = {"error": str(e)}, 503
+        except Exception as e:
+            logging.error(f"Error during fleet {action} of {server_id}: {str(e)}")
+            payload, code = {"error": str(e)}, 500
+        return dict(payload, status=code)
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=FLEET_PARALLELISM) as pool:
+        for tier in order:
+            if failed_dependency:
+                for server_id in tiers[tier]:
+                    results[server_id] = {"error": f"Skipped, dependency {failed_dependency} failed", "status": 424}
+                continue
+            futures = {pool.submit(run_target, server_id): server_id for server_id in tiers[tier]}
+            for future in concurrent.futures.as_completed(futures):
+                results[futures[future]] = future.result()
+            if starting and tier != order[-1]:
+                names = {sid: resolve_process_name(sid) or sid for sid in tiers[tier]}
+                dead = [
+                    names[sid] for sid in tiers[tier]
+                    if results[sid]["status"] != 200 and not (results[sid]["status"] == 400 and supervisor.is_running(names[sid]))
+                ]
+                started = [name for name in names.values() if name not in dead]
+                for name in wait_for_tier(started, FLEET_READY_TIMEOUT):
+                    sid = next(sid for sid in tiers[tier] if names[sid] == name)
+                    results[sid] = {"error": f"{name} did not become ready", "status": 500}
+                    dead.append(name)
+                if dead:
+                    failed_dependency = ", ".join(dead)
+    return results
+
+def fleet_endpoint(action):
+    started = time.perf_counter()
+    data = request.get_json(silent=True) or {}
+    targets = data.get('targets') or ["all"]
+    if not isinstance(targets, list):
+        return jsonify({"error": "targets must be a list"}), 400
+    server_ids = expand_fleet_targets(targets, action == "start")
+    results = run_fleet_action(action, server_ids)
+    return jsonify({
+        "action": action,
+        "results": results,
+        "succeeded": sum(1 for r in results.values() if r["status"] == 200),
+        "failed": sum(1 for r in results.values() if r["status"] != 200),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    })
+
+@app.route('/api/fleet/start', methods=['POST', 'OPTIONS'])
+def fleet_start():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return fleet_endpoint("start")
+    except Exception as e:
+        logging.error(f"Error starting fleet: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-@app.route('/api/servers/<server_id>/stop', methods=['POST', 'OPTIONS'])
-def stop_server(server_id):
+@app.route('/api/fleet/stop', methods=['POST', 'OPTIONS'])
+def fleet_stop():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
     try:
-        status = get_server_status()
-        found = False
-        target_name = None
-        
-        if server_id == "proxy":
-            target_name = "Proxy"
-        elif server_id == "nanolimbo":
-            target_name = "NanoLimbo"
-        else:
-            for s in ServiceType:
-                service_id = s.value.replace('.jar', '').lower()
-                if server_id == service_id:
-                    target_name = s.value
-                    break
-            
-            if not target_name:
-                parts = server_id.rsplit('_', 1)
-                if len(parts) == 2:
-                    server_name = parts[0].upper()
-                    instance = int(parts[1])
-                    target_name = f"{server_name}_{instance}"
-        
-        if target_name:
-            for p, name in process_manager.processes[:]:
-                if name == target_name:
-                    if p.poll() is None:
-                        logging.info(f"Stopping {name}")
-                        p.terminate()
-                        try:
-                            p.wait(timeout=10)
-                        except subprocess.TimeoutExpired:
-                            logging.warning(f"Force killing {name}")
-                            p.kill()
-                        process_manager.processes.remove((p, name))
-                        found = True
-                        threading.Timer(0.5, broadcast_server_status).start()
-                        return jsonify({"message": f"{name} stopped"})
-        
-        if not found:
-            return jsonify({"error": "Server not found or not running"}), 404
-        
+        return fleet_endpoint("stop")
     except Exception as e:
-        logging.error(f"Error stopping server {server_id}: {str(e)}")
+        logging.error(f"Error stopping fleet: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/servers/<server_id>/remove', methods=['POST', 'OPTIONS'])
@@ -583,28 +5047,30 @@ def remove_instance(server_id):
         if not target_name:
             return jsonify({"error": f"Invalid server ID: {server_id}"}), 400
         
-        removed_from_processes = False
-        for p, name in process_manager.processes[:]:
-            if name == target_name:
-                if p.poll() is None:
-                    logging.info(f"Stopping {name} before removal")
-                    p.terminate()
-                    try:
-                        p.wait(timeout=10)
-                    except subprocess.TimeoutExpired:
-                        logging.warning(f"Force killing {name}")
-                        p.kill()
-                process_manager.processes.remove((p, name))
-                removed_from_processes = True
+        p = process_manager.get(target_name)
+        if p and p.poll() is None:
+            logging.info(f"Stopping {target_name} before removal")
+            supervisor.mark_stopping(target_name)
+            p.terminate()
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                logging.warning(f"Force killing {target_name}")
+                p.kill()
+        removed_from_processes = process_manager.discard(target_name) is not None
         
+        supervisor.forget(target_name)
+        restart_manager.reset(target_name)
         removed_from_tracker = False
         if target_name in instance_tracker:
             instance_tracker.remove(target_name)
             removed_from_tracker = True
             logging.info(f"Removed {target_name} from tracking")
+        removed_workspace = workspaces.release(target_name) if workspaces else False
+        instance_registry.forget(target_name)
         
-        if removed_from_processes or removed_from_tracker:
-            threading.Timer(0.5, broadcast_server_status).start()
+        if removed_from_processes or removed_from_tracker or removed_workspace:
+            broadcast_server_status()
             return jsonify({"message": f"{target_name} removed"})
         else:
             return jsonify({"error": "Instance not found"}), 404
@@ -619,6 +5085,142 @@ def get_status():
         return jsonify({}), 200
     return jsonify(get_server_status())
 
+@app.route('/api/instances/registry', methods=['GET', 'OPTIONS'])
+def get_instance_registry():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(instance_registry.report())
+    except Exception as e:
+        logging.error(f"Error reading instance registry: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/workspaces', methods=['GET', 'OPTIONS'])
+def get_workspaces():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        if not workspaces:
+            return jsonify({"enabled": False})
+        return jsonify(workspaces.report())
+    except Exception as e:
+        logging.error(f"Error reading game server workspaces: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/processes/stats', methods=['GET', 'OPTIONS'])
+def get_process_stats():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(restart_manager.report())
+    except Exception as e:
+        logging.error(f"Error reading process stats: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/servers/<server_id>/restart-policy', methods=['POST', 'OPTIONS'])
+def set_restart_policy(server_id):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        target_name = resolve_process_name(server_id)
+        if not target_name:
+            return jsonify({"error": f"Invalid server ID: {server_id}"}), 400
+        data = request.get_json() or {}
+        restart_manager.set_policy(target_name, data.get('policy'))
+        return jsonify({"message": f"Restart policy for {target_name} set to {data.get('policy')}"})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error setting restart policy for {server_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/metrics', methods=['GET', 'OPTIONS'])
+def get_metrics():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        wants_text = request.args.get('format') == 'prometheus' or (
+            'format' not in request.args and request.accept_mimetypes.best_match(['application/json', 'text/plain']) == 'text/plain'
+        )
+        if wants_text:
+            return Response(process_sampler.prometheus(), mimetype='text/plain; version=0.0.4')
+        names = set(request.args.getlist('name')) or None
+        since = request.args.get('since', type=float)
+        limit = request.args.get('limit', type=int)
+        series = request.args.get('series', '').lower() in ('1', 'true', 'yes') or names is not None
+        return jsonify(process_sampler.report(names=names, since=since, limit=limit, series=series))
+    except Exception as e:
+        logging.error(f"Error reading metrics: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/readiness', methods=['GET', 'OPTIONS'])
+def get_readiness():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        processes = {
+            name: {
+                "running": entry["running"],
+                "readiness": entry["readiness"],
+                "time_to_ready": entry["time_to_ready"],
+                "error": entry.get("readiness_error")
+            }
+            for name, entry in supervisor.snapshot().items()
+        }
+        return jsonify({"processes": processes, "startup_seconds": readiness_tracker.report()})
+    except Exception as e:
+        logging.error(f"Error reading readiness: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/admission', methods=['GET', 'OPTIONS'])
+def get_admission():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(admission.report())
+    except Exception as e:
+        logging.error(f"Error reading admission state: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/cds', methods=['GET', 'OPTIONS'])
+def get_cds_archives():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(cds_archives.report())
+    except Exception as e:
+        logging.error(f"Error reading CDS archives: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/cds/train', methods=['POST', 'OPTIONS'])
+def train_cds_archives():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        data = request.get_json(silent=True) or {}
+        known = [server_type for _, server_type in ALL_SERVER_TYPES]
+        server_types = [t.upper() for t in data.get('types') or known]
+        unknown = [t for t in server_types if t not in known]
+        if unknown:
+            return jsonify({"error": f"Unknown server types: {', '.join(unknown)}"}), 400
+        if not os.path.isfile(os.path.join(gameserver_dir, "HypixelCore.jar")):
+            return jsonify({"error": "HypixelCore.jar missing"}), 404
+        cds_archives.train_async(server_types, force=bool(data.get('force')))
+        return jsonify({"message": f"Queued {len(server_types)} CDS training runs", "types": server_types}), 202
+    except Exception as e:
+        logging.error(f"Error starting CDS training: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/pool', methods=['GET', 'OPTIONS'])
+def get_warm_pool():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(warm_pool.report())
+    except Exception as e:
+        logging.error(f"Error reading warm pool: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 def get_log_file_path(server_id):
     if server_id == "proxy":
         return os.path.join(logs_dir, "velocity.log")
@@ -638,6 +5240,104 @@ def get_log_file_path(server_id):
     
     return None
 
+def known_log_sources():
+    sources = {"PROXY": "proxy", "NANOLIMBO": "nanolimbo"}
+    for s in ServiceType:
+        sources[s.name] = s.value.replace('.jar', '').lower()
+    server_names = {server for _, server in ALL_SERVER_TYPES}
+    instance_names = set(instance_tracker)
+    if os.path.isdir(logs_dir):
+        instance_names.update(f[:-len('.log')] for f in os.listdir(logs_dir) if f.endswith('.log'))
+    for name in instance_names:
+        if server_type_of(name) in server_names and name != server_type_of(name) and not WarmPool.is_member(name):
+            sources[name] = name.lower()
+    result = {}
+    for source, server_id in sources.items():
+        log_path = get_log_file_path(server_id)
+        if log_path and os.path.exists(log_path):
+            result[source] = (server_id, log_path)
+    return result
+
+LOG_TAIL_BLOCK_SIZE = 64 * 1024
+LOG_READ_MAX_BYTES = 4 * 1024 * 1024
+
+def tail_log_lines(log_path, count, block_size=LOG_TAIL_BLOCK_SIZE):
+    with open(log_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if count <= 0:
+            return [], end
+        pos = end
+        chunks = []
+        newlines = 0
+        while pos > 0 and newlines <= count:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            chunk = f.read(read_size)
+            chunks.append(chunk)
+            newlines += chunk.count(b'\n')
+    data = b''.join(reversed(chunks))
+    partial = len(data) - data.rfind(b'\n') - 1
+    if partial:
+        data = data[:-partial]
+    lines = data.splitlines(keepends=True)[-count:]
+    return [line.decode('utf-8', errors='ignore') for line in lines], end - partial
+
+def head_log_lines(log_path, count):
+    lines = []
+    end = 0
+    with open(log_path, 'rb') as f:
+        for line in f:
+            if len(lines) >= count or not line.endswith(b'\n'):
+                break
+            lines.append(line.decode('utf-8', errors='ignore'))
+            end += len(line)
+    return lines, end
+
+def read_log_since(log_path, offset, max_bytes=LOG_READ_MAX_BYTES, sizes=None):
+    with open(log_path, 'rb') as f:
+        return read_lines_from(f, offset, max_bytes, sizes)
+
+def read_lines_from(f, offset, max_bytes=LOG_READ_MAX_BYTES, sizes=None):
+    end = f.seek(0, os.SEEK_END)
+    reset = offset > end
+    if reset:
+        offset = 0
+    f.seek(offset)
+    data = f.read(min(end - offset, max_bytes))
+    cut = data.rfind(b'\n') + 1
+    if cut == 0 and len(data) < max_bytes:
+        data = b''
+    elif cut > 0:
+        data = data[:cut]
+    next_offset = offset + len(data)
+    raw_lines = data.splitlines(keepends=True)
+    if sizes is not None:
+        sizes.extend(len(line) for line in raw_lines)
+    lines = [line.decode('utf-8', errors='ignore') for line in raw_lines]
+    return lines, next_offset, reset, next_offset < end
+
+def log_offset_base(log_path):
+    pipeline = starter.pipelines.get(log_path)
+    return pipeline.base if pipeline else 0
+
+def read_log_window(log_path, lines, since_offset=None, tail=True):
+    base = log_offset_base(log_path)
+    if since_offset is not None:
+        since_offset = max(since_offset, 0)
+        log_lines, offset, reset, has_more = offload(read_log_since, log_path, since_offset - base if since_offset >= base else 0)
+        return log_lines, offset + base, reset or since_offset < base, has_more
+    if tail:
+        pipeline = starter.get_pipeline(log_path)
+        if pipeline and len(pipeline.ring) >= lines:
+            log_lines, offset = pipeline.tail(lines)
+            return log_lines, offset, False, False
+        log_lines, offset = offload(tail_log_lines, log_path, lines)
+    else:
+        log_lines, offset = offload(head_log_lines, log_path, lines)
+    return log_lines, offset + base, False, False
+
 @app.route('/api/servers/<server_id>/logs', methods=['GET', 'OPTIONS'])
 def get_logs(server_id):
     if request.method == 'OPTIONS':
@@ -649,18 +5349,17 @@ def get_logs(server_id):
         
         lines = request.args.get('lines', default=500, type=int)
         tail = request.args.get('tail', default='true').lower() == 'true'
+        since_offset = request.args.get('since_offset', default=None, type=int)
         
-        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            if tail:
-                all_lines = f.readlines()
-                log_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-            else:
-                log_lines = [f.readline() for _ in range(lines) if f.readline()]
+        log_lines, offset, reset, has_more = read_log_window(log_path, lines, since_offset, tail)
         
         return jsonify({
             "logs": log_lines,
             "total_lines": len(log_lines),
-            "file_path": log_path
+            "file_path": log_path,
+            "offset": offset,
+            "reset": reset,
+            "has_more": has_more
         })
     
     except Exception as e:
@@ -677,20 +5376,95 @@ def stream_logs(server_id):
             return jsonify({"error": "Log file not found"}), 404
         
         lines = request.args.get('lines', default=100, type=int)
+        since_offset = request.args.get('since_offset', default=None, type=int)
         
-        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            all_lines = f.readlines()
-            log_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        log_lines, offset, reset, _ = read_log_window(log_path, lines, since_offset)
         
         return jsonify({
             "logs": log_lines,
-            "total_lines": len(log_lines)
+            "total_lines": len(log_lines),
+            "offset": offset,
+            "reset": reset
         })
     
     except Exception as e:
         logging.error(f"Error streaming logs for {server_id}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/logs/search', methods=['GET', 'OPTIONS'])
+def search_logs():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        started = time.perf_counter()
+        sources = known_log_sources()
+        patterns = [p.strip().upper() for p in request.args.get('sources', '').split(',') if p.strip()]
+        if patterns:
+            sources = {
+                source: value for source, value in sources.items()
+                if any(fnmatch.fnmatchcase(source, p) or fnmatch.fnmatchcase(value[0].upper(), p) for p in patterns)
+            }
+        levels = [l.strip().upper() for l in request.args.get('level', '').split(',') if l.strip()]
+        levels = [LOG_LEVEL_ALIASES.get(l, l) for l in levels]
+        loggers = [l.strip().lower() for l in request.args.get('logger', '').split(',') if l.strip()]
+        start_ms = parse_time_of_day(request.args['from']) if request.args.get('from') else None
+        end_ms = parse_time_of_day(request.args['to'], upper=True) if request.args.get('to') else None
+        offset = max(request.args.get('offset', default=0, type=int), 0)
+        limit = min(max(request.args.get('limit', default=100, type=int), 1), 1000)
+        
+        results, total = log_index.search(
+            sources, levels, loggers, start_ms, end_ms,
+            text=request.args.get('q'), offset=offset, limit=limit,
+        )
+        
+        return jsonify({
+            "results": results,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "sources": sorted(sources),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        })
+    
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error searching logs: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@socketio.on('subscribe_logs')
+def handle_subscribe_logs(data):
+    data = data or {}
+    server_id = data.get('server_id')
+    lines = data.get('lines', 500)
+    try:
+        log_path = get_log_file_path(server_id) if server_id else None
+    except ValueError:
+        log_path = None
+    if not log_path:
+        emit('log_error', {"server_id": server_id, "error": "Log file not found"})
+        return
+    join_room(f"logs:{server_id}")
+    log_hub.subscribe(request.sid, server_id, log_path)
+    try:
+        log_lines, offset = read_log_window(log_path, int(lines))[:2] if os.path.exists(log_path) else ([], log_offset_base(log_path))
+        emit('log_snapshot', {"server_id": server_id, "logs": log_lines, "offset": offset})
+    except Exception as e:
+        logging.error(f"Error sending log snapshot for {server_id}: {str(e)}")
+        emit('log_error', {"server_id": server_id, "error": str(e)})
+
+@socketio.on('unsubscribe_logs')
+def handle_unsubscribe_logs(data):
+    server_id = (data or {}).get('server_id')
+    if not server_id:
+        return
+    leave_room(f"logs:{server_id}")
+    log_hub.unsubscribe(request.sid, server_id)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    log_hub.unsubscribe_all(request.sid)
+
 @app.route('/api/download/status', methods=['GET', 'OPTIONS'])
 def get_download_status():
     if request.method == 'OPTIONS':
@@ -741,45 +5515,183 @@ def download_all():
         logging.error(f"Error starting download: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/artifacts', methods=['GET', 'OPTIONS'])
+def list_artifacts():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        processes = {}
+        for name, artifact in starter.artifacts.items():
+            processes[name] = dict(artifact, running=supervisor.is_running(name))
+        return jsonify({"processes": processes, "store": artifact_store.listing()})
+    except Exception as e:
+        logging.error(f"Error listing artifacts: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/artifacts/gc', methods=['POST', 'OPTIONS'])
+def gc_artifacts():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        data = request.get_json(silent=True) or {}
+        in_use = {a["sha256"] for name, a in starter.artifacts.items() if a["sha256"] and supervisor.is_running(name)}
+        removed, freed = artifact_store.gc(keep_versions=int(data.get('keep_versions', 1)), in_use=in_use)
+        return jsonify({"removed": removed, "freed_bytes": freed})
+    except Exception as e:
+        logging.error(f"Error collecting artifacts: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def config_paths():
+    return {
+        'settings.yml': os.path.join(base_dir, 'configuration', 'settings.yml'),
+        'velocity.toml': os.path.join(base_dir, 'configuration', 'velocity.toml'),
+        'resources.json': os.path.join(base_dir, 'configuration', 'resources.json'),
+        'forwarding.secret': os.path.join(base_dir, 'configuration', 'forwarding.secret'),
+        JVM_PROFILES_FILE: jvm_profiles.path
+    }
+
+def config_payload(config_name, entry):
+    if config_name == 'forwarding.secret':
+        return {"content": entry["raw"].strip(), "type": "text"}
+    if entry["type"] == "text":
+        return {"content": entry["raw"], "type": "text"}
+    return {"content": entry["content"], "type": entry["type"], "raw": entry["raw"]}
+
+def process_server_id(name):
+    if name == "Proxy":
+        return "proxy"
+    if name == "NanoLimbo":
+        return "nanolimbo"
+    return name.replace('.jar', '').lower()
+
+def config_reload_targets(relative_path):
+    patterns = [p for rule in CONFIG_RELOAD_RULES if fnmatch.fnmatch(relative_path, rule["pattern"]) for p in rule["restart"]]
+    if not patterns:
+        return []
+    return sorted(n for n in supervisor.snapshot() if supervisor.is_running(n) and any(fnmatch.fnmatchcase(server_type_of(n), p) or fnmatch.fnmatchcase(n, p) for p in patterns))
+
+def reload_processes(names, reason):
+    for name in names:
+        if WarmPool.is_member(name):
+            warm_pool.retire(name)
+            continue
+        logging.info(f"Restarting {name} after {reason} changed")
+        try:
+            stop_target(process_server_id(name))
+            relaunch_process(name)
+        except Exception as e:
+            logging.error(f"Error restarting {name} after {reason} changed: {str(e)}")
+
+def handle_config_changes(changed):
+    names = {p: n for n, p in config_paths().items()}
+    reload = {}
+    for path, event in changed:
+        targets = config_reload_targets(event["file"])
+        event["name"] = names.get(path)
+        event["affects"] = [n for n in targets if not WarmPool.is_member(n)]
+        event["reloading"] = CONFIG_HOT_RELOAD and bool(targets)
+        socketio.emit('config_changed', event)
+        for name in targets:
+            reload.setdefault(name, event["file"])
+    if CONFIG_HOT_RELOAD and reload:
+        reason = ", ".join(sorted(set(reload.values())))
+        threading.Thread(target=reload_processes, args=(sorted(reload), reason), daemon=True).start()
+
+config_watcher = ConfigWatcher(
+    base_dir,
+    [(config_dir, True, None), (proxy_dir, False, {"velocity.toml", "forwarding.secret"})],
+    config_store,
+    handle_config_changes,
+)
+skyblock_snapshot = SkyBlockSnapshot(os.path.join(config_dir, "skyblock"), os.path.join(base_dir, "downloads", "cache", "skyblock.snapshot"))
+config_watcher.add_hook("configuration/skyblock/*", skyblock_snapshot.invalidate)
+skyblock_pack = ResourcePackBuilder(
+    os.path.join(config_dir, "skyblock"),
+    os.path.join(base_dir, "downloads", "packs", f"{PACK_NAME}.zip"),
+    os.path.join(base_dir, "downloads", "cache", f"{PACK_NAME}.manifest"),
+)
+spatial_index = SpatialIndex(os.path.join(config_dir, "skyblock"))
+
+@app.route('/api/config/watch', methods=['GET', 'OPTIONS'])
+def get_config_watch():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(dict(config_watcher.report(), hot_reload=CONFIG_HOT_RELOAD, rules=CONFIG_RELOAD_RULES, cache=config_store.report()))
+    except Exception as e:
+        logging.error(f"Error reading config watcher status: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/config/batch', methods=['POST', 'OPTIONS'])
+def save_config_batch():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        data = request.get_json() or {}
+        operations = data.get('operations') if isinstance(data, dict) else data
+        if not isinstance(operations, list) or not operations:
+            return jsonify({"error": "A non-empty operations list is required"}), 400
+        
+        paths = config_paths()
+        changes = []
+        for index, op in enumerate(operations):
+            if not isinstance(op, dict):
+                return jsonify({"error": f"Operation {index}: expected an object"}), 400
+            config_name = op.get('file')
+            value = op.get('value')
+            field_path = op.get('field_path')
+            if config_name not in paths:
+                return jsonify({"error": f"Operation {index}: invalid config name {config_name}"}), 400
+            if value is None:
+                return jsonify({"error": f"Operation {index}: value is required"}), 400
+            if field_path and not os.path.exists(paths[config_name]):
+                return jsonify({"error": f"Operation {index}: {config_name} not found"}), 404
+            if config_name == 'forwarding.secret':
+                if field_path:
+                    return jsonify({"error": f"Operation {index}: forwarding.secret has no fields"}), 400
+                value = str(value).strip()
+                if not value:
+                    return jsonify({"error": f"Operation {index}: forwarding secret must not be empty"}), 400
+            changes.append((paths[config_name], field_path, value))
+        
+        entries = config_store.update_many(changes)
+        names = {path: name for name, path in paths.items()}
+        return jsonify({
+            "message": f"Saved {len(entries)} config file(s)",
+            "files": {names[path]: {"etag": entry["etag"]} for path, entry in entries.items()},
+        })
+    
+    except ConfigPathError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error saving config batch: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/config/<config_name>', methods=['GET', 'OPTIONS'])
 def get_config(config_name):
     if request.method == 'OPTIONS':
         return jsonify({}), 200
     try:
-        config_paths = {
-            'settings.yml': os.path.join(base_dir, 'configuration', 'settings.yml'),
-            'velocity.toml': os.path.join(base_dir, 'configuration', 'velocity.toml'),
-            'resources.json': os.path.join(base_dir, 'configuration', 'resources.json'),
-            'forwarding.secret': os.path.join(base_dir, 'configuration', 'forwarding.secret')
-        }
+        paths = config_paths()
         
-        if config_name not in config_paths:
+        if config_name not in paths:
             return jsonify({"error": "Invalid config name"}), 400
         
-        config_path = config_paths[config_name]
+        config_path = paths[config_name]
         
         if not os.path.exists(config_path):
             return jsonify({"error": "Config file not found"}), 404
         
-        if config_name == 'forwarding.secret':
-            with open(config_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-            return jsonify({"content": content, "type": "text"})
-        
-        with open(config_path, 'r', encoding='utf-8') as f:
-            file_content = f.read()
-        
-        if config_name.endswith('.json'):
-            content = json.loads(file_content)
-            return jsonify({"content": content, "type": "json", "raw": file_content})
-        elif config_name.endswith('.toml'):
-            content = toml.loads(file_content)
-            return jsonify({"content": content, "type": "toml", "raw": file_content})
-        elif config_name.endswith('.yml') or config_name.endswith('.yaml'):
-            content = yaml.safe_load(file_content)
-            return jsonify({"content": content, "type": "yaml", "raw": file_content})
+        entry = config_store.get(config_path)
+        if request.if_none_match.contains(entry["etag"]):
+            response = Response(status=304)
         else:
-            return jsonify({"content": file_content, "type": "text"})
+            if entry["body"] is None:
+                entry["body"] = app.json.dumps(config_payload(config_name, entry))
+            response = Response(entry["body"], mimetype="application/json")
+        response.set_etag(entry["etag"])
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     
     except Exception as e:
         logging.error(f"Error reading config {config_name}: {str(e)}")
@@ -790,17 +5702,12 @@ def save_config(config_name):
     if request.method == 'OPTIONS':
         return jsonify({}), 200
     try:
-        config_paths = {
-            'settings.yml': os.path.join(base_dir, 'configuration', 'settings.yml'),
-            'velocity.toml': os.path.join(base_dir, 'configuration', 'velocity.toml'),
-            'resources.json': os.path.join(base_dir, 'configuration', 'resources.json'),
-            'forwarding.secret': os.path.join(base_dir, 'configuration', 'forwarding.secret')
-        }
+        paths = config_paths()
         
-        if config_name not in config_paths:
+        if config_name not in paths:
             return jsonify({"error": "Invalid config name"}), 400
         
-        config_path = config_paths[config_name]
+        config_path = paths[config_name]
         data = request.get_json()
         content = data.get('content')
         field_path = data.get('field_path')
@@ -809,55 +5716,278 @@ def save_config(config_name):
             return jsonify({"error": "Content is required"}), 400
         
         if config_name == 'forwarding.secret':
-            with open(config_path, 'w', encoding='utf-8') as f:
-                f.write(str(content).strip())
-            return jsonify({"message": "Config saved successfully"})
-        
-        if field_path:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                if config_name.endswith('.json'):
-                    config_data = json.load(f)
-                elif config_name.endswith('.toml'):
-                    config_data = toml.load(f)
-                elif config_name.endswith('.yml') or config_name.endswith('.yaml'):
-                    config_data = yaml.safe_load(f)
-                else:
-                    return jsonify({"error": "Field editing not supported for this file type"}), 400
-            
-            keys = field_path.split('.')
-            current = config_data
-            for key in keys[:-1]:
-                if isinstance(current, dict):
-                    current = current[key]
-                else:
-                    return jsonify({"error": f"Invalid field path: {field_path}"}), 400
-            
-            if isinstance(current, dict):
-                current[keys[-1]] = content
-            else:
-                return jsonify({"error": f"Invalid field path: {field_path}"}), 400
-            
-            content = config_data
-        
-        with open(config_path, 'w', encoding='utf-8') as f:
-            if config_name.endswith('.json'):
-                json.dump(content, f, indent=2)
-            elif config_name.endswith('.toml'):
-                toml.dump(content, f)
-            elif config_name.endswith('.yml') or config_name.endswith('.yaml'):
-                yaml.dump(content, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-            else:
-                f.write(str(content))
+            content = str(content).strip()
+            field_path = None
+        
+        entry = config_store.update(config_path, content, field_path, request.if_match or None)
+        if entry is None:
+            return jsonify({"error": "Config changed since it was loaded"}), 412
         
-        return jsonify({"message": "Config saved successfully"})
+        payload = config_payload(config_name, entry)
+        payload["message"] = "Config saved successfully"
+        response = jsonify(payload)
+        response.set_etag(entry["etag"])
+        return response
     
+    except ConfigPathError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logging.error(f"Error saving config {config_name}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/skyblock', methods=['GET', 'OPTIONS'])
+def get_skyblock_snapshot():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(offload(skyblock_snapshot.report))
+    except Exception as e:
+        logging.error(f"Error building SkyBlock snapshot: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/items', methods=['GET', 'OPTIONS'])
+def list_skyblock_items():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        indexes = offload(skyblock_snapshot.get)
+        selected = None
+        category = request.args.get('category')
+        if category:
+            category = category.lower()
+            ids = [i for name, items in indexes["categories"].items() if name == category or name.startswith(category + "/") for i in items]
+            selected = list(dict.fromkeys(ids))
+        for key, index in (('rarity', 'rarities'), ('component', 'components')):
+            value = request.args.get(key)
+            if value:
+                ids = indexes[index].get(value.upper(), [])
+                wanted = set(ids)
+                selected = ids if selected is None else [i for i in selected if i in wanted]
+        if selected is None:
+            selected = list(indexes["items"])
+        if request.args.get('details') in ('1', 'true'):
+            return jsonify({"count": len(selected), "items": [indexes["items"][i][0] for i in selected]})
+        return jsonify({"count": len(selected), "items": selected})
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock items: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/items/<item_id>', methods=['GET', 'OPTIONS'])
+def get_skyblock_item(item_id):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        definitions = offload(skyblock_snapshot.get)["items"].get(item_id.upper())
+        if not definitions:
+            return jsonify({"error": f"Unknown item {item_id}"}), 404
+        return jsonify(dict(definitions[0], duplicates=[d["category"] for d in definitions[1:]]))
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock item {item_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/skills/<skill>/levels/<int:level>', methods=['GET', 'OPTIONS'])
+def get_skyblock_skill_level(skill, level):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        entry = offload(skyblock_snapshot.get)["skills"].get(skill.lower())
+        if entry is None:
+            return jsonify({"error": f"Unknown skill {skill}"}), 404
+        reward = entry["rewards"].get(level)
+        if reward is None:
+            return jsonify({"error": f"{entry['name']} has no level {level}"}), 404
+        return jsonify({"skill": entry["name"], "level": level, "requirement": reward.get("requirement"), "unlocks": reward.get("unlocks") or []})
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock skill {skill}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/levels/<int:level>', methods=['GET', 'OPTIONS'])
+def get_skyblock_level(level):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        entry = offload(skyblock_snapshot.get)["levels"].get(level)
+        if entry is None:
+            return jsonify({"error": f"Unknown SkyBlock level {level}"}), 404
+        return jsonify(entry)
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock level {level}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/collections/<item_type>', methods=['GET', 'OPTIONS'])
+def get_skyblock_collection(item_type):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        entry = offload(skyblock_snapshot.get)["collections"].get(item_type.upper())
+        if entry is None:
+            return jsonify({"error": f"No collection for {item_type}"}), 404
+        return jsonify(dict(entry, itemType=item_type.upper()))
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock collection {item_type}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/reforges', methods=['GET', 'OPTIONS'])
+def list_skyblock_reforges():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        indexes = offload(skyblock_snapshot.get)
+        applicable = request.args.get('type')
+        names = indexes["reforge_types"].get(applicable.upper(), []) if applicable else sorted(indexes["reforges"])
+        return jsonify({"count": len(names), "reforges": names})
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock reforges: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/reforges/<name>', methods=['GET', 'OPTIONS'])
+def get_skyblock_reforge(name):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        reforge = offload(skyblock_snapshot.get)["reforges"].get(name.lower())
+        if reforge is None:
+            return jsonify({"error": f"Unknown reforge {name}"}), 404
+        return jsonify(reforge)
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock reforge {name}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def spatial_query_points():
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        points = data.get('points')
+        if not isinstance(points, list) or not points or not all(isinstance(p, list) and len(p) == 3 for p in points):
+            raise ValueError("points must be a non-empty list of [x, y, z]")
+        if len(points) > SPATIAL_BATCH_LIMIT:
+            raise ValueError(f"At most {SPATIAL_BATCH_LIMIT} points per request")
+        try:
+            return data, [[float(v) for v in point] for point in points]
+        except (TypeError, ValueError):
+            raise ValueError("point coordinates must be numbers")
+    try:
+        return request.args, [[float(request.args[k]) for k in ('x', 'y', 'z')]]
+    except (KeyError, ValueError):
+        raise ValueError("x, y and z query parameters are required")
+
+def spatial_region_summary(region):
+    return {k: region[k] for k in ("id", "type", "serverType", "min", "max")}
+
+@app.route('/api/skyblock/regions', methods=['GET', 'POST', 'OPTIONS'])
+def query_skyblock_regions():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        if request.method == 'GET' and 'x' not in request.args:
+            index = offload(spatial_index.load)
+            zone = (request.args.get('serverType') or '').upper()
+            regions = index.regions.get(zone, []) if zone else [r for items in index.regions.values() for r in items]
+            return jsonify({"count": len(regions), "regions": [spatial_region_summary(r) for r in regions]})
+        params, points = spatial_query_points()
+        zone = params.get('serverType')
+        if not zone:
+            return jsonify({"error": "serverType is required"}), 400
+        results = offload(spatial_index.regions_at, zone, points)
+        return jsonify({"serverType": zone.upper(), "results": [[spatial_region_summary(r) for r in found] for found in results]})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock regions: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/regions/report', methods=['GET', 'OPTIONS'])
+def get_skyblock_region_report():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(offload(spatial_index.report))
+    except Exception as e:
+        logging.error(f"Error building SkyBlock region report: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/points/<dataset>/nearest', methods=['GET', 'POST', 'OPTIONS'])
+def query_skyblock_points(dataset):
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        if dataset not in SPATIAL_POINT_SETS:
+            return jsonify({"error": f"Unknown point set {dataset}, expected one of {', '.join(SPATIAL_POINT_SETS)}"}), 404
+        params, points = spatial_query_points()
+        zone = params.get('zone') or params.get('serverType')
+        if not zone:
+            return jsonify({"error": "zone is required"}), 400
+        k = max(1, min(int(params.get('k', 1)), 100))
+        max_distance = params.get('max_distance')
+        max_distance = float(max_distance) if max_distance is not None else None
+        results = offload(spatial_index.nearest, dataset, zone, points, k, max_distance)
+        return jsonify({
+            "dataset": dataset,
+            "zone": zone.upper(),
+            "results": [[dict(point, distance=round(distance, 3)) for point, distance in found] for found in results],
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error querying SkyBlock {dataset}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/pack', methods=['GET', 'OPTIONS'])
+def get_skyblock_pack():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        return jsonify(dict(offload(skyblock_pack.get), url=f"/api/skyblock/pack/{PACK_NAME}.zip"))
+    except Exception as e:
+        logging.error(f"Error building {PACK_NAME}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/skyblock/pack/build', methods=['POST', 'OPTIONS'])
+def build_skyblock_pack():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+    try:
+        data = request.get_json(silent=True) or {}
+        return jsonify(dict(offload(skyblock_pack.build, bool(data.get('force'))), url=f"/api/skyblock/pack/{PACK_NAME}.zip"))
+    except Exception as e:
+        logging.error(f"Error building {PACK_NAME}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route(f'/api/skyblock/pack/{PACK_NAME}.zip', methods=['GET'])
+def download_skyblock_pack():
+    try:
+        offload(skyblock_pack.get)
+        with skyblock_pack.swap_lock:
+            return send_file(
+                skyblock_pack.output,
+                mimetype="application/zip",
+                download_name=f"{PACK_NAME}.zip",
+                etag=skyblock_pack.sha1,
+                max_age=0,
+                conditional=True,
+            )
+    except Exception as e:
+        logging.error(f"Error serving {PACK_NAME}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == '__main__':
-    atexit.register(process_manager.cleanup)
-    signal.signal(signal.SIGINT, lambda *_: sys.exit(0))
-    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
+    if INSTANCE_KEEP_ON_EXIT:
+        atexit.register(lambda: logging.info("Leaving instances running for the next API process to adopt"))
+    else:
+        atexit.register(process_manager.cleanup, tier_of=fleet_tier)
+    atexit.register(restart_manager.shutdown)
+    atexit.register(warm_pool.shutdown)
+    adopt_instances()
+    if workspaces:
+        workspaces.prune()
+    warm_pool.start()
+    config_watcher.start(prime=config_paths().values())
+    threading.Thread(target=skyblock_snapshot.refresh, daemon=True).start()
+    threading.Thread(target=skyblock_pack.build, daemon=True).start()
+    def request_shutdown(signum, _frame):
+        logging.info(f"Received signal {signum}, shutting down")
+        sys.exit(0)
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+    logging.info(f"Serving API in {SERVER_MODE} mode")
+    socketio.run(app, host='0.0.0.0', port=int(os.environ.get("API_PORT", "5000")), debug=False, allow_unsafe_werkzeug=True)
 
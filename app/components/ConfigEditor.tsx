@@ -5,10 +5,11 @@ import { API_URL } from '../lib/api';
 
 interface ConfigEditorProps {
   configName: string;
+  externalChange?: { time: number; changes: { path: string }[] | null } | null;
   onClose: () => void;
 }
 
-export default function ConfigEditor({ configName, onClose }: ConfigEditorProps) {
+export default function ConfigEditor({ configName, externalChange, onClose }: ConfigEditorProps) {
   const [content, setContent] = useState<string>('');
   const [originalContent, setOriginalContent] = useState<string>('');
   const [loading, setLoading] = useState(true);
@@ -20,30 +21,42 @@ export default function ConfigEditor({ configName, onClose }: ConfigEditorProps)
     fetchConfig();
   }, [configName]);
 
-  const fetchConfig = async () => {
+  useEffect(() => {
+    if (!externalChange || saving) return;
+    if (content === originalContent) {
+      fetchConfig(true);
+    } else {
+      const keys = externalChange.changes?.map(change => change.path).join(', ');
+      setError(`${configName} changed on disk${keys ? ` (${keys})` : ''}. Saving will overwrite those changes.`);
+    }
+  }, [externalChange?.time]);
+
+  const applyConfig = (data: any) => {
+    if (data.type === 'text') {
+      setContent(data.content);
+      setOriginalContent(data.content);
+    } else if (data.raw) {
+      setContent(data.raw);
+      setOriginalContent(data.raw);
+    } else if (data.type === 'json') {
+      setContent(JSON.stringify(data.content, null, 2));
+      setOriginalContent(JSON.stringify(data.content, null, 2));
+    } else {
+      setContent(data.content);
+      setOriginalContent(data.content);
+    }
+    setConfigType(data.type);
+  };
+
+  const fetchConfig = async (quiet = false) => {
     try {
-      setLoading(true);
+      if (!quiet) setLoading(true);
       setError(null);
       const response = await fetch(`${API_URL}/api/config/${configName}`);
       if (!response.ok) {
         throw new Error('Failed to load config');
       }
-      const data = await response.json();
-      
-      if (data.type === 'text') {
-        setContent(data.content);
-        setOriginalContent(data.content);
-      } else if (data.raw) {
-        setContent(data.raw);
-        setOriginalContent(data.raw);
-      } else if (data.type === 'json') {
-        setContent(JSON.stringify(data.content, null, 2));
-        setOriginalContent(JSON.stringify(data.content, null, 2));
-      } else {
-        setContent(data.content);
-        setOriginalContent(data.content);
-      }
-      setConfigType(data.type);
+      applyConfig(await response.json());
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load config');
     } finally {
@@ -115,7 +128,7 @@ export default function ConfigEditor({ configName, onClose }: ConfigEditorProps)
         throw new Error(errorData.error || 'Failed to save field');
       }
       
-      await fetchConfig();
+      applyConfig(await response.json());
       alert('Field saved successfully!');
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to save field');
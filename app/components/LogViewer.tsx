@@ -1,6 +1,7 @@
 'use client'
 
 import { useState, useEffect, useRef, useCallback } from 'react'
+import { io, Socket } from 'socket.io-client'
 import { API_URL } from '../lib/api'
 
 interface LogViewerProps {
@@ -18,6 +19,65 @@ export default function LogViewer({ serverId, serverName, isOpen, onClose }: Log
   const [lines, setLines] = useState(500)
   const logContainerRef = useRef<HTMLDivElement>(null)
 
+  const offsetRef = useRef<number | null>(null)
+  const socketRef = useRef<Socket | null>(null)
+
+  useEffect(() => {
+    if (!isOpen) return
+
+    const socket = io(API_URL, {
+      transports: ['websocket', 'polling']
+    })
+
+    socket.on('connect', () => {
+      setLoading(true)
+      offsetRef.current = null
+      socket.emit('subscribe_logs', { server_id: serverId, lines })
+    })
+
+    socket.on('log_snapshot', (data: { server_id: string; logs: string[]; offset: number }) => {
+      if (data.server_id !== serverId) return
+      setLogs((data.logs || []).slice(-lines))
+      offsetRef.current = data.offset
+      setLoading(false)
+    })
+
+    socket.on('log_lines', (data: { server_id: string; logs: string[]; sizes?: number[]; start_offset: number; offset: number; reset: boolean }) => {
+      if (data.server_id !== serverId) return
+      let incoming = data.logs || []
+      if (offsetRef.current !== null && !data.reset) {
+        if (data.offset <= offsetRef.current) return
+        const sizes = data.sizes || []
+        let cursor = data.start_offset
+        let skip = 0
+        while (skip < incoming.length && cursor < offsetRef.current) {
+          cursor += sizes[skip] ?? new TextEncoder().encode(incoming[skip]).length
+          skip++
+        }
+        incoming = incoming.slice(skip)
+      }
+      offsetRef.current = data.offset
+      if (data.reset) {
+        setLogs(incoming.slice(-lines))
+      } else if (incoming.length > 0) {
+        setLogs(prev => prev.concat(incoming).slice(-lines))
+      }
+    })
+
+    socket.on('log_error', (data: { error: string }) => {
+      console.error('Error streaming logs:', data.error)
+      setLoading(false)
+    })
+
+    socketRef.current = socket
+
+    return () => {
+      socket.emit('unsubscribe_logs', { server_id: serverId })
+      socket.disconnect()
+      socketRef.current = null
+    }
+  }, [isOpen, serverId, lines])
+
   const fetchLogs = useCallback(async () => {
     if (!isOpen) return
     setLoading(true)
@@ -25,7 +85,8 @@ export default function LogViewer({ serverId, serverName, isOpen, onClose }: Log
       const response = await fetch(`${API_URL}/api/servers/${serverId}/logs?lines=${lines}&tail=true`)
       const data = await response.json()
       if (response.ok) {
-        setLogs(data.logs || [])
+        setLogs((data.logs || []).slice(-lines))
+        offsetRef.current = data.offset ?? null
       }
     } catch (error) {
       console.error('Error fetching logs:', error)
@@ -34,14 +95,6 @@ export default function LogViewer({ serverId, serverName, isOpen, onClose }: Log
     }
   }, [isOpen, serverId, lines])
 
-  useEffect(() => {
-    if (!isOpen) return
-    
-    fetchLogs()
-    const interval = setInterval(fetchLogs, 2000)
-    return () => clearInterval(interval)
-  }, [isOpen, serverId, lines, fetchLogs])
-
   useEffect(() => {
     if (autoScroll && logContainerRef.current) {
       logContainerRef.current.scrollTop = logContainerRef.current.scrollHeight
@@ -6,10 +6,18 @@ import LogViewer from './components/LogViewer'
 import ConfigEditor from './components/ConfigEditor'
 import { API_URL } from './lib/api'
 
+interface ProcessMetrics {
+  cpu_percent: number
+  rss_bytes: number
+  threads: number
+  fds: number
+}
+
 interface Instance {
   id: string
   instance: number
   running: boolean
+  metrics?: ProcessMetrics | null
 }
 
 interface GameServer {
@@ -18,10 +26,57 @@ interface GameServer {
 }
 
 interface ServerData {
-  proxy: { id: string; name: string; type: string; running: boolean }
-  limbo: { id: string; name: string; type: string; running: boolean }
-  services: Array<{ id: string; name: string; type: string; running: boolean }>
+  proxy: { id: string; name: string; type: string; running: boolean; metrics?: ProcessMetrics | null }
+  limbo: { id: string; name: string; type: string; running: boolean; metrics?: ProcessMetrics | null }
+  services: Array<{ id: string; name: string; type: string; running: boolean; metrics?: ProcessMetrics | null }>
   gameservers: { [key: string]: GameServer }
+  version?: number
+}
+
+interface PatchOperation {
+  op: 'add' | 'remove' | 'replace'
+  path: string
+  value?: any
+}
+
+interface StatusPatch {
+  version: number
+  base: number
+  ops: PatchOperation[]
+}
+
+const applyPatch = (document: ServerData, ops: PatchOperation[]): ServerData => {
+  const root: any = { ...document }
+  for (const { op, path, value } of ops) {
+    const keys = path.split('/').slice(1).map(key => key.replace(/~1/g, '/').replace(/~0/g, '~'))
+    const last = keys.pop() as string
+    let parent = root
+    for (const key of keys) {
+      parent[key] = Array.isArray(parent[key]) ? [...parent[key]] : { ...parent[key] }
+      parent = parent[key]
+    }
+    if (!Array.isArray(parent)) {
+      if (op === 'remove') delete parent[last]
+      else parent[last] = value
+    } else if (op === 'add') {
+      parent.splice(last === '-' ? parent.length : Number(last), 0, value)
+    } else if (op === 'remove') {
+      parent.splice(Number(last), 1)
+    } else {
+      parent[Number(last)] = value
+    }
+  }
+  return root
+}
+
+interface ConfigChange {
+  file: string
+  name: string | null
+  event: 'created' | 'modified' | 'deleted'
+  changes: { op: string; path: string }[] | null
+  affects: string[]
+  reloading: boolean
+  time: number
 }
 
 interface DownloadStatus {
@@ -29,34 +84,91 @@ interface DownloadStatus {
   progress: number
   current: string
   errors: string[]
+  bytes_done?: number
+  bytes_total?: number
+  throughput?: number
+}
+
+const formatBytes = (bytes: number) => {
+  if (bytes >= 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(1)} MB`
+  if (bytes >= 1024) return `${(bytes / 1024).toFixed(1)} KB`
+  return `${bytes} B`
 }
 
+const formatMetrics = (metrics: ProcessMetrics) =>
+  `CPU ${metrics.cpu_percent.toFixed(1)}% · RSS ${formatBytes(metrics.rss_bytes)} · ${metrics.threads} threads · ${metrics.fds} fds`
+
 export default function Home() {
   const [data, setData] = useState<ServerData | null>(null)
   const [loading, setLoading] = useState(true)
   const [actionLoading, setActionLoading] = useState<string | null>(null)
   const [logViewer, setLogViewer] = useState<{ serverId: string; serverName: string } | null>(null)
   const [configEditor, setConfigEditor] = useState<string | null>(null)
+  const [configChange, setConfigChange] = useState<ConfigChange | null>(null)
   const [selectedServices, setSelectedServices] = useState<Set<string>>(new Set())
   const [downloadStatus, setDownloadStatus] = useState<DownloadStatus>({ status: 'idle', progress: 0, current: '', errors: [] })
 
   const socketRef = useRef<Socket | null>(null)
+  const statusRef = useRef<ServerData | null>(null)
+  const resyncRef = useRef(false)
+  const pendingPatchesRef = useRef<StatusPatch[]>([])
 
   useEffect(() => {
     const socket = io(API_URL.replace('/api', ''), {
       transports: ['websocket', 'polling']
     })
     
+    const requestResync = () => {
+      if (!resyncRef.current) {
+        resyncRef.current = true
+        socket.emit('status_resync')
+      }
+    }
+    
     socket.on('connect', () => {
       console.log('WebSocket connected')
+      resyncRef.current = false
+      pendingPatchesRef.current = []
       setLoading(false)
     })
     
     socket.on('server_status', (serverData: ServerData) => {
-      setData(serverData)
+      resyncRef.current = false
+      let current = serverData
+      const buffered = pendingPatchesRef.current.filter(p => p.version > (serverData.version ?? 0))
+      pendingPatchesRef.current = []
+      for (const patch of buffered) {
+        if (current.version !== patch.base) {
+          pendingPatchesRef.current = []
+          requestResync()
+          break
+        }
+        current = { ...applyPatch(current, patch.ops), version: patch.version }
+      }
+      statusRef.current = current
+      setData(current)
       setLoading(false)
     })
     
+    socket.on('server_status_patch', (patch: StatusPatch) => {
+      const current = statusRef.current
+      if (current && patch.version <= (current.version ?? 0)) {
+        return
+      }
+      if (resyncRef.current || !current || current.version !== patch.base) {
+        pendingPatchesRef.current.push(patch)
+        requestResync()
+        return
+      }
+      const next = { ...applyPatch(current, patch.ops), version: patch.version }
+      statusRef.current = next
+      setData(next)
+    })
+    
+    socket.on('config_changed', (change: ConfigChange) => {
+      setConfigChange(change)
+    })
+    
     socket.on('disconnect', () => {
       console.log('WebSocket disconnected')
     })
@@ -275,6 +387,9 @@ export default function Home() {
                 Downloading: {downloadStatus.current || 'Preparing...'}
               </span>
               <span style={{ fontSize: '0.875rem', color: '#1976d2', fontWeight: '500' }}>
+                {downloadStatus.bytes_total
+                  ? `${formatBytes(downloadStatus.bytes_done || 0)} / ${formatBytes(downloadStatus.bytes_total)} (${formatBytes(downloadStatus.throughput || 0)}/s) · `
+                  : ''}
                 {downloadStatus.progress}%
               </span>
             </div>
@@ -457,6 +572,21 @@ export default function Home() {
             <div style={{ fontWeight: 'bold', marginBottom: '0.25rem', color: '#333' }}>forwarding.secret</div>
             <div style={{ fontSize: '0.875rem', color: '#666' }}>Forwarding secret</div>
           </button>
+          <button
+            onClick={() => setConfigEditor('jvm_profiles.yml')}
+            style={{
+              padding: '1rem',
+              backgroundColor: '#fff',
+              border: '1px solid #ddd',
+              borderRadius: '8px',
+              cursor: 'pointer',
+              textAlign: 'left',
+              boxShadow: '0 2px 4px rgba(0,0,0,0.1)',
+            }}
+          >
+            <div style={{ fontWeight: 'bold', marginBottom: '0.25rem', color: '#333' }}>jvm_profiles.yml</div>
+            <div style={{ fontSize: '0.875rem', color: '#666' }}>JVM profiles and memory admission</div>
+          </button>
         </div>
       </div>
 
@@ -471,6 +601,7 @@ export default function Home() {
       {configEditor && (
         <ConfigEditor
           configName={configEditor}
+          externalChange={configChange?.name === configEditor ? configChange : null}
           onClose={() => setConfigEditor(null)}
         />
       )}
@@ -479,7 +610,7 @@ export default function Home() {
 }
 
 function ServerCard({ server, onStart, onStop, onViewLogs, onSelect, isSelected, actionLoading }: {
-  server: { id: string; name: string; running: boolean }
+  server: { id: string; name: string; running: boolean; metrics?: ProcessMetrics | null }
   onStart: (id: string) => void
   onStop: (id: string) => void
   onViewLogs: () => void
@@ -537,6 +668,9 @@ function ServerCard({ server, onStart, onStop, onViewLogs, onSelect, isSelected,
               {server.running ? 'Running' : 'Stopped'}
             </div>
           </div>
+          {server.running && server.metrics && (
+            <div style={{ fontSize: '0.75rem', color: '#666', marginTop: '0.25rem' }}>{formatMetrics(server.metrics)}</div>
+          )}
         </div>
       </div>
       <div style={{ display: 'flex', gap: '0.5rem', flexWrap: 'wrap' }}>
@@ -661,6 +795,9 @@ function InstanceCard({ instance, serverName, onStart, onStop, onViewLogs, onRem
               {instance.running ? 'Running' : 'Stopped'}
             </div>
           </div>
+          {instance.running && instance.metrics && (
+            <div style={{ fontSize: '0.75rem', color: '#666', marginTop: '0.25rem' }}>{formatMetrics(instance.metrics)}</div>
+          )}
         </div>
       </div>
       <div style={{ display: 'flex', gap: '0.5rem', flexWrap: 'wrap' }}>
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import random
+import signal
+import socket
+
+STARTUP = float(os.environ.get("FAKE_JVM_STARTUP", "0.5"))
+LOG_RATE = float(os.environ.get("FAKE_JVM_LOG_RATE", "2"))
+STOP_DELAY = float(os.environ.get("FAKE_JVM_STOP_DELAY", "0.2"))
+PLAYERS = ["XdAryann", "GamblingWithDeyo", "Technoblade", "Dream", "Notch", "jeb_"]
+
+def logger_name(argv):
+    if "velocity.jar" in argv:
+        return "Velocity"
+    if "NanoLimbo.jar" in argv:
+        return "Limbo"
+    for arg in argv:
+        if arg.endswith(".jar"):
+            return arg[:-4]
+    return "Server"
+
+def log(level, name, message):
+    now = time.time()
+    stamp = time.strftime("%H:%M:%S", time.localtime(now))
+    sys.stdout.write(f"{stamp}.{int(now % 1 * 1000):03d} {level:<5} {name} -- {message}\n")
+    sys.stdout.flush()
+
+def stop(name):
+    log("INFO", name, "Stopping server...")
+    time.sleep(STOP_DELAY)
+    sys.exit(143)
+
+def main():
+    argv = sys.argv[1:]
+    name = logger_name(argv)
+    signal.signal(signal.SIGTERM, lambda *_: stop(name))
+    signal.signal(signal.SIGINT, lambda *_: stop(name))
+    log("INFO", name, "Starting server...")
+    time.sleep(STARTUP)
+    if name == "Velocity":
+        log("INFO", name, f"Done ({STARTUP:.2f}s)!")
+    elif name == "Limbo":
+        log("INFO", name, "Server started on /0.0.0.0:65535")
+    else:
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        log("INFO", name, f"Listening on /127.0.0.1:{listener.getsockname()[1]}")
+    interval = 1.0 / LOG_RATE if LOG_RATE > 0 else None
+    online = []
+    while True:
+        if interval is None:
+            signal.pause()
+            continue
+        time.sleep(random.expovariate(1.0 / interval))
+        roll = random.random()
+        if roll < 0.02:
+            log("ERROR", name, "Encountered exception")
+            sys.stdout.write("io.netty.handler.timeout.ReadTimeoutException: null\n")
+            sys.stdout.flush()
+        elif online and roll < 0.5:
+            log("INFO", name, f"Player {online.pop(random.randrange(len(online)))} disconnected")
+        else:
+            player = random.choice(PLAYERS)
+            online.append(player)
+            address = f"/127.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}:{random.randint(50000, 60000)}"
+            log("INFO", name, f"Player {player} connected ({address}) [V1_21_11]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import signal
+import argparse
+import tempfile
+import platform
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+import concurrent.futures
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_JVM = os.path.join(ROOT, "benchmarks", "fake_jvm.py")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(samples, errors, elapsed):
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 50), 3) if samples else None,
+        "p90_ms": round(percentile(samples, 90), 3) if samples else None,
+        "p99_ms": round(percentile(samples, 99), 3) if samples else None,
+        "max_ms": round(max(samples), 3) if samples else None,
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else None,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, op, elapsed_ms, ok):
+        with self.lock:
+            self.samples.setdefault(op, []).append(elapsed_ms)
+            if not ok:
+                self.errors[op] = self.errors.get(op, 0) + 1
+
+    def report(self, elapsed):
+        with self.lock:
+            return {op: summarize(samples, self.errors.get(op, 0), elapsed) for op, samples in sorted(self.samples.items())}
+
+class Api:
+    def __init__(self, base, recorder=None):
+        self.base = base.rstrip("/")
+        self.recorder = recorder
+
+    def call(self, method, path, body=None, op=None, timeout=60):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                status, payload = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except (urllib.error.URLError, OSError) as e:
+            status, payload = None, str(e).encode()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if self.recorder and op:
+            self.recorder.record(op, elapsed_ms, status is not None and status < 400)
+        return status, payload
+
+    def json(self, method, path, body=None, op=None):
+        status, payload = self.call(method, path, body, op)
+        try:
+            return status, json.loads(payload)
+        except ValueError:
+            return status, None
+
+class PollingClient:
+    def __init__(self, base, on_event):
+        self.base = base.rstrip("/") + "/socket.io/?EIO=4&transport=polling"
+        self.on_event = on_event
+        self.sid = None
+        self.closed = threading.Event()
+        self.thread = None
+
+    def request(self, data=None, timeout=60):
+        url = f"{self.base}&sid={self.sid}" if self.sid else self.base
+        req = urllib.request.Request(url, data=data.encode() if data is not None else None, method="POST" if data is not None else "GET", headers={"Content-Type": "text/plain;charset=UTF-8"})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read().decode()
+
+    def connect(self):
+        handshake = self.request()
+        self.sid = json.loads(handshake[1:])["sid"]
+        self.request("40")
+        self.thread = threading.Thread(target=self.receive, daemon=True)
+        self.thread.start()
+
+    def emit(self, event, data):
+        self.request("42" + json.dumps([event, data]))
+
+    def receive(self):
+        while not self.closed.is_set():
+            try:
+                body = self.request()
+            except (urllib.error.URLError, OSError):
+                break
+            for packet in body.split("\x1e"):
+                if packet == "2":
+                    self.request("3")
+                elif packet == "1":
+                    self.closed.set()
+                elif packet.startswith("42"):
+                    event, *args = json.loads(packet[2:])
+                    self.on_event(event, args[0] if args else None)
+
+    def close(self):
+        self.closed.set()
+        try:
+            self.request("1")
+        except (urllib.error.URLError, OSError):
+            pass
+
+class Dashboard:
+    def __init__(self, base, server_ids, recorder):
+        self.base = base
+        self.server_ids = server_ids
+        self.recorder = recorder
+        self.client = PollingClient(base, self.on_event)
+        self.pending = {}
+        self.events = 0
+        self.log_lines = 0
+        self.lock = threading.Lock()
+
+    def on_event(self, event, data):
+        with self.lock:
+            self.events += 1
+            if event == "log_lines":
+                self.log_lines += len(data.get("logs", [])) if isinstance(data, dict) else 0
+            elif event in ("log_snapshot", "log_error"):
+                started = self.pending.pop(data.get("server_id"), None)
+                if started is not None:
+                    self.recorder.record("socketio subscribe_logs", (time.perf_counter() - started) * 1000, event == "log_snapshot")
+
+    def start(self, subscriptions):
+        started = time.perf_counter()
+        self.client.connect()
+        self.recorder.record("socketio connect", (time.perf_counter() - started) * 1000, True)
+        for server_id in random.sample(self.server_ids, min(subscriptions, len(self.server_ids))):
+            with self.lock:
+                self.pending[server_id] = time.perf_counter()
+            self.client.emit("subscribe_logs", {"server_id": server_id, "lines": 200})
+
+class RssSampler:
+    def __init__(self, pid, interval=0.25):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def read_kb(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            kb = self.read_kb()
+            if kb is not None:
+                self.samples.append(kb)
+
+    def report(self):
+        if not self.samples:
+            return None
+        return {"start_kb": self.samples[0], "peak_kb": max(self.samples), "end_kb": self.samples[-1]}
+
+def make_sandbox(path):
+    shutil.copytree(os.path.join(ROOT, "configuration"), os.path.join(path, "configuration"))
+    for sub, jar in (("gameserver", "HypixelCore.jar"), ("proxy", "velocity.jar"), ("limbo", "NanoLimbo.jar")):
+        os.makedirs(os.path.join(path, sub), exist_ok=True)
+        open(os.path.join(path, sub, jar), "wb").close()
+    os.makedirs(os.path.join(path, "services"), exist_ok=True)
+    os.makedirs(os.path.join(path, "logs"), exist_ok=True)
+
+def wait_healthy(api, proc, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"api_server.py exited with code {proc.returncode}")
+        status, _ = api.call("GET", "/api/health", timeout=2)
+        if status == 200:
+            return
+        time.sleep(0.2)
+    raise RuntimeError("api_server.py did not become healthy")
+
+def count_running(api, server_type, server_ids):
+    status, body = api.json("GET", "/api/servers")
+    if status != 200 or not body:
+        return 0
+    wanted = set(server_ids)
+    instances = body.get("gameservers", {}).get(server_type.lower(), {}).get("instances", [])
+    return sum(1 for i in instances if i.get("id") in wanted and i.get("running"))
+
+def run_phase(fn, items, concurrency):
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fn, items))
+    return time.perf_counter() - started
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"Compared with {baseline_path} ({baseline.get('meta', {}).get('git_revision')})")
+    for phase, ops in current["phases"].items():
+        for op, stats in ops.items():
+            old = baseline.get("phases", {}).get(phase, {}).get(op)
+            if not old:
+                continue
+            parts = []
+            for key in ("p50_ms", "p99_ms", "throughput_rps"):
+                if old.get(key) and stats.get(key) is not None:
+                    parts.append(f"{key} {old[key]} -> {stats[key]} ({(stats[key] - old[key]) / old[key] * 100:+.1f}%)")
+            print(f"  {phase:<7} {op:<28} " + ", ".join(parts))
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and latency benchmark for api_server.py using fake JVM processes")
+    parser.add_argument("--instances", type=int, default=200, help="game server instances to start")
+    parser.add_argument("--server-type", default="SKYBLOCK_ISLAND", help="game server type to start instances of")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent HTTP clients")
+    parser.add_argument("--dashboards", type=int, default=50, help="concurrent Socket.IO dashboards")
+    parser.add_argument("--subscriptions", type=int, default=3, help="log subscriptions per dashboard")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of mixed read load")
+    parser.add_argument("--log-rate", type=float, default=2, help="log lines per second per fake JVM")
+    parser.add_argument("--mode", default="threading", choices=["threading", "eventlet", "gevent"], help="API_SERVER_MODE for the server under test")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--output", help="result file (default benchmarks/results/<revision>-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result file to diff against")
+    parser.add_argument("--keep-sandbox", action="store_true")
+    args = parser.parse_args()
+
+    sandbox = tempfile.mkdtemp(prefix="api-bench-")
+    make_sandbox(sandbox)
+    base = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ)
+    env.update({
+        "API_BASE_DIR": sandbox,
+        "API_PORT": str(args.port),
+        "API_SERVER_MODE": args.mode,
+        "API_JAVA_COMMAND": f"{sys.executable} -S {FAKE_JVM}",
+        "FAKE_JVM_LOG_RATE": str(args.log_rate),
+        "PYTHONUNBUFFERED": "1",
+    })
+    server_log = open(os.path.join(sandbox, "bench-server.out"), "wb")
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "api_server.py")], cwd=sandbox, env=env, stdout=server_log, stderr=subprocess.STDOUT)
+    rss = RssSampler(proc.pid)
+    recorder = Recorder()
+    api = Api(base, recorder)
+    server_ids = [f"{args.server_type.lower()}_{i}" for i in range(args.instances)]
+    phases = {}
+    dashboards = []
+    try:
+        wait_healthy(Api(base), proc)
+        rss.thread.start()
+        Api(base).call("POST", "/api/config/jvm_profiles.yml", {"field_path": "admission.enabled", "content": False})
+
+        recorder = api.recorder = Recorder()
+        elapsed = run_phase(lambda sid: api.call("POST", f"/api/servers/{sid}/start", op="POST start"), server_ids, args.concurrency)
+        phases["start"] = recorder.report(elapsed)
+
+        deadline = time.time() + 120
+        started = time.perf_counter()
+        while count_running(Api(base), args.server_type, server_ids) < args.instances and time.time() < deadline:
+            time.sleep(0.5)
+        running = count_running(Api(base), args.server_type, server_ids)
+        print(f"{running}/{args.instances} instances running after {time.perf_counter() - started:.1f}s")
+
+        recorder = api.recorder = Recorder()
+        for _ in range(args.dashboards):
+            dashboard = Dashboard(base, server_ids, recorder)
+            dashboard.start(args.subscriptions)
+            dashboards.append(dashboard)
+        load_until = time.time() + args.duration
+        def read_load(_):
+            while time.time() < load_until:
+                if random.random() < 0.5:
+                    api.call("GET", "/api/servers", op="GET servers")
+                else:
+                    api.call("GET", f"/api/servers/{random.choice(server_ids)}/logs?lines=200", op="GET logs")
+        elapsed = run_phase(read_load, range(args.concurrency), args.concurrency)
+        phases["read"] = recorder.report(elapsed)
+        socketio_stats = {
+            "dashboards": len(dashboards),
+            "events": sum(d.events for d in dashboards),
+            "log_lines": sum(d.log_lines for d in dashboards),
+            "events_per_second": round(sum(d.events for d in dashboards) / elapsed, 2),
+        }
+        for dashboard in dashboards:
+            dashboard.client.close()
+
+        recorder = api.recorder = Recorder()
+        elapsed = run_phase(lambda sid: api.call("POST", f"/api/servers/{sid}/stop", op="POST stop"), server_ids, args.concurrency)
+        phases["stop"] = recorder.report(elapsed)
+
+        recorder = api.recorder = Recorder()
+        elapsed = run_phase(lambda sid: api.call("POST", f"/api/servers/{sid}/remove", op="POST remove"), server_ids, args.concurrency)
+        phases["remove"] = recorder.report(elapsed)
+    finally:
+        rss.stopped.set()
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        server_log.close()
+
+    result = {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": args.mode,
+            "instances": args.instances,
+            "server_type": args.server_type,
+            "concurrency": args.concurrency,
+            "dashboards": args.dashboards,
+            "subscriptions": args.subscriptions,
+            "duration": args.duration,
+            "log_rate": args.log_rate,
+        },
+        "phases": phases,
+        "socketio": socketio_stats,
+        "server_rss": rss.report(),
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{result['meta']['git_revision'] or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    print(f"Saved results to {output}")
+    if args.compare:
+        compare(result, args.compare)
+    if args.keep_sandbox:
+        print(f"Sandbox kept at {sandbox}")
+    else:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()